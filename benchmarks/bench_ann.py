@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from typing import Any, Dict, List
+
+# Add main directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ann_index import IVFFlatIndex
+
+def make_dataset(n: int, dim: int, queries: int, seed: int = 0):
+    """Generate clustered unit vectors, similar to sentence embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(16, n // 1000), dim)).astype(np.float32)
+    labels = rng.integers(0, len(centers), n + queries)
+    data = centers[labels] + 0.5 * rng.standard_normal((n + queries, dim)).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data[:n], data[n:]
+
+def exact_search(vectors: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    """Brute-force top-k by inner product"""
+    scores = vectors @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+def percentile_ms(samples: List[float], q: float) -> float:
+    return round(float(np.percentile(samples, q)) * 1000, 3)
+
+def run_size(n: int, dim: int, k: int, queries: int, nprobes: List[int]) -> Dict[str, Any]:
+    """Benchmark exact search and IVF-flat at several nprobe values"""
+    vectors, query_vectors = make_dataset(n, dim, queries)
+
+    exact_times, truth = [], []
+    for query in query_vectors:
+        start = time.perf_counter()
+        truth.append(set(exact_search(vectors, query, k).tolist()))
+        exact_times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    index = IVFFlatIndex(dim)
+    index.add(np.arange(n), vectors)
+    if not index.is_trained:
+        index.train()
+    build_time = time.perf_counter() - start
+
+    result = {
+        "n": n,
+        "dim": dim,
+        "k": k,
+        "nlist": index.nlist,
+        "build_seconds": round(build_time, 3),
+        "exact": {
+            "p50_ms": percentile_ms(exact_times, 50),
+            "p95_ms": percentile_ms(exact_times, 95)
+        },
+        "ivf": []
+    }
+
+    for nprobe in nprobes:
+        times, recalls = [], []
+        for query, expected in zip(query_vectors, truth):
+            start = time.perf_counter()
+            found = index.search(query, k, nprobe=nprobe)
+            times.append(time.perf_counter() - start)
+            recalls.append(len(expected.intersection(item_id for item_id, _ in found)) / k)
+
+        result["ivf"].append({
+            "nprobe": nprobe,
+            f"recall@{k}": round(float(np.mean(recalls)), 4),
+            "p50_ms": percentile_ms(times, 50),
+            "p95_ms": percentile_ms(times, 95)
+        })
+
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='IVF-flat vs exact memory search benchmark')
+    parser.add_argument('--sizes', default='10000,100000,1000000',
+                        help='Comma separated vector counts')
+    parser.add_argument('--dim', type=int, default=64, help='Vector dimension')
+    parser.add_argument('-k', type=int, default=10, help='Neighbours per query')
+    parser.add_argument('--queries', type=int, default=100, help='Queries per size')
+    parser.add_argument('--nprobe', default='1,4,8,16,32', help='Comma separated nprobe values')
+    parser.add_argument('-o', '--output', help='Write results to a JSON file')
+    args = parser.parse_args()
+
+    results = []
+    for n in [int(size) for size in args.sizes.split(',')]:
+        result = run_size(n, args.dim, args.k, args.queries, [int(p) for p in args.nprobe.split(',')])
+        results.append(result)
+
+        print(f"\nn={n} nlist={result['nlist']} build={result['build_seconds']}s "
+              f"exact p50={result['exact']['p50_ms']}ms")
+        for row in result["ivf"]:
+            print(f"  nprobe={row['nprobe']:<3} recall@{args.k}={row[f'recall@{args.k}']:.3f} "
+                  f"p50={row['p50_ms']}ms p95={row['p95_ms']}ms")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+import numpy as np
+from types import SimpleNamespace
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Add main directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_openai import MockOpenAIServer
+from utils.assistant import Assistant
+from utils.embedding_store import EmbeddingStore
+from utils.eviction import create_policy
+from utils.execute_response import execute_response
+from utils.latency import start_turn
+from utils.logger import get_logger
+from utils.memory_manager import MemoryManager
+from utils.query import query_llm, get_llm_client
+from utils.tool_registry import get_tool_registry
+
+# Constants
+SUITES = ("query", "dispatch", "turns", "memory")
+SYSTEM_PROMPT = "You are a helpful voice assistant. Answer briefly."
+TOOL_PROMPT = "What does the benchmark lookup say?"
+SCRIPT = [{"match": TOOL_PROMPT, "tool_calls": [{"name": "bench_lookup", "arguments": {"query": "benchmark"}}]}]
+
+registry = get_tool_registry()
+
+@registry.tool(read_only=True, dynamic=True)
+async def bench_lookup(query: str) -> str:
+    """
+    Benchmark tool without side effects
+
+    Args:
+        query: Search query
+    """
+    return f"Result for {query}"
+
+@registry.tool
+async def bench_note(text: str) -> str:
+    """
+    Benchmark tool with side effects
+
+    Args:
+        text: Note text
+    """
+    return "Noted"
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Percentiles in milliseconds of samples in seconds"""
+    values = np.array(samples) * 1000
+    return {
+        "n": len(samples),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3)
+    }
+
+async def measure(fn: Callable[[], Awaitable[Any]], iterations: int, warmup: int = 5) -> Dict[str, float]:
+    """Time iterations of a coroutine function (stdout of the code under test is discarded)"""
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(warmup + iterations):
+            start = time.perf_counter()
+            await fn()
+            if i >= warmup:
+                samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def tool_response(*calls: str) -> Any:
+    """LLM response object calling the given tools"""
+    tool_calls = [
+        SimpleNamespace(
+            id=f"call_{i}",
+            type="function",
+            function=SimpleNamespace(name=name, arguments=json.dumps({"query": "x"} if name == "bench_lookup" else {"text": "x"}))
+        )
+        for i, name in enumerate(calls)
+    ]
+    message = SimpleNamespace(content=None if tool_calls else "Plain answer", tool_calls=tool_calls or None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+async def bench_query(config: Dict[str, Any], iterations: int) -> Dict[str, Any]:
+    """query_llm against the mock server vs the bare client request it sends"""
+    client = get_llm_client(config["api_url"], config["auth_token"])
+    request = {
+        "model": config["model"],
+        "messages": [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": "Hello"}],
+        "tools": registry.schemas(),
+        "tool_choice": "auto"
+    }
+
+    async def direct():
+        await asyncio.to_thread(client.chat.completions.create, **request)
+
+    async def direct_stream():
+        await asyncio.to_thread(lambda: list(client.chat.completions.create(stream=True, **request)))
+
+    async def wrapped():
+        await query_llm("Hello", config=config, system_prompt=SYSTEM_PROMPT)
+
+    async def wrapped_stream():
+        await query_llm("Hello", config=config, system_prompt=SYSTEM_PROMPT, on_token=lambda text: None)
+
+    result = {
+        "direct": await measure(direct, iterations),
+        "query_llm": await measure(wrapped, iterations),
+        "direct_stream": await measure(direct_stream, iterations),
+        "query_llm_stream": await measure(wrapped_stream, iterations)
+    }
+    result["overhead_p50_ms"] = round(result["query_llm"]["p50_ms"] - result["direct"]["p50_ms"], 3)
+    result["overhead_stream_p50_ms"] = round(result["query_llm_stream"]["p50_ms"] - result["direct_stream"]["p50_ms"], 3)
+    return result
+
+async def bench_dispatch(iterations: int) -> Dict[str, Any]:
+    """execute_response on prepared responses: plain content, concurrent read-only and sequential tools"""
+    context = {"secrets": {}, "system_ip": "127.0.0.1", "memory_namespace": "bench"}
+    scenarios = {
+        "content": tool_response(),
+        "read_only_1": tool_response("bench_lookup"),
+        "read_only_4": tool_response(*["bench_lookup"] * 4),
+        "side_effect_4": tool_response(*["bench_note"] * 4)
+    }
+    result = {}
+    for name, response in scenarios.items():
+        result[name] = await measure(lambda: execute_response(response, "benchmark", context), iterations)
+    return result
+
+async def bench_turns(config: Dict[str, Any], iterations: int, db_path: str) -> Dict[str, Any]:
+    """Full handleAI turns (memory recall, LLM query, tools, output) against the mock server"""
+    import main
+
+    memory = MemoryManager(namespace="bench-turns", db_path=db_path, load=False)
+    for i in range(50):
+        memory.addItem(f"The user mentioned benchmark fact number {i}")
+    main.assistant = Assistant(config, {}, SYSTEM_PROMPT, memory_manager=memory, dynamic_tools=["bench_lookup"])
+    main.assistant.system_ip = "127.0.0.1"
+    main.speech_enabled = False
+
+    async def turn(text: str):
+        start_turn("bench")
+        await main.handleAI(text)
+
+    result = {
+        "answer": await measure(lambda: turn("Tell me something"), iterations),
+        "dynamic_tool": await measure(lambda: turn(TOOL_PROMPT), iterations)
+    }
+    main.assistant = None
+    memory.checkpoint()
+    return result
+
+def timed(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def item_text(i: int) -> str:
+    return f"Memory item {i}: the user mentioned topic {i % 97} and prefers option {i % 13}"
+
+def bench_memory(n: int, queries: int, db_path: str, embed_dir: str) -> Dict[str, Any]:
+    """MemoryManager operations on n items"""
+    namespace = f"bench-{n}"
+    manager = MemoryManager(max_items=n, namespace=namespace, db_path=db_path, load=False)
+
+    add_seconds = timed(lambda: [manager.addItem(item_text(i)) for i in range(n)])
+    checkpoint_seconds = timed(manager.checkpoint)
+    load_seconds = timed(lambda: MemoryManager(max_items=n, namespace=namespace, db_path=db_path))
+
+    # Adds at capacity: each one evicts an item
+    evictions = {}
+    for policy in ("fifo", "lru"):
+        manager.eviction_policy = create_policy(policy)
+        count = min(1000, n)
+        evictions[policy] = round(timed(lambda: [manager.addItem(item_text(n + i)) for i in range(count)]) / count * 1e6, 2)
+    incremental_rows = manager.pending_changes()
+    incremental_seconds = timed(manager.checkpoint)
+
+    # Similarity search with the hashing embedder
+    store = EmbeddingStore(os.path.join(embed_dir, f"{namespace}.npy"))
+    for item_id, text in zip(manager.ids, manager.texts):
+        store.add(item_id, text)
+    embed_seconds = timed(store.flush)
+    manager.embedding_store = store
+    search = []
+    for i in range(queries):
+        search.append(timed(lambda: manager.search(f"topic {i % 97} option {i % 13}", 5)))
+    manager.embedding_store = None
+    store.close()
+    manager.checkpoint()
+
+    return {
+        "n": n,
+        "add_us": round(add_seconds / n * 1e6, 2),
+        "checkpoint_full_ms": round(checkpoint_seconds * 1000, 3),
+        "checkpoint_incremental_ms": round(incremental_seconds * 1000, 3),
+        "incremental_rows": incremental_rows,
+        "load_ms": round(load_seconds * 1000, 3),
+        "add_evict_fifo_us": evictions["fifo"],
+        "add_evict_lru_us": evictions["lru"],
+        "embed_ms": round(embed_seconds * 1000, 3),
+        "search": summarize(search)
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Timing metrics of a results tree by dotted path (memory sizes keyed by n)"""
+    metrics = {}
+    for key, value in results.items():
+        if key == "meta":
+            continue
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten(value, path + "."))
+        elif isinstance(value, list):
+            for row in value:
+                metrics.update(flatten(row, f"{path}.{row.get('n')}."))
+        elif isinstance(value, (int, float)) and key.endswith(("_ms", "_us")):
+            metrics[path] = value
+    return metrics
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> None:
+    """Print metric changes between two result files"""
+    old_metrics, new_metrics = flatten(old), flatten(new)
+    print(f"\nCompared with {old.get('meta', {}).get('commit') or 'baseline'}:")
+    for path, value in new_metrics.items():
+        if path not in old_metrics or path.endswith((".mean_ms", ".p99_ms")):
+            continue
+        before = old_metrics[path]
+        change = (value - before) / before * 100 if before else 0.0
+        flag = "  <-- slower" if change > 10 and value - before > 0.05 else ""
+        print(f"  {path:<48} {before:>10.3f} -> {value:>10.3f} ({change:+.1f}%){flag}")
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    suites = [suite.strip() for suite in args.suites.split(",")]
+    results: Dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency": args.latency,
+            "tokens_per_second": args.tokens_per_second,
+            "iterations": args.iterations
+        }
+    }
+
+    with tempfile.TemporaryDirectory() as tmp, MockOpenAIServer(args.latency, args.tokens_per_second, SCRIPT) as server:
+        db_path = os.path.join(tmp, "memory.db")
+        config = {
+            "api_url": server.url,
+            "auth_token": "bench",
+            "model": "mock",
+            "llm_model": "mock",
+            "history_max_turns": 20,
+            "history_token_budget": 1500
+        }
+
+        if "query" in suites:
+            results["query_llm"] = query = await bench_query(config, args.iterations)
+            print(f"query_llm: p50 {query['query_llm']['p50_ms']}ms (direct {query['direct']['p50_ms']}ms, "
+                  f"overhead {query['overhead_p50_ms']}ms; streamed {query['overhead_stream_p50_ms']}ms)")
+
+        if "dispatch" in suites:
+            results["execute_response"] = dispatch = await bench_dispatch(args.iterations)
+            for name, row in dispatch.items():
+                print(f"execute_response {name:<14} p50 {row['p50_ms']}ms p95 {row['p95_ms']}ms")
+
+        if "turns" in suites:
+            results["turns"] = turns = await bench_turns(config, args.iterations, db_path)
+            for name, row in turns.items():
+                print(f"turn {name:<14} p50 {row['p50_ms']}ms p95 {row['p95_ms']}ms")
+
+        if "memory" in suites:
+            results["memory"] = []
+            for n in [int(size) for size in args.sizes.split(",")]:
+                row = bench_memory(n, args.queries, db_path, tmp)
+                results["memory"].append(row)
+                print(f"memory n={n}: add {row['add_us']}us, checkpoint {row['checkpoint_full_ms']}ms "
+                      f"(incremental {row['checkpoint_incremental_ms']}ms), load {row['load_ms']}ms, "
+                      f"evict fifo {row['add_evict_fifo_us']}us lru {row['add_evict_lru_us']}us, "
+                      f"search p50 {row['search']['p50_ms']}ms")
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Assistant pipeline benchmarks against a local mock OpenAI server')
+    parser.add_argument('--suites', default=','.join(SUITES), help='Comma separated suites (query,dispatch,turns,memory)')
+    parser.add_argument('--iterations', type=int, default=100, help='Timed iterations per scenario')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mock server seconds before the first token')
+    parser.add_argument('--tokens-per-second', type=float, default=0.0, help='Mock server token rate (0 for instant)')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma separated memory item counts')
+    parser.add_argument('--queries', type=int, default=50, help='Memory searches per size')
+    parser.add_argument('-o', '--output', help='Write results to a JSON file')
+    parser.add_argument('--compare', help='Results JSON of an earlier run to compare with')
+    args = parser.parse_args()
+
+    # Per-request info logs would dominate the console and the measurements
+    get_logger().console_handler.setLevel(logging.WARNING)
+    results = asyncio.run(run(args))
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(json.load(file), results)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+import json
+import time
+import uuid
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional
+from aiohttp import web
+
+# Constants
+DEFAULT_CONTENT = "This is a mock answer from the benchmark server."
+
+class MockOpenAIServer:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        tokens_per_second: float = 0.0,
+        script: Optional[List[Dict[str, Any]]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """
+        Local OpenAI-compatible chat completions server for benchmarks
+
+        Serves POST /v1/chat/completions, plain or streamed (SSE), from its
+        own thread and event loop, so it never competes with the code under
+        test. No network access is needed.
+
+        A request gets the first script entry whose "match" is a substring
+        of its last user message (entries without "match" match anything);
+        an entry is {"content": "..."} or {"tool_calls": [{"name": ...,
+        "arguments": {...}}]}. Tool result passes (the last message is the
+        assistant's tool result) are answered with "follow_up" content.
+
+        Args:
+            latency: Seconds before the first token
+            tokens_per_second: Token rate of the answer (0 for instant)
+            script: Response rules
+            host: Interface to listen on
+            port: Port (0 picks a free one)
+        """
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.script = list(script or [])
+        self.follow_up = "Here is what the tool found."
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self) -> str:
+        """Base URL for the OpenAI client (api_url)"""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def _reply(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Scripted reply to a request's messages"""
+        if messages and messages[-1].get("role") == "assistant":
+            return {"content": self.follow_up}
+        prompt = next((message.get("content") or "" for message in reversed(messages) if message.get("role") == "user"), "")
+        for entry in self.script:
+            if entry.get("match", "") in prompt:
+                return entry
+        return {"content": DEFAULT_CONTENT}
+
+    def _tool_calls(self, reply: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": f"call_{uuid.uuid4().hex[:8]}",
+                "type": "function",
+                "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))}
+            }
+            for call in reply.get("tool_calls", [])
+        ]
+
+    async def _pace(self, tokens: int) -> None:
+        if self.tokens_per_second > 0:
+            await asyncio.sleep(tokens / self.tokens_per_second)
+
+    async def completions(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.requests += 1
+        reply = self._reply(body.get("messages", []))
+        tool_calls = self._tool_calls(reply)
+        tokens = (reply.get("content") or "").split(" ") if not tool_calls else []
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "created": int(time.time()), "model": body.get("model", "mock")}
+        usage = {"prompt_tokens": sum(len(str(m.get("content", ""))) // 4 for m in body.get("messages", [])),
+                 "completion_tokens": len(tokens) + len(tool_calls)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        finish_reason = "tool_calls" if tool_calls else "stop"
+
+        await asyncio.sleep(self.latency)
+        if not body.get("stream"):
+            await self._pace(len(tokens))
+            message = {"role": "assistant", "content": None if tool_calls else reply.get("content", "")}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            return web.json_response({
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": usage
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        async def send(delta: Dict[str, Any], finish: Optional[str] = None) -> None:
+            chunk = {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+        await send({"role": "assistant", "content": ""})
+        for index, call in enumerate(tool_calls):
+            await send({"tool_calls": [{"index": index, **call}]})
+        for i, token in enumerate(tokens):
+            await self._pace(1)
+            await send({"content": token if i == 0 else " " + token})
+        await send({}, finish_reason)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    def start(self) -> "MockOpenAIServer":
+        """Start serving on a background thread"""
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            app = web.Application()
+            app.router.add_post("/v1/chat/completions", self.completions)
+            self._runner = web.AppRunner(app, access_log=None)
+            self._loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, self.host, self.port)
+            self._loop.run_until_complete(site.start())
+            self.port = self._runner.addresses[0][1]
+            self._ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="mock-openai", daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(10)
+            self._thread = None
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Mock OpenAI-compatible chat completions server')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds before the first token')
+    parser.add_argument('--tokens-per-second', type=float, default=50, help='Answer token rate (0 for instant)')
+    parser.add_argument('--script', help='JSON file with a list of response rules')
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script) as file:
+            script = json.load(file)
+    server = MockOpenAIServer(args.latency, args.tokens_per_second, script, port=args.port).start()
+    print(f"Mock OpenAI server on {server.url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
@@ -1,166 +1,376 @@
-import pyttsx3
-from RealtimeSTT import AudioToTextRecorder
+import os
+import json
 import asyncio
-import aiohttp
-import yaml
-import speech_recognition as sr
+import argparse
+import functools
+import importlib
 
-from utils.execute_response import execute_response
-from utils.query import query_llm
-from utils.memory_manager import MemoryManager
-from tools import DYNAMIC_TOOLS
+from utils.assistant import Assistant
+from utils.memory_manager import get_memory_store
+from utils.autosave import get_auto_saver, install_signal_handlers
+from utils.latency import start_turn, current_turn, mark, get_latency_tracker
+from utils.llm_scheduler import FOLLOW_UP, get_llm_scheduler
+from utils.tracing import turn_span, get_tracer
+from utils.config_manager import get_config_manager
+from utils.console import AsyncConsole
+from utils.startup import StartupOrchestrator
+from utils.logger import get_logger
 
-# Initialize text-to-speech
-engine = pyttsx3.init()
-engine.setProperty('rate', 150)
-engine.setProperty('volume', 1.0)
-engine.setProperty('voice', engine.getProperty('voices')[0].id)
+# Voice subsystems (speech_recognition, RealtimeSTT, pyttsx3) are imported on
+# first use, so text mode never loads them
 
-# Initialize memory manager
-memory_manager = MemoryManager()
-
-# Read system prompt
-with open("system_prompt.txt", "r") as file:
-    system_prompt = file.read()
+logger = get_logger()
 
 # Global variables
-system_ip = None
+assistant = None
+tts = None
 input_mode = 1  # Default to text input
+speech_enabled = True  # False in text-only mode: answers are printed, never spoken
 
-# Load configuration
-with open("config.yaml", "r") as file:
-    config = yaml.safe_load(file)
-
-    _secrets = config.get("secrets", {})
-    secrets = {key: value for secret in _secrets for key, value in secret.items()}
-
-    _config = config.get("config", {})
-    config = {key: value for secret in _config for key, value in secret.items()}
+def get_assistant():
+    """Get the assistant (following the shared config snapshot), loading system_prompt.txt on first use"""
+    global assistant
+    if assistant is None:
+        assistant = Assistant.from_files()
+    return assistant
 
-async def init_system():
-    """Initialize system components"""
-    global system_ip
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get("https://api.ipify.org") as response:
-                system_ip = await response.text()
-    except Exception as e:
-        print(f"Error getting IP: {e}")
-        system_ip = "unknown"
+def get_tts():
+    """Get the text-to-speech worker (the engine itself lives on the worker thread)"""
+    global tts
+    if tts is None:
+        from utils.tts_service import create_tts_worker
+        tts = create_tts_worker(get_config_manager().config, rate=150, volume=1.0, voice_index=0)
+    return tts
 
-def select_input_mode():
+async def select_input_mode(console):
     """Select between text and voice input modes"""
     while True:
         print("\nSelect input mode:")
         print("1. Text input")
         print("2. Voice input")
-        choice = input("Your choice (1/2): ").strip()
+        choice = (await console.readline("Your choice (1/2): ")).strip()
         if choice in ["1", "2"]:
             return int(choice)
         print("Invalid choice, please try again.")
 
+def warm_up_tts():
+    """Start the TTS worker and wait for its engine to load"""
+    worker = get_tts()
+    worker.start()
+    return worker.ready.wait(30) and worker.engine is not None
+
+def start_warm_ups():
+    """Start every subsystem warm-up concurrently"""
+    ai = get_assistant()
+    startup = StartupOrchestrator()
+    startup.add("ip", ai.init_system)
+    startup.add("memory", lambda: ai.memory_manager)
+    if ai.config.get("llm_warmup", True):
+        from utils.query import warm_up_llm
+        startup.add("llm", functools.partial(warm_up_llm, ai.config, ai.config.get('llm_model', 'gpt-3.5-turbo')))
+    if speech_enabled:
+        startup.add("tts", warm_up_tts)
+    return startup
+
+def start_auto_save():
+    """Start background memory checkpoints; SIGTERM shuts down (and flushes) like Ctrl+C"""
+    install_signal_handlers()
+    get_auto_saver().start()
+
+async def stop_auto_save():
+    """Stop background checkpoints, write what is left and close the memory namespaces"""
+    await get_auto_saver().stop()
+    await asyncio.to_thread(get_memory_store().close)  # Saves vector files and ANN indexes
+
+def report_startup(startup):
+    """Log the startup timeline once every warm-up has finished"""
+    async def report():
+        await startup.wait()
+        logger.info("Startup timeline:\n" + startup.format_timeline())
+    return asyncio.ensure_future(report())
+
 def say(text):
-    """Output text response and speak it"""
+    """Output text response and queue it for speech without blocking"""
     print(f"AI: {text}")
-    engine.say(text)
-    engine.runAndWait()
-
-async def process_tool_result(tool_name: str, result: str, user_input: str):
-    """Process tool result through AI if needed"""
-    if tool_name in DYNAMIC_TOOLS:
-        all_texts = memory_manager.getItems()
-        ai_response = await query_llm(
-            prompt=user_input,
-            answer=result,  # Pass the tool result as context
-            system_ip=system_ip or "unknown",
-            config=config,
-            model=config.get('llm_model', 'gpt-3.5-turbo'),
-            system_prompt=system_prompt,
-            current_tool=tool_name,
-            memory_texts=all_texts
+    turn = current_turn()
+    if not speech_enabled:
+        if turn is not None:
+            turn.finish("output")
+        return
+
+    # The span ends when playback starts, usually after the turn's span
+    tts_span = get_tracer().start_span("tts", chars=len(text))
+
+    def on_start():
+        if tts_span is not None:
+            tts_span.end()
+        if turn is not None:
+            turn.finish("tts_start")
+
+    if not get_tts().speak(text, on_start=on_start):
+        # Nothing to speak
+        if tts_span is not None:
+            tts_span.end()
+        if turn is not None:
+            turn.finish()
+
+async def handleAI(user_input, ai_response=None):
+    turn = current_turn()
+    with turn_span(user_input, speculative=ai_response is not None):
+        # Process input and get AI response (unless it was already prefilled)
+        response = await get_assistant().respond(user_input, ai_response)
+        if response:
+            say(response)
+            return
+        if response is None:
+            print("Failed to get response from AI.")
+
+    if turn is not None:
+        turn.finish()
+
+async def handleVoiceTurn(user_input, timings, speculator=None):
+    """Handle a final transcript, timing the turn from the STT timestamps"""
+    turn = start_turn("voice", started_at=timings.get("wakeword", timings.get("recording_stop", timings["final"])))
+    if "wakeword" in timings and "recording_stop" in timings:
+        turn.mark("speech", timings["recording_stop"])
+    turn.mark("stt_final", timings["final"])
+
+    ai_response = None
+    if speculator:
+        hits, failures = speculator.hits, speculator.failures
+        ai_response = await speculator.resolve(user_input)
+        if speculator.hits > hits:
+            mark("llm_speculative")
+        if speculator.failures > failures:
+            # The query was already made; handleAI would only repeat it
+            print("Failed to get response from AI.")
+            turn.finish()
+            return turn
+    await handleAI(user_input, ai_response)
+    return turn
+
+def create_speculator():
+    """Speculative LLM query on stable partial transcripts, if enabled"""
+    ai = get_assistant()
+    if ai.config.get("speculative_prefill", False):
+        from utils.speculative import SpeculativeQuery
+        return SpeculativeQuery(
+            ai.query_ai,
+            min_words=int(ai.config.get("speculative_min_words", 3)),
+            debounce=float(ai.config.get("speculative_debounce_ms", 150)) / 1000,
+            # Abandoned speculations keep their slot until the request ends; queue them behind final queries
+            speculate=functools.partial(ai.query_ai, priority=FOLLOW_UP)
         )
-        if ai_response:
-            response = await execute_response(
-                ai_response,
-                user_input,
-                {
-                    "secrets": secrets,
-                    "system_ip": system_ip or "unknown",
-                },
-                dynamic_tools=DYNAMIC_TOOLS
-            )
-            return response if response else result
-    return result
-
-async def handleAI(user_input):
-    # Process input and get AI response
-    all_texts = memory_manager.getItems()
-
-    ai_response = await query_llm(
-        prompt=user_input,
-        memory_texts=all_texts,
-        system_ip=system_ip or "unknown",
-        config=config,
-        model=config.get('llm_model', 'gpt-3.5-turbo'),
-        system_prompt=system_prompt
+    return None
+
+async def replay_main(path, speed, report_path=None):
+    """Run WAV files through STT -> handleAI -> TTS (null sink) and report latency"""
+    from utils.audio_replay import NullTextToSpeechWorker, find_wav_files, replay
+    from utils.stt_service import SpeechToTextService
+
+    global tts
+    tts = NullTextToSpeechWorker()
+    tts.start()
+    config = get_assistant().config
+    await get_assistant().init_system()
+    start_auto_save()
+
+    files = find_wav_files(path)
+    if not files:
+        print(f"No WAV files found: {path}")
+        return
+
+    speculator = create_speculator()
+    stt = SpeechToTextService(
+        model=config.get("whisper_model_type", "base"),
+        wake_words="",  # Recordings are replayed without a wake word
+        language="en",
+        on_partial=speculator.on_partial if speculator else None,
+        recorder_options={"use_microphone": False, "spinner": False}
     )
+    try:
+        report = await replay(
+            files,
+            stt,
+            lambda text, timings: handleVoiceTurn(text, timings, speculator),
+            tts=tts,
+            speed=speed
+        )
+    finally:
+        stt.stop()
+        tts.stop()
+        await stop_auto_save()
 
-    # Handle AI response
-    if ai_response:
-        response = await execute_response(
-            ai_response,
-            user_input,
-            {
-                "secrets": secrets,
-                "system_ip": system_ip or "unknown",
-            },
-            dynamic_tools=DYNAMIC_TOOLS  # Pass the dynamic tools list
+    print(json.dumps(report["summary"], indent=2))
+    if report_path:
+        with open(report_path, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Replay report written to {report_path}")
+
+async def serve_main(host=None, port=None):
+    """Serve the assistant over HTTP and WebSocket (no audio)"""
+    from utils.server import serve
+
+    ai = get_assistant()
+    config = ai.config
+    start_auto_save()
+    try:
+        await serve(
+            ai,
+            get_memory_store(),
+            host=host or config.get("server_host", "127.0.0.1"),
+            port=port or int(config.get("server_port", 8080))
         )
-        if response:
-            say(response)
-    else:
-        print("Failed to get response from AI.")
+    except asyncio.CancelledError:
+        pass
+    finally:
+        print("\nShutting down server...")
+        await stop_auto_save()
+
+async def batch_main(input_path, output_path, concurrency=None, resume=True):
+    """Run a JSONL file of prompts through the assistant (no audio)"""
+    from utils.batch import BatchRunner
+
+    ai = get_assistant()
+    await ai.init_system()
+    runner = BatchRunner(
+        ai,
+        get_memory_store(),
+        concurrency=concurrency or int(ai.config.get("batch_concurrency", 4))
+    )
+    start_auto_save()
+    try:
+        summary = await runner.run(input_path, output_path, resume=resume)
+        print(json.dumps(summary, indent=2))
+        print(f"Batch results written to {output_path}")
+    finally:
+        await stop_auto_save()
 
-async def main():
+async def main(text_only=False):
     try:
-        global input_mode, memory_manager
-        
-        # Initialize system
-        await init_system()
-        print("System initialized")
+        global input_mode, speech_enabled
+
+        # Warm up the IP lookup, memory, LLM and TTS concurrently while the user picks a mode
+        config = get_assistant().config
+        speech_enabled = not text_only
+        startup = start_warm_ups()
+        report_startup(startup)
+        start_auto_save()
         print("\nAI Assistant is ready!")
-        
+
         # Select input mode
-        input_mode = select_input_mode()
+        console = AsyncConsole()  # Reads lines on a thread, so the loop stays live while waiting
+        input_mode = 1 if text_only else await select_input_mode(console)
 
+        stt = None
+        speculator = None
         if input_mode == 2:
+            # Load the STT stack while the microphone is being chosen
+            startup.add("stt_import", lambda: importlib.import_module("RealtimeSTT"))
+            import speech_recognition as sr
+            from utils.stt_service import SpeechToTextService
+
             print("Voice input mode selected. Please select the microphone you want to use.")
             for i, device in enumerate(sr.Microphone.list_microphone_names()):
                 print(f"{i+1}. {device}")
-            choice = int(input("Your choice: "))
-        
+            choice = int(await console.readline("Your choice: "))
+
+            # Optionally start the LLM query on stable partial transcripts
+            speculator = create_speculator()
+
+            # Load the speech-to-text model once; it keeps listening between turns
+            stt = SpeechToTextService(
+                model=config.get("whisper_model_type", "base"),
+                wake_words=config.get("wake_words", "jarvis"),
+                language="en",
+                input_device_index=choice-1,
+                on_wakeword=get_tts().cancel,  # Barge-in: stop speaking when the wake word is heard
+                on_partial=speculator.on_partial if speculator else None
+            )
+            stt.start()
+            startup.add("stt", lambda: stt.ready.wait())
+            print(f"Say '{config.get('wake_words', 'jarvis')}' before speaking.")
+
         # Clean program exit with Ctrl+C
         while True:
             try:
                 if input_mode == 1:
-                    user_input = input("You: ").strip()
+                    user_input = (await console.readline("You: ")).strip()
+                    if user_input == "/latency":
+                        print(get_latency_tracker().format_summary())
+                        continue
+                    if user_input == "/startup":
+                        print(startup.format_timeline())
+                        continue
+                    if user_input == "/llm":
+                        print(get_llm_scheduler().format_metrics())
+                        continue
+                    if user_input == "/autosave":
+                        print(get_auto_saver().format_metrics())
+                        continue
+                    if user_input == "/forget":
+                        get_assistant().history.clear()
+                        print("Conversation history cleared.")
+                        continue
+                    await startup.wait("ip")  # The first turn needs the IP context
+                    if tts is not None:
+                        tts.cancel()  # New input interrupts the previous answer
+                    start_turn("text")
                     await handleAI(user_input)
                 else:
-                    print("Wait until it says 'say jarvis' before speaking.")
-                    recorder = AudioToTextRecorder(
-                        model=config.get("whisper_model_type", "base"), 
-                        wake_words=config.get("wake_words", ["jarvis"]), 
-                        language="en",
-                        input_device_index=choice-1
-                    )
-                    await handleAI(recorder.text())
-            except KeyboardInterrupt:
+                    user_input = await stt.get()
+                    await startup.wait("ip")
+                    await handleVoiceTurn(user_input, stt.last_timings, speculator)
+            except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
+                # Ctrl+C cancels the awaiting task; end of input closes the session
                 print("\nShutting down program...")
-                del memory_manager  # Call MemoryManager's __del__ method
+                if stt is not None:
+                    stt.stop()
+                if tts is not None:
+                    tts.stop()
+                await stop_auto_save()  # Write the memory changes since the last checkpoint
                 break
-                    
+
     except Exception as e:
         print(f"An error occurred while starting the program: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="AI assistant")
+    parser.add_argument("--text", action="store_true", help="Text-only mode: no speech input or output, no audio libraries")
+    parser.add_argument("--replay", metavar="PATH", help="Replay a WAV file or directory through the voice pipeline")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay speed, 1 = real time, 0 = as fast as possible")
+    parser.add_argument("--replay-report", metavar="FILE", help="Write the replay report as JSON")
+    parser.add_argument("--serve", action="store_true", help="Serve the assistant over HTTP and WebSocket")
+    parser.add_argument("--host", help="Server interface (default: server_host from config.yaml)")
+    parser.add_argument("--port", type=int, help="Server port (default: server_port from config.yaml)")
+    parser.add_argument("--batch", metavar="FILE", help="Run a JSONL file of prompts and exit")
+    parser.add_argument("--batch-output", metavar="FILE", help="JSONL results file (default: <input>.results.jsonl)")
+    parser.add_argument("--concurrency", type=int, help="Prompts in flight in batch mode (default: batch_concurrency from config.yaml)")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the batch results instead of skipping completed lines")
+    args = parser.parse_args()
+
+    # Pick up config.yaml edits while running (the watcher thread is a daemon)
+    config_manager = get_config_manager()
+    logger.configure(config_manager.config)
+    config_manager.subscribe(lambda old, new: logger.configure(new))
+    if config_manager.get_config('config_reload', True):
+        config_manager.start_watching(config_manager.get_config('config_reload_interval', 2.0))
+
+    if args.replay:
+        asyncio.run(replay_main(args.replay, args.replay_speed, args.replay_report))
+    elif args.batch:
+        output_path = args.batch_output or os.path.splitext(args.batch)[0] + ".results.jsonl"
+        try:
+            asyncio.run(batch_main(args.batch, output_path, args.concurrency, resume=not args.no_resume))
+        except KeyboardInterrupt:
+            print(f"\nInterrupted, rerun to resume from {output_path}")
+    elif args.serve:
+        try:
+            asyncio.run(serve_main(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        try:
+            asyncio.run(main(text_only=args.text))
+        except KeyboardInterrupt:
+            pass  # Already shut down cleanly inside main()
@@ -0,0 +1,23 @@
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+
+# Add main directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.logger
+
+# Logs, latency records and traces of test runs go to a temporary directory
+# instead of logs/ (removed after the logger has shut down)
+LOG_DIR = tempfile.mkdtemp(prefix="assistant-test-logs-")
+atexit.register(shutil.rmtree, LOG_DIR, True)
+
+utils.logger._logger_instance = utils.logger.CustomLogger(LOG_DIR)
+
+import utils.latency  # Modules below log, so the logger must be set first
+import utils.tracing
+
+utils.latency._latency_tracker = utils.latency.LatencyTracker(os.path.join(LOG_DIR, "latency.jsonl"))
+utils.tracing._tracer = utils.tracing.Tracer(os.path.join(LOG_DIR, "traces.jsonl"))
@@ -9,10 +9,38 @@ from typing import List, Type
 # Add main directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Keep test logs out of logs/ (before any module creates the logger)
+import conftest
+
 # Import test modules
 from test_query import TestQueryLLM
 from test_memory_manager import TestMemoryManager
 from test_execute_response import TestExecuteResponse
+from test_memory_store import TestMemoryStore
+from test_embedding_store import TestEmbeddingStore
+from test_ann_index import TestIVFFlatIndex
+from test_eviction import TestEviction
+from test_memory_db import TestMemoryDB
+from test_stt_service import TestSpeechToTextService
+from test_tts_service import TestTextToSpeechWorker
+from test_audio_cache import TestAudioCache
+from test_speculative import TestSpeculativeQuery
+from test_latency import TestLatency
+from test_audio_replay import TestAudioReplay
+from test_startup import TestStartup
+from test_console import TestAsyncConsole
+from test_startup_orchestrator import TestStartupOrchestrator
+from test_server import TestAssistantServer
+from test_batch import TestBatchRunner
+from test_llm_scheduler import TestLLMScheduler
+from test_tool_registry import TestToolRegistry
+from test_plugins import TestPlugins
+from test_config_manager import TestConfigManager
+from test_history import TestConversationHistory
+from test_autosave import TestAutoSave
+from test_logger import TestLogger, TestDailyRotatingFileHandler
+from test_mock_openai import TestMockOpenAIServer
+from test_tracing import TestTracing
 
 class AsyncioTestRunner:
     """Custom test runner for asynchronous tests"""
@@ -120,7 +148,33 @@ def run_tests(
     test_cases = [
         TestQueryLLM,
         TestMemoryManager,
-        TestExecuteResponse
+        TestExecuteResponse,
+        TestMemoryStore,
+        TestEmbeddingStore,
+        TestIVFFlatIndex,
+        TestEviction,
+        TestMemoryDB,
+        TestSpeechToTextService,
+        TestTextToSpeechWorker,
+        TestAudioCache,
+        TestSpeculativeQuery,
+        TestLatency,
+        TestAudioReplay,
+        TestStartup,
+        TestAsyncConsole,
+        TestStartupOrchestrator,
+        TestAssistantServer,
+        TestBatchRunner,
+        TestLLMScheduler,
+        TestToolRegistry,
+        TestPlugins,
+        TestConfigManager,
+        TestConversationHistory,
+        TestAutoSave,
+        TestLogger,
+        TestDailyRotatingFileHandler,
+        TestMockOpenAIServer,
+        TestTracing
     ]
 
     # Create and run test runner
@@ -0,0 +1,70 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from utils.ann_index import IVFFlatIndex
+
+class TestIVFFlatIndex(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        rng = np.random.default_rng(42)
+        self.vectors = rng.standard_normal((3000, 32)).astype(np.float32)
+        self.vectors /= np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        self.index = IVFFlatIndex(32, nlist=16, nprobe=16, train_size=1000)
+
+    def test_untrained_search_is_exact(self):
+        """Brute-force search before training test"""
+        self.index.add(range(100), self.vectors[:100])
+        self.assertFalse(self.index.is_trained)
+
+        results = self.index.search(self.vectors[7], k=1)
+        self.assertEqual(results[0][0], 7)
+        self.assertAlmostEqual(results[0][1], 1.0, places=5)
+
+    def test_training_and_recall(self):
+        """Full probe recall after training test"""
+        self.index.add(range(3000), self.vectors)
+        self.assertTrue(self.index.is_trained)
+        self.assertEqual(len(self.index), 3000)
+
+        # Scanning every cell must match exact search
+        for query_id in (0, 1234, 2999):
+            exact = np.argsort(-(self.vectors @ self.vectors[query_id]))[:5]
+            found = [item_id for item_id, _ in self.index.search(self.vectors[query_id], k=5)]
+            self.assertEqual(found, exact.tolist())
+
+    def test_incremental_insert_and_delete(self):
+        """Insert, replace and delete test"""
+        self.index.add(range(2000), self.vectors[:2000])
+        self.index.add([2000], self.vectors[2000:2001])
+        self.assertEqual(self.index.search(self.vectors[2000], k=1)[0][0], 2000)
+
+        self.assertTrue(self.index.remove(2000))
+        self.assertFalse(self.index.remove(2000))
+        self.assertNotEqual(self.index.search(self.vectors[2000], k=1)[0][0], 2000)
+
+        # Replacing an id keeps a single entry
+        self.index.add([5], self.vectors[2001:2002])
+        self.assertEqual(len(self.index), 2000)
+        self.assertEqual(self.index.search(self.vectors[2001], k=1)[0][0], 5)
+
+    def test_save_load(self):
+        """Persistence test"""
+        self.index.add(range(1500), self.vectors[:1500])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'index.npz')
+            self.index.save(path)
+            loaded = IVFFlatIndex.load(path)
+
+        self.assertEqual(len(loaded), 1500)
+        self.assertEqual(loaded.nlist, self.index.nlist)
+        self.assertEqual(
+            loaded.search(self.vectors[42], k=3),
+            self.index.search(self.vectors[42], k=3)
+        )
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
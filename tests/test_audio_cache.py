@@ -0,0 +1,72 @@
+import unittest
+import os
+import tempfile
+from utils.audio_cache import AudioCache
+
+class TestAudioCache(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, 'tts_cache')
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        self.temp_dir.cleanup()
+
+    def render(self, cache, key, size=100):
+        """Write a fake rendered file and add it to the cache"""
+        temp_path = cache.temp_path(key)
+        with open(temp_path, 'wb') as file:
+            file.write(b'x' * size)
+        return cache.put(key, temp_path)
+
+    def test_content_addressed(self):
+        """Keys depend on the text and the voice"""
+        self.assertEqual(AudioCache.key("Hello sir."), AudioCache.key("Hello sir."))
+        self.assertNotEqual(AudioCache.key("Hello sir."), AudioCache.key("Hello sir!"))
+        self.assertNotEqual(AudioCache.key("Hello", "150:1.0:0"), AudioCache.key("Hello", "200:1.0:0"))
+
+    def test_hit_and_miss(self):
+        """Cache lookup test"""
+        cache = AudioCache(self.cache_dir)
+        key = AudioCache.key("Browser opened successfully")
+        self.assertIsNone(cache.get(key))
+
+        path = self.render(cache, key)
+        self.assertEqual(cache.get(key), path)
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        """Least recently used audio is deleted past the size limit"""
+        cache = AudioCache(self.cache_dir, max_bytes=250)
+        first, second, third = (AudioCache.key(text) for text in ("one", "two", "three"))
+        self.render(cache, first)
+        self.render(cache, second)
+        cache.get(first)  # "two" is now the least recently used
+        self.render(cache, third)
+
+        self.assertIsNotNone(cache.get(first))
+        self.assertIsNone(cache.get(second))
+        self.assertIsNotNone(cache.get(third))
+        self.assertLessEqual(cache.size(), 250)
+        self.assertFalse(os.path.exists(cache.path(second)))
+
+    def test_reopen(self):
+        """Cached audio survives a restart; unfinished renders are removed"""
+        cache = AudioCache(self.cache_dir)
+        key = AudioCache.key("Let me check that for you, sir")
+        self.render(cache, key)
+        with open(cache.temp_path(AudioCache.key("unfinished")), 'wb') as file:
+            file.write(b'x')
+
+        reopened = AudioCache(self.cache_dir)
+        self.assertEqual(len(reopened), 1)
+        self.assertIsNotNone(reopened.get(key))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
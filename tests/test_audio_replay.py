@@ -0,0 +1,114 @@
+import unittest
+import os
+import wave
+import asyncio
+import tempfile
+import numpy as np
+from utils.audio_replay import (
+    NullTextToSpeechWorker, feed_audio, find_wav_files, load_wav, replay_file, summarize
+)
+from utils.latency import TurnTimer
+
+def write_wav(path, seconds=1.0, rate=8000, channels=2):
+    """Write a 16-bit sine wave"""
+    samples = (np.sin(np.linspace(0, 440 * 2 * np.pi * seconds, int(rate * seconds))) * 10000).astype("<i2")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.repeat(samples, channels).tobytes())
+
+class FakeRecorder:
+    def __init__(self):
+        self.fed = bytearray()
+
+    def feed_audio(self, chunk):
+        self.fed.extend(chunk)
+
+class FakeSpeechToText:
+    """Emits one transcript once the recorder has been fed"""
+
+    def __init__(self, loop):
+        self.recorder = self
+        self.last_timings = {}
+        self.loop = loop
+        self.transcripts = asyncio.Queue()
+        self.fed = bytearray()
+
+    def feed_audio(self, chunk):
+        if not self.fed:
+            self.loop.call_soon_threadsafe(self.transcripts.put_nowait, "hello there")
+        self.fed.extend(chunk)
+
+    async def get(self):
+        text = await self.transcripts.get()
+        self.last_timings = {"final": 1.0}
+        return text
+
+class TestAudioReplay(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.wav_path = os.path.join(self.temp_dir.name, 'utterance.wav')
+        write_wav(self.wav_path)
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        self.temp_dir.cleanup()
+
+    def test_load_wav_converts_to_16k_mono(self):
+        """WAV files are converted to 16 kHz mono 16-bit PCM"""
+        pcm, duration = load_wav(self.wav_path)
+        self.assertAlmostEqual(duration, 1.0, places=2)
+        self.assertAlmostEqual(len(pcm), 32000, delta=4)
+
+    def test_find_wav_files(self):
+        """A directory expands to its WAV files"""
+        write_wav(os.path.join(self.temp_dir.name, 'another.wav'))
+        self.assertEqual(
+            [os.path.basename(path) for path in find_wav_files(self.temp_dir.name)],
+            ['another.wav', 'utterance.wav']
+        )
+        self.assertEqual(find_wav_files(self.wav_path), [self.wav_path])
+
+    def test_feed_audio_appends_silence(self):
+        """Audio is fed in chunks followed by silence"""
+        recorder = FakeRecorder()
+        feed_audio(recorder, b'\x01\x00' * 1000, speed=0, tail_silence=0.5)
+        self.assertEqual(len(recorder.fed), 2000 + 16000)
+        self.assertEqual(bytes(recorder.fed[2000:]), bytes(16000))
+
+    def test_replay_file_report(self):
+        """A replayed file produces transcripts, turns and a real-time factor"""
+        tts = NullTextToSpeechWorker()
+        handled = []
+
+        async def run_turn(text, timings):
+            handled.append(text)
+            turn = TurnTimer("voice", started_at=0.0)
+            turn.mark("llm", at=0.25)
+            turn.finished = True
+            tts.speak("Spoken into the null sink.")
+            return turn
+
+        async def scenario():
+            stt = FakeSpeechToText(asyncio.get_running_loop())
+            return await replay_file(self.wav_path, stt, run_turn, tts=tts, speed=0, settle=1.0)
+
+        report = asyncio.run(scenario())
+        tts.stop()
+        self.assertEqual(handled, ["hello there"])
+        self.assertEqual(report["transcripts"], ["hello there"])
+        self.assertEqual(report["turns"][0]["stages"], {"llm": 250.0})
+        self.assertGreater(report["real_time_factor"], 0)
+        self.assertLess(report["wall_seconds"], 0.5)  # The settle wait is not counted
+
+        summary = summarize([report])
+        self.assertEqual(summary["turns"], 1)
+        self.assertEqual(summary["stages"]["llm"]["p95"], 250.0)
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,169 @@
+import unittest
+import os
+import signal
+import asyncio
+import tempfile
+import threading
+from unittest.mock import patch
+from utils.memory_db import close_all
+from utils.memory_manager import MemoryManager, MemoryStore
+from utils.autosave import AutoSaver, install_signal_handlers
+
+class TestAutoSave(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'memory.db')
+        self.store = MemoryStore(max_items=3, db_path=self.db_path)
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        close_all()
+        self.temp_dir.cleanup()
+
+    def stored(self, namespace="default"):
+        """Items of a namespace as written to the database"""
+        reloaded = MemoryManager(namespace=namespace, db_path=self.db_path)
+        items = list(reloaded.getItems())
+        reloaded.clear()
+        return items
+
+    def test_checkpoint_writes_only_changes(self):
+        """Additions, evictions and recall hits are written incrementally"""
+        manager = self.store.get()
+        manager.addItem("first")
+        manager.addItem("second")
+        self.assertEqual(manager.pending_changes(), 2)
+        self.assertEqual(manager.checkpoint(), 2)
+        self.assertEqual(manager.checkpoint(), 0)
+
+        manager.addItem("third")
+        manager.addItem("fourth")  # Evicts "first"
+        manager.recordHits([manager.ids[0], manager.ids[-1]])
+        # One delete, two inserts and the hit on "second"; the hit on "fourth" goes into its insert
+        self.assertEqual(manager.checkpoint(), 4)
+        self.assertEqual(self.stored(), ["second", "third", "fourth"])
+
+        manager.addItem("fifth")  # Evicts "second" ...
+        manager.deleteItem(len(manager.ids) - 1)  # ... and "fifth" is deleted before ever being written
+        self.assertEqual(manager.checkpoint(), 1)
+        self.assertEqual(self.stored(), ["third", "fourth"])
+
+    def test_flush_on_change_count(self):
+        """Reaching max_changes writes before the interval"""
+        saver = AutoSaver(self.store, interval=60, max_changes=3)
+
+        async def scenario():
+            saver.start()
+            manager = self.store.get()
+            for text in ("a", "b", "c"):
+                manager.addItem(text)
+            await asyncio.sleep(0.1)
+            pending = self.store.pending_changes()
+            await saver.stop()
+            return pending
+
+        with patch('utils.autosave.MAX_POLL_INTERVAL', 0.01):
+            pending = asyncio.run(scenario())
+
+        self.assertEqual(pending, 0)
+        metrics = saver.metrics()
+        self.assertEqual(metrics["flushes"], 2)  # The change-count flush and the (empty) shutdown flush
+        self.assertEqual(metrics["rows"], 3)
+        self.assertGreater(metrics["flush_max_ms"], 0)
+        self.assertEqual(self.stored(), ["a", "b", "c"])
+
+    def test_flush_on_interval(self):
+        """A pending change is written once the interval has passed"""
+        saver = AutoSaver(self.store, interval=0.05, max_changes=100)
+
+        async def scenario():
+            saver.start()
+            self.store.get().addItem("lonely")
+            await asyncio.sleep(0.2)
+            return self.store.pending_changes(), saver.metrics()["flushes"]
+
+        pending, flushes = asyncio.run(scenario())
+        self.assertEqual((pending, flushes), (0, 1))
+
+    def test_disabled_still_flushes_on_stop(self):
+        """auto_save off: nothing is written until stop()"""
+        saver = AutoSaver(self.store, interval=0.05, max_changes=1, enabled=False)
+
+        async def scenario():
+            saver.start()
+            self.store.get().addItem("kept")
+            await asyncio.sleep(0.15)
+            pending = self.store.pending_changes()
+            await saver.stop()
+            return pending
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+        self.assertEqual(self.stored(), ["kept"])
+
+    def test_stop_during_slow_flush(self):
+        """stop() waits for a flush stuck behind a slow write instead of cancelling it"""
+        saver = AutoSaver(self.store, interval=60, max_changes=1)
+        manager = self.store.get()
+        release = threading.Event()
+
+        async def scenario():
+            saver.start()
+            manager.db.submit_write(lambda conn: release.wait(5))
+            manager.addItem("slow")
+            await asyncio.sleep(0.1)  # The change-count flush is now waiting on the writer
+            asyncio.get_running_loop().call_later(0.1, release.set)
+            return await asyncio.wait_for(saver.stop(), 5)
+
+        with patch('utils.autosave.MAX_POLL_INTERVAL', 0.01):
+            asyncio.run(scenario())
+
+        self.assertTrue(manager.db._writer.is_alive())
+        self.assertEqual(self.store.pending_changes(), 0)
+        self.assertEqual(saver.metrics()["rows"], 1)
+        self.assertEqual(self.stored(), ["slow"])
+
+    def test_cancelled_checkpoint_requeues_changes(self):
+        """Changes taken by a cancelled checkpoint are written by the next one, once"""
+        manager = self.store.get()
+        release = threading.Event()
+
+        async def scenario():
+            manager.db.submit_write(lambda conn: release.wait(5))
+            manager.addItem("requeued")
+            task = asyncio.create_task(manager.checkpointAsync())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            release.set()
+            return manager.pending_changes(), await manager.checkpointAsync()
+
+        self.assertEqual(asyncio.run(scenario()), (1, 1))
+        self.assertEqual(self.stored(), ["requeued"])
+
+    @unittest.skipUnless(hasattr(signal, "SIGTERM") and os.name == "posix", "POSIX signals")
+    def test_sigterm_cancels_main_task_and_flushes(self):
+        """SIGTERM cancels the main task, whose shutdown path writes pending changes"""
+        saver = AutoSaver(self.store, enabled=False)
+
+        async def main():
+            install_signal_handlers()
+            saver.start()
+            self.store.get().addItem("saved on SIGTERM")
+            asyncio.get_running_loop().call_later(0.05, os.kill, os.getpid(), signal.SIGTERM)
+            try:
+                await asyncio.sleep(5)
+                return "not cancelled"
+            except asyncio.CancelledError:
+                await saver.stop()
+                return "cancelled"
+
+        self.assertEqual(asyncio.run(main()), "cancelled")
+        self.assertEqual(self.stored(), ["saved on SIGTERM"])
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,166 @@
+import unittest
+import os
+import json
+import asyncio
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+from utils.batch import BatchRunner, read_prompts, load_completed
+from utils.latency import current_turn
+
+class FakeAssistant:
+    """Assistant answering after a delay, with a tool call and token usage"""
+    def __init__(self):
+        self.config, self.secrets, self.system_prompt = {}, {}, ""
+        self.dynamic_tools, self.system_ip = [], None
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def respond(self, user_input, on_event=None, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.05)
+            current_turn().annotate("usage", {"total_tokens": len(user_input)})
+            if user_input == "fail":
+                return None
+            if on_event:
+                on_event({"type": "tool_call", "id": "call_1", "name": "echo", "arguments": "{}"})
+                on_event({"type": "tool_result", "id": "call_1", "name": "echo", "result": user_input})
+            return user_input.upper()
+        finally:
+            self.in_flight -= 1
+
+class SessionAssistant(FakeAssistant):
+    """Assistant bound to a memory namespace, making two concurrent tool calls per turn"""
+    def __init__(self, memory_manager=None):
+        super().__init__()
+        self.memory_manager = memory_manager
+        self.prompts = []
+
+    def spawn(self, memory_manager):
+        return SessionAssistant(memory_manager)
+
+    async def respond(self, user_input, on_event=None, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.prompts.append(user_input)
+        try:
+            await asyncio.sleep(0.02)
+            on_event({"type": "tool_call", "id": "a", "name": "echo", "arguments": '{"n": 1}'})
+            on_event({"type": "tool_call", "id": "b", "name": "echo", "arguments": '{"n": 2}'})
+            on_event({"type": "tool_result", "id": "b", "name": "echo", "result": "two"})
+            on_event({"type": "tool_result", "id": "a", "name": "echo", "result": "one"})
+            return f"{self.memory_manager.namespace}: {user_input}"
+        finally:
+            self.in_flight -= 1
+
+class FakeMemoryStore:
+    """Store handing out a fresh manager per call, as if namespaces were evicted between items"""
+    def __init__(self):
+        self.pins = {}
+
+    async def get_async(self, user_id=None, session_id=None, pin=False):
+        namespace = f"{user_id}:{session_id}"
+        if pin:
+            self.pins[namespace] = self.pins.get(namespace, 0) + 1
+        return SimpleNamespace(namespace=namespace)
+
+    def unpin(self, namespace):
+        self.pins[namespace] -= 1
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.temp_dir.name, 'prompts.jsonl')
+        self.output_path = os.path.join(self.temp_dir.name, 'results.jsonl')
+        with open(self.input_path, 'w') as file:
+            for i in range(10):
+                file.write(json.dumps({"id": f"p{i}", "prompt": f"prompt {i}"}) + "\n")
+            file.write('"fail"\n\n{not json\n')
+        # Keep batch turns out of logs/latency.jsonl
+        self.tracker = patch('utils.latency.get_latency_tracker')
+        self.tracker.start()
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        self.tracker.stop()
+        self.temp_dir.cleanup()
+
+    def read_output(self):
+        with open(self.output_path) as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    def test_read_prompts(self):
+        """Objects and strings are parsed, blank lines skipped, bad lines flagged"""
+        items = list(read_prompts(self.input_path))
+        self.assertEqual(len(items), 12)
+        self.assertEqual(items[0], (1, {"id": "p0", "prompt": "prompt 0"}))
+        self.assertEqual(items[10], (11, {"prompt": "fail"}))
+        self.assertEqual(items[11][0], 13)
+        self.assertIn("error", items[11][1])
+
+    def test_bounded_concurrency_and_records(self):
+        """At most `concurrency` prompts run at once; every line gets a record"""
+        assistant = FakeAssistant()
+        summary = asyncio.run(BatchRunner(assistant, concurrency=3).run(self.input_path, self.output_path))
+
+        self.assertEqual(assistant.max_in_flight, 3)
+        self.assertEqual(summary["items"], 12)
+        self.assertEqual(summary["ok"], 10)
+        self.assertEqual(summary["errors"], 2)
+        self.assertEqual(summary["tool_calls"], 10)
+
+        records = {record["line"]: record for record in self.read_output()}
+        self.assertEqual(records[1]["id"], "p0")
+        self.assertEqual(records[1]["response"], "PROMPT 0")
+        self.assertEqual(records[1]["usage"], {"total_tokens": 8})
+        self.assertEqual(records[1]["tool_calls"], [{"id": "call_1", "name": "echo", "arguments": "{}", "result": "prompt 0"}])
+        self.assertGreaterEqual(records[1]["latency_ms"], 40)
+        self.assertEqual(records[11]["error"], "Failed to get response from AI")
+        self.assertTrue(records[13]["error"].startswith("Invalid JSON"))
+
+    def test_sessions_run_in_order_on_pinned_namespaces(self):
+        """A session's items run one at a time in input order; results are matched to their calls"""
+        with open(self.input_path, 'w') as file:
+            for i in range(4):
+                file.write(json.dumps({"prompt": f"s{i}", "user_id": "u", "session_id": "s"}) + "\n")
+            file.write(json.dumps({"prompt": "t0", "user_id": "u", "session_id": "t"}) + "\n")
+        store = FakeMemoryStore()
+        runner = BatchRunner(SessionAssistant(), store, concurrency=5)
+        asyncio.run(runner.run(self.input_path, self.output_path))
+
+        session = runner._assistants["u:s"]
+        self.assertEqual(session.prompts, ["s0", "s1", "s2", "s3"])
+        self.assertEqual(session.max_in_flight, 1)
+        self.assertEqual(store.pins, {"u:s": 0, "u:t": 0})
+        records = {record["line"]: record for record in self.read_output()}
+        self.assertEqual(records[5]["response"], "u:t: t0")
+        self.assertEqual([(call["arguments"], call["result"]) for call in records[1]["tool_calls"]],
+                         [('{"n": 1}', "one"), ('{"n": 2}', "two")])
+
+    def test_resume_after_interruption(self):
+        """Completed lines are skipped, failed and truncated ones rerun"""
+        with open(self.output_path, 'w') as file:
+            file.write(json.dumps({"line": 1, "response": "done", "error": None}) + "\n")
+            file.write(json.dumps({"line": 2, "response": None, "error": "timeout"}) + "\n")
+            file.write('{"line": 3, "respo')  # Cut off mid-write
+        self.assertEqual(load_completed(self.output_path), {1})
+
+        assistant = FakeAssistant()
+        summary = asyncio.run(BatchRunner(assistant, concurrency=4).run(self.input_path, self.output_path))
+        self.assertEqual(summary["skipped"], 1)
+        self.assertEqual(summary["items"], 11)
+
+        with open(self.output_path) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(lines[2], '{"line": 3, "respo')  # Left as is, then ignored
+        completed = load_completed(self.output_path)
+        self.assertEqual(completed, set(range(1, 11)))
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,103 @@
+import unittest
+import os
+import time
+import tempfile
+from utils.config_manager import Config, ConfigManager
+
+CONFIG_YAML = """config:
+  - llm_model: 'model-a'
+  - timeout: 30
+  - max_vectors: 100
+  - plugin_dirs: ['plugins']
+secrets:
+  - weather_api_key: 'key'
+"""
+
+class TestConfigManager(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.temp_dir.name, 'config.yaml')
+        self.write(CONFIG_YAML)
+        self.manager = ConfigManager(self.config_path)
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        self.manager.stop_watching()
+        self.temp_dir.cleanup()
+
+    def write(self, text):
+        """Write the config file with a new modification time"""
+        with open(self.config_path, 'w') as file:
+            file.write(text)
+        stamp = time.time() + getattr(self, 'writes', 0)
+        self.writes = getattr(self, 'writes', 0) + 1
+        os.utime(self.config_path, (stamp, stamp))
+
+    def test_snapshot_is_validated_and_immutable(self):
+        """Values are merged with defaults, coerced, and read-only"""
+        config = self.manager.config
+        self.assertIsInstance(config, Config)
+        self.assertEqual(config["llm_model"], "model-a")
+        self.assertEqual(config.max_vectors, 100)
+        self.assertEqual(config.get("temperature"), 0.7)
+        self.assertEqual(config.plugin_dirs, ("plugins",))
+        self.assertEqual(config.secrets["weather_api_key"], "key")
+
+        with self.assertRaises(AttributeError):
+            config.timeout = 5
+        with self.assertRaises(TypeError):
+            config["timeout"] = 5
+
+    def test_reload_swaps_snapshot(self):
+        """A changed file installs a new snapshot; the old one is untouched"""
+        old = self.manager.config
+        self.assertFalse(self.manager.reload())
+
+        self.write(CONFIG_YAML.replace("model-a", "model-b"))
+        self.assertTrue(self.manager.reload())
+
+        new = self.manager.config
+        self.assertEqual(new.llm_model, "model-b")
+        self.assertEqual(new.version, old.version + 1)
+        self.assertEqual(old.llm_model, "model-a")
+        self.assertEqual(new.changed_keys(old), ["llm_model"])
+
+    def test_invalid_file_keeps_previous_snapshot(self):
+        """Unparsable or empty files are rejected"""
+        old = self.manager.config
+        self.write("config: [unclosed")
+        self.assertFalse(self.manager.reload())
+        self.write("")
+        self.assertFalse(self.manager.reload())
+        self.assertIs(self.manager.config, old)
+
+    def test_subscribers_get_old_and_new(self):
+        """Subscribers run after a reload; a failing one does not stop the others"""
+        calls = []
+
+        def broken(old, new):
+            raise RuntimeError("boom")
+
+        self.manager.subscribe(broken)
+        self.manager.subscribe(lambda old, new: calls.append((old.max_vectors, new.max_vectors)))
+
+        self.write(CONFIG_YAML.replace("100", "200"))
+        self.assertTrue(self.manager.reload())
+        self.assertEqual(calls, [(100, 200)])
+
+    def test_watcher_reloads_on_change(self):
+        """The watcher thread picks up file changes"""
+        self.manager.start_watching(interval=0.05)
+        self.write(CONFIG_YAML.replace("timeout: 30", "timeout: 5"))
+
+        deadline = time.monotonic() + 2
+        while self.manager.config.timeout != 5 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.manager.config.timeout, 5)
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,52 @@
+import unittest
+import io
+import os
+import asyncio
+from utils.console import AsyncConsole
+
+class TestAsyncConsole(unittest.TestCase):
+    def test_reads_lines_until_eof(self):
+        """Lines are returned without newlines, then EOFError is raised"""
+        async def scenario():
+            console = AsyncConsole(io.StringIO("hello\r\n/latency\n"))
+            lines = [await console.readline(), await console.readline()]
+            with self.assertRaises(EOFError):
+                await console.readline()
+            with self.assertRaises(EOFError):
+                await console.readline()
+            return lines
+
+        self.assertEqual(asyncio.run(scenario()), ["hello", "/latency"])
+
+    def test_loop_stays_live_while_waiting(self):
+        """Background tasks run while the console waits for input"""
+        read_fd, write_fd = os.pipe()
+
+        async def scenario():
+            ticks = 0
+
+            async def background():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.create_task(background())
+            with os.fdopen(read_fd) as stream:
+                console = AsyncConsole(stream)
+                loop = asyncio.get_running_loop()
+                loop.call_later(0.2, os.write, write_fd, b"what time is it\n")
+                line = await asyncio.wait_for(console.readline(), 5)
+                os.close(write_fd)
+            task.cancel()
+            return line, ticks
+
+        line, ticks = asyncio.run(scenario())
+        self.assertEqual(line, "what time is it")
+        self.assertGreater(ticks, 5)
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
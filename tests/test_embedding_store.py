@@ -0,0 +1,157 @@
+import unittest
+import os
+import asyncio
+import threading
+import tempfile
+import numpy as np
+from unittest.mock import MagicMock
+from utils.embedding_store import EmbeddingStore, HashingEmbedder
+from utils.memory_db import close_all
+from utils.memory_manager import MemoryManager
+
+class TestEmbeddingStore(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'default.npy')
+        self.embedder = HashingEmbedder(dim=64)
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        close_all()
+        self.temp_dir.cleanup()
+
+    def test_hashing_embedder(self):
+        """Hashing embedder output test"""
+        vectors = self.embedder(["quick brown fox", "quick brown fox", "artificial intelligence"])
+        self.assertEqual(vectors.shape, (3, 64))
+        self.assertEqual(vectors.dtype, np.dtype('float32'))
+        self.assertAlmostEqual(float(np.linalg.norm(vectors[0])), 1.0, places=5)
+        self.assertAlmostEqual(float(vectors[0] @ vectors[1]), 1.0, places=5)
+
+    def test_batched_embedding(self):
+        """Pending texts are embedded in one call per batch"""
+        embedder = MagicMock(side_effect=self.embedder, name="mock")
+        embedder.name = "mock"
+        store = EmbeddingStore(self.path, embedder=embedder, batch_size=3)
+
+        store.add(0, "first")
+        store.add(1, "second")
+        embedder.assert_not_called()
+
+        store.add(2, "third")
+        embedder.assert_called_once_with(["first", "second", "third"])
+        self.assertTrue(all(store.contains(i) for i in range(3)))
+        store.close()
+
+    def test_search(self):
+        """Similarity search test"""
+        store = EmbeddingStore(self.path, embedder=self.embedder)
+        texts = [
+            "The quick brown fox jumps over the lazy dog",
+            "Completely different text about artificial intelligence",
+            "My favourite colour is blue"
+        ]
+        for item_id, text in enumerate(texts):
+            store.add(item_id, text)
+
+        results = store.search("artificial intelligence", [0, 1, 2], k=2)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][0], 1)
+
+        store.remove(1)
+        results = store.search("artificial intelligence", [0, 1, 2], k=2)
+        self.assertNotIn(1, [item_id for item_id, _ in results])
+        store.close()
+
+    def test_reopen_maps_existing_vectors(self):
+        """Startup maps stored vectors instead of recomputing"""
+        store = EmbeddingStore(self.path, embedder=self.embedder, dtype="float16")
+        store.add(5, "remember the milk")
+        store.close()
+
+        embedder = MagicMock(side_effect=self.embedder)
+        embedder.name = self.embedder.name
+        reopened = EmbeddingStore(self.path, embedder=embedder, dtype="float16")
+        reopened.ensure([5], ["remember the milk"])
+        embedder.assert_not_called()
+        self.assertTrue(reopened.contains(5))
+        reopened.close()
+
+    def test_reopen_uses_saved_presence_mask(self):
+        """Startup reads the saved presence mask instead of scanning the vectors"""
+        store = EmbeddingStore(self.path, embedder=self.embedder)
+        for item_id, text in enumerate(["first", "second", "third"]):
+            store.add(item_id, text)
+        store.remove(1)
+        store.close()
+
+        present = np.load(store.present_path)
+        self.assertEqual(list(np.flatnonzero(present)), [0, 2])
+        present[2] = False  # Row 2 still holds a vector; the mask alone decides
+        np.save(store.present_path, present)
+
+        reopened = EmbeddingStore(self.path, embedder=self.embedder)
+        self.assertEqual([reopened.contains(i) for i in range(3)], [True, False, False])
+        reopened.close()
+
+        # Vector files without a mask are scanned once
+        os.remove(store.present_path)
+        rescanned = EmbeddingStore(self.path, embedder=self.embedder)
+        self.assertEqual([rescanned.contains(i) for i in range(3)], [True, False, True])
+        self.assertTrue(os.path.exists(store.present_path))
+        rescanned.close()
+
+    def test_memory_manager_search(self):
+        """MemoryManager search with embeddings test"""
+        store = EmbeddingStore(self.path, embedder=self.embedder)
+        manager = MemoryManager(
+            namespace="test",
+            db_path=os.path.join(self.temp_dir.name, 'memory.db'),
+            embedding_store=store
+        )
+        manager.addItem("My favourite colour is blue")
+        manager.addItem("My dog is called Rex")
+
+        self.assertEqual(manager.search("what is my dog called", k=1), ["My dog is called Rex"])
+        manager.clear()
+        store.close()
+
+    def test_async_embedding_runs_off_the_event_loop(self):
+        """addItemAsync, searchAsync and loadAsync embed in worker threads"""
+        threads = []
+
+        def embedder(texts):
+            threads.append(threading.current_thread())
+            return self.embedder(texts)
+        embedder.name = self.embedder.name
+
+        db_path = os.path.join(self.temp_dir.name, 'memory.db')
+
+        async def scenario():
+            store = EmbeddingStore(self.path, embedder=embedder, batch_size=1)
+            manager = MemoryManager(namespace="test", db_path=db_path, embedding_store=store)
+            await manager.addItemAsync("My favourite colour is blue")
+            await manager.addItemAsync("My dog is called Rex")
+            found = await manager.searchAsync("what is my dog called", k=1)
+            manager.clear()
+            store.close()
+
+            os.remove(self.path)  # Reloading embeds the stored items again
+            reloaded = MemoryManager(namespace="test", db_path=db_path,
+                                     embedding_store=EmbeddingStore(self.path, embedder=embedder), load=False)
+            await reloaded.loadAsync()
+            reloaded.clear()
+            reloaded.embedding_store.close()
+            return found, threading.current_thread()
+
+        found, loop_thread = asyncio.run(scenario())
+        self.assertEqual(found, ["My dog is called Rex"])
+        self.assertEqual(len(threads), 4)
+        self.assertNotIn(loop_thread, threads)
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,139 @@
+import unittest
+import os
+import random
+import sqlite3
+import tempfile
+from utils.eviction import AccessStats, ScoredPolicy, create_policy
+from utils.memory_manager import MemoryManager
+from utils.memory_db import close_all
+
+class TestEviction(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'memory.db')
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        close_all()
+        self.temp_dir.cleanup()
+
+    def make_stats(self):
+        """Three items added at t=0, 10, 20"""
+        stats = AccessStats()
+        for item_id in range(3):
+            stats.track(item_id, added_at=item_id * 10.0)
+        return stats
+
+    def test_fifo(self):
+        """FIFO evicts the oldest item"""
+        self.assertEqual(create_policy("fifo").select_victim([0, 1, 2], self.make_stats()), 0)
+
+    def test_lru(self):
+        """LRU evicts the least recently recalled item"""
+        stats = self.make_stats()
+        stats.hit(0, now=30.0)
+        self.assertEqual(create_policy("lru").select_victim([0, 1, 2], stats), 1)
+
+    def test_lfu(self):
+        """LFU evicts the least recalled item"""
+        stats = self.make_stats()
+        stats.hit(0, now=30.0)
+        stats.hit(0, now=31.0)
+        stats.hit(2, now=32.0)
+        self.assertEqual(create_policy("lfu").select_victim([0, 1, 2], stats), 1)
+
+    def test_scored_keeps_important_items(self):
+        """Scored policy keeps important items"""
+        stats = AccessStats()
+        stats.track(0, importance=1.0, added_at=0.0)
+        stats.track(1, importance=0.0, added_at=0.0)
+        self.assertEqual(ScoredPolicy().select_victim([0, 1], stats), 1)
+
+    def test_indexed_policies_match_full_scan(self):
+        """Incrementally indexed policies pick the same victim as scanning every item"""
+        rng = random.Random(7)
+        scored = ScoredPolicy(half_life=50.0)
+        scans = {
+            "lru": lambda ids, stats: min(ids, key=lambda i: (stats.last_access[i], i)),
+            "lfu": lambda ids, stats: min(ids, key=lambda i: (stats.recall_count[i], stats.last_access[i], i)),
+            "scored": lambda ids, stats: min(ids, key=lambda i: scored.score(i, stats, 1000.0))
+        }
+        for name, scan in scans.items():
+            policy = scored if name == "scored" else create_policy(name)
+            stats = AccessStats()
+            ids = []
+            for step in range(400):
+                action = rng.random()
+                if action < 0.4 or len(ids) < 2:
+                    ids.append(step)
+                    stats.track(step, importance=rng.choice([0.0, 0.5, rng.random()]), added_at=float(step))
+                elif action < 0.8:
+                    stats.hit(rng.choice(ids), now=float(step))
+                else:
+                    stats.forget(ids.pop(rng.randrange(len(ids))))
+                if step % 10 == 0:
+                    if name == "scored":
+                        victim = stats.victim(policy, now=1000.0)  # Fixed clock for the scan
+                    else:
+                        victim = ids[policy.select_victim(ids, stats)]
+                    self.assertEqual(victim, scan(ids, stats), f"{name} at step {step}")
+
+        # Swapping the policy rebuilds the index
+        self.assertEqual(create_policy("lru").select_victim(ids, stats), ids.index(scans["lru"](ids, stats)))
+
+    def test_unknown_policy(self):
+        """Unknown policy names fall back to FIFO"""
+        self.assertEqual(create_policy("random").name, "fifo")
+
+    def test_manager_eviction_and_hit_flush(self):
+        """MemoryManager eviction and batched hit flush test"""
+        manager = MemoryManager(
+            max_items=2,
+            namespace="test",
+            db_path=self.db_path,
+            eviction_policy=create_policy("lfu"),
+            hit_flush_size=2
+        )
+        first = manager.addItem("frequently recalled fact")
+        manager.addItem("one-off noise")
+        self.assertTrue(manager.saveToSQLite())
+
+        manager.recordHits([first])
+        self.assertEqual(len(manager.stats.dirty), 1)
+        manager.recordHits([first])
+        self.assertEqual(len(manager.stats.dirty), 1)
+
+        manager.addItem("new fact")
+        self.assertEqual(manager.getItems(), ["frequently recalled fact", "new fact"])
+
+        # Hits are flushed once hit_flush_size items are pending
+        manager.recordHits([manager.ids[1]])
+        self.assertEqual(len(manager.stats.dirty), 0)
+        manager.db.drain()
+        with sqlite3.connect(self.db_path) as conn:
+            count = conn.execute(
+                "SELECT recall_count FROM memory_items WHERE namespace = ? AND item_id = ?",
+                ("test", first)
+            ).fetchone()[0]
+        self.assertEqual(count, 2)
+        manager.clear()
+
+    def test_stats_survive_reload(self):
+        """Recall statistics and importance persistence test"""
+        manager = MemoryManager(namespace="test", db_path=self.db_path)
+        item_id = manager.addItem("important fact", importance=0.9)
+        manager.recordHits([item_id])
+        self.assertTrue(manager.saveToSQLite())
+        manager.clear()
+
+        reloaded = MemoryManager(namespace="test", db_path=self.db_path)
+        self.assertEqual(reloaded.stats.recall_count[item_id], 1)
+        self.assertAlmostEqual(reloaded.stats.importance[item_id], 0.9)
+        reloaded.clear()
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,89 @@
+import unittest
+import asyncio
+from unittest.mock import patch, AsyncMock
+from utils.assistant import Assistant
+from utils.history import ConversationHistory, estimate_tokens
+
+class TestConversationHistory(unittest.TestCase):
+    def test_turns_rendered_with_tool_results(self):
+        """A turn becomes a user and an assistant message, tool results included and shortened"""
+        history = ConversationHistory(tool_result_chars=20)
+        history.add("Weather in Paris?", "It is sunny.", [("get_weather", {"city": "Paris"}, "Sunny, 24 degrees " * 5)])
+
+        user, answer = history.messages()
+        self.assertEqual(user, {"role": "user", "content": "Weather in Paris?"})
+        self.assertEqual(answer["role"], "assistant")
+        self.assertIn('get_weather({"city": "Paris"}) returned: Sunny, 24 degrees...', answer["content"])
+        self.assertTrue(answer["content"].endswith("It is sunny."))
+
+    def test_ring_buffer_and_summary(self):
+        """Turns out of the ring buffer are summarized by topic"""
+        history = ConversationHistory(max_turns=2, token_budget=1000)
+        for i in range(4):
+            history.add(f"question {i}", f"answer {i}")
+
+        messages = history.messages()
+        self.assertEqual(len(history), 2)
+        self.assertEqual(messages[0]["role"], "system")
+        self.assertIn("question 0; question 1", messages[0]["content"])
+        self.assertEqual([message["content"] for message in messages[1:]], ["question 2", "answer 2", "question 3", "answer 3"])
+
+    def test_token_budget_keeps_newest_turns(self):
+        """Older turns beyond the budget are summarized, the newest sent verbatim"""
+        history = ConversationHistory(max_turns=10, token_budget=200)
+        for i in range(10):
+            history.add(f"question {i} " + "x" * 100, f"answer {i}")
+
+        messages = history.messages()
+        self.assertEqual(messages[0]["role"], "system")
+        self.assertEqual(messages[-1]["content"], "answer 9")
+        self.assertLessEqual(sum(estimate_tokens(message["content"]) + 4 for message in messages[1:]), 200)
+        self.assertLess(len(messages), 21)
+
+    def test_messages_cached_until_next_turn(self):
+        """The rendered prefix is reused until a turn is added or the history cleared"""
+        history = ConversationHistory()
+        history.add("hi", "hello")
+        first = history.messages()
+        self.assertIs(history.messages(), first)
+
+        history.add("how are you", "fine")
+        self.assertIsNot(history.messages(), first)
+        self.assertEqual(len(history.messages()), 4)
+
+        history.clear()
+        self.assertEqual(history.messages(), [])
+
+    def test_disabled(self):
+        """max_turns 0 keeps nothing"""
+        history = ConversationHistory(max_turns=0)
+        history.add("hi", "hello")
+        self.assertFalse(history.enabled)
+        self.assertEqual(history.messages(), [])
+
+    def test_assistant_sends_and_records_history(self):
+        """respond() records the turn; the next query carries it"""
+        assistant = Assistant({"history_max_turns": 5}, {}, "prompt", memory_manager=AsyncMock(namespace="default"))
+        assistant.recall_memories = AsyncMock(return_value=[])
+
+        async def scenario():
+            with patch('utils.assistant.query_llm', AsyncMock(return_value="response")) as query, \
+                 patch('utils.assistant.execute_response', AsyncMock(side_effect=["It is 4", "It is 5", "Ok"])):
+                await assistant.respond("What is 2 + 2?")
+                await assistant.respond("And 2 + 3?")
+                await assistant.respond("Not kept", remember=False)
+                return query.call_args_list
+
+        calls = asyncio.run(scenario())
+        self.assertEqual(calls[0].kwargs["history"], None)
+        self.assertEqual(
+            [message["content"] for message in calls[1].kwargs["history"]],
+            ["What is 2 + 2?", "It is 4"]
+        )
+        self.assertEqual(len(assistant.history), 2)
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
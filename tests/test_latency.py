@@ -0,0 +1,110 @@
+import unittest
+import os
+import json
+import asyncio
+import tempfile
+import threading
+from unittest.mock import patch
+from utils.jsonl_writer import JsonLinesWriter
+from utils.latency import LatencyTracker, TurnTimer, percentile, start_turn, current_turn, mark
+
+class TestLatency(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.temp_dir.name, 'latency.jsonl')
+        self.tracker = LatencyTracker(self.log_path, window=100)
+        self.patcher = patch('utils.latency._latency_tracker', self.tracker)
+        self.patcher.start()
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        self.patcher.stop()
+        self.tracker.shutdown()
+        self.temp_dir.cleanup()
+
+    def test_percentile(self):
+        """Nearest-rank percentile test"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7.0], 99), 7.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_stage_durations(self):
+        """Each mark closes the stage since the previous mark"""
+        turn = TurnTimer("voice", started_at=10.0)
+        turn.mark("stt_final", at=10.5)
+        turn.mark("llm", at=11.7)
+        turn.mark("tts_start", at=11.8)
+
+        durations = turn.durations()
+        self.assertAlmostEqual(durations["stt_final"], 500.0)
+        self.assertAlmostEqual(durations["llm"], 1200.0)
+        self.assertAlmostEqual(durations["tts_start"], 100.0)
+        self.assertAlmostEqual(turn.total_ms(), 1800.0)
+
+    def test_records_and_summary(self):
+        """Finished turns are written as JSONL and summarized per stage"""
+        for i in range(1, 21):
+            turn = TurnTimer("text", started_at=0.0)
+            turn.mark("llm", at=i / 1000)
+            turn.finish()
+            turn.finish()  # Recorded once
+
+        self.tracker.flush()  # Records are written by a background thread
+        with open(self.log_path) as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(len(records), 20)
+        self.assertEqual(records[0]["source"], "text")
+        self.assertIn("llm", records[0]["stages"])
+
+        summary = self.tracker.summary()
+        self.assertEqual(summary["llm"]["count"], 20)
+        self.assertAlmostEqual(summary["llm"]["p50"], 10.0)
+        self.assertAlmostEqual(summary["llm"]["p95"], 19.0)
+        self.assertAlmostEqual(summary["total"]["p99"], 20.0)
+        self.assertIn("p95 ms", self.tracker.format_summary())
+
+    def test_records_written_off_the_caller_thread(self):
+        """Finishing a turn does not wait for the latency file"""
+        release = threading.Event()
+        append = JsonLinesWriter._append
+
+        def slow_append(writer, path, lines):
+            release.wait(5)
+            append(writer, path, lines)
+
+        with patch.object(JsonLinesWriter, "_append", slow_append):
+            turn = TurnTimer("text", started_at=0.0)
+            turn.finish()  # Returns while the writer thread is blocked
+            self.assertFalse(os.path.exists(self.log_path))
+            release.set()
+            self.tracker.flush()
+        with open(self.log_path) as file:
+            self.assertEqual(len(file.readlines()), 1)
+
+    def test_context_turn(self):
+        """Marks go to the turn of the current context"""
+        async def scenario():
+            mark("ignored")  # No turn yet
+            first = start_turn("text")
+            mark("llm")
+            self.assertIs(current_turn(), first)
+
+            second = start_turn("text")  # The unfinished first turn is recorded
+            await asyncio.to_thread(mark, "tool")  # Context is copied into threads
+            second.finish("tts_start")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertTrue(first.to_record()["interrupted"])
+        self.assertEqual(list(second.durations()), ["tool", "tts_start"])
+        self.assertEqual(self.tracker.turns, 2)
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
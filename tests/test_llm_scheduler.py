@@ -0,0 +1,151 @@
+import time
+import unittest
+import asyncio
+from utils.llm_scheduler import LLMScheduler, SchedulerOverloaded, INTERACTIVE, FOLLOW_UP, BACKGROUND
+
+class TestLLMScheduler(unittest.TestCase):
+    def test_concurrency_cap_per_endpoint(self):
+        """Each endpoint runs at most its limit of requests at once"""
+        scheduler = LLMScheduler(max_concurrency=2, endpoint_limits={"slow": 1})
+        active = {"local": 0, "slow": 0}
+        peak = {"local": 0, "slow": 0}
+
+        async def request(endpoint):
+            async with scheduler.slot(endpoint):
+                active[endpoint] += 1
+                peak[endpoint] = max(peak[endpoint], active[endpoint])
+                await asyncio.sleep(0.02)
+                active[endpoint] -= 1
+
+        async def scenario():
+            await asyncio.gather(*[request("local") for _ in range(6)], *[request("slow") for _ in range(3)])
+
+        asyncio.run(scenario())
+        self.assertEqual(peak, {"local": 2, "slow": 1})
+        metrics = scheduler.metrics()
+        self.assertEqual(metrics["priorities"]["interactive"]["admitted"], 9)
+        self.assertEqual(metrics["endpoints"]["local"], {"limit": 2, "active": 0, "queued": 0})
+        self.assertGreater(metrics["priorities"]["interactive"]["queue_max_ms"], 30)
+
+    def test_priority_order(self):
+        """Queued requests run interactive first, then follow-up, then background"""
+        scheduler = LLMScheduler(max_concurrency=1)
+        order = []
+
+        async def request(name, priority):
+            async with scheduler.slot("api", priority):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            blocker = asyncio.ensure_future(request("first", BACKGROUND))
+            await asyncio.sleep(0)
+            tasks = [
+                asyncio.ensure_future(request("warmup", BACKGROUND)),
+                asyncio.ensure_future(request("tool pass", FOLLOW_UP)),
+                asyncio.ensure_future(request("turn 1", INTERACTIVE)),
+                asyncio.ensure_future(request("turn 2", INTERACTIVE))
+            ]
+            await asyncio.gather(blocker, *tasks)
+
+        asyncio.run(scenario())
+        self.assertEqual(order, ["first", "turn 1", "turn 2", "tool pass", "warmup"])
+
+    def test_background_shed_when_queue_is_deep(self):
+        """Background requests are rejected past the shed depth; others still queue"""
+        scheduler = LLMScheduler(max_concurrency=1, shed_queue_depth=2)
+
+        async def request(priority):
+            async with scheduler.slot("api", priority):
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            tasks = [asyncio.ensure_future(request(INTERACTIVE)) for _ in range(3)]
+            await asyncio.sleep(0)
+            with self.assertRaises(SchedulerOverloaded):
+                await request(BACKGROUND)
+            tasks.append(asyncio.ensure_future(request(FOLLOW_UP)))
+            await asyncio.gather(*tasks)
+
+        asyncio.run(scenario())
+        metrics = scheduler.metrics()["priorities"]
+        self.assertEqual(metrics["background"]["shed"], 1)
+        self.assertEqual(metrics["follow_up"]["admitted"], 1)
+
+    def test_cancelled_waiter_frees_its_place(self):
+        """A request cancelled while queued neither runs nor leaks a slot"""
+        scheduler = LLMScheduler(max_concurrency=1)
+        ran = []
+
+        async def request(name):
+            async with scheduler.slot("api"):
+                ran.append(name)
+                await asyncio.sleep(0.02)
+
+        async def scenario():
+            first = asyncio.ensure_future(request("first"))
+            await asyncio.sleep(0)
+            cancelled = asyncio.ensure_future(request("cancelled"))
+            last = asyncio.ensure_future(request("last"))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            await asyncio.gather(first, last)
+
+        asyncio.run(scenario())
+        self.assertEqual(ran, ["first", "last"])
+        self.assertEqual(scheduler.metrics()["endpoints"]["api"]["active"], 0)
+
+    def test_cancelled_thread_call_keeps_slot_until_done(self):
+        """A caller cancelled during a thread call frees the slot only when the thread ends"""
+        scheduler = LLMScheduler(max_concurrency=1)
+        order = []
+
+        def blocking(name):
+            time.sleep(0.05)
+            order.append(name)
+            return name
+
+        async def scenario():
+            first = asyncio.ensure_future(scheduler.to_thread("api", lambda: blocking("first")))
+            await asyncio.sleep(0.01)
+            second = asyncio.ensure_future(scheduler.to_thread("api", lambda: order.append("second") or "second"))
+            await asyncio.sleep(0)
+            first.cancel()
+            await asyncio.sleep(0.01)
+            active = scheduler.metrics()["endpoints"]["api"]["active"]
+            result, _ = await second
+            return active, result
+
+        active, result = asyncio.run(scenario())
+        self.assertEqual(active, 1)  # Still held by the running thread
+        self.assertEqual(order, ["first", "second"])
+        self.assertEqual(result, "second")
+        self.assertEqual(scheduler.metrics()["endpoints"]["api"]["active"], 0)
+
+    def test_raised_limit_admits_waiters(self):
+        """configure() with a higher limit starts queued requests at once"""
+        scheduler = LLMScheduler(max_concurrency=1)
+        peak = {"active": 0, "max": 0}
+
+        async def request():
+            async with scheduler.slot("api"):
+                peak["active"] += 1
+                peak["max"] = max(peak["max"], peak["active"])
+                await asyncio.sleep(0.05)
+                peak["active"] -= 1
+
+        async def scenario():
+            tasks = [asyncio.ensure_future(request()) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            scheduler.configure(max_concurrency=3)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(scenario())
+        self.assertEqual(peak["max"], 3)
+        self.assertEqual(scheduler.metrics()["endpoints"]["api"], {"limit": 3, "active": 0, "queued": 0})
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,124 @@
+import unittest
+import os
+import json
+import logging
+import threading
+import tempfile
+from datetime import date, timedelta
+from unittest.mock import patch
+from utils.latency import start_turn
+from utils.logger import CustomLogger, DailyRotatingFileHandler
+
+class TestLogger(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.logger = CustomLogger(self.temp_dir.name, name="test_logger")
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        self.logger.shutdown()
+        self.temp_dir.cleanup()
+
+    def read_lines(self, path=None):
+        """Flush the logger and parse its JSON lines"""
+        self.logger.flush()
+        with open(path or self.logger.log_file, encoding="utf-8") as file:
+            return [json.loads(line) for line in file]
+
+    def test_json_lines_with_fields_and_turn(self):
+        """Records carry their level, lazily formatted message, fields and turn id"""
+        turn = start_turn("text")
+        self.logger.info("LLM response time: %s seconds", 1.25, latency_ms=1250, tool="get_weather")
+        self.logger.error("Failure")
+
+        first, second = self.read_lines()
+        self.assertEqual(first["level"], "INFO")
+        self.assertEqual(first["msg"], "LLM response time: 1.25 seconds")
+        self.assertEqual(first["latency_ms"], 1250)
+        self.assertEqual(first["tool"], "get_weather")
+        self.assertEqual(first["turn_id"], turn.id)
+        self.assertEqual(first["turn_source"], "text")
+        self.assertEqual(second["level"], "ERROR")
+
+    def test_io_runs_on_listener_thread(self):
+        """The caller only enqueues; the file is written from another thread"""
+        writers = []
+        emit = self.logger.file_handler.emit
+
+        def record_thread(record):
+            writers.append(threading.current_thread())
+            emit(record)
+
+        with patch.object(self.logger.file_handler, "emit", record_thread):
+            self.logger.debug("queued")
+            self.logger.flush()
+
+        self.assertEqual(len(writers), 1)
+        self.assertIsNot(writers[0], threading.current_thread())
+
+    def test_debug_sampling(self):
+        """Debug records are sampled; other levels are always written"""
+        self.logger.configure({"log_debug_sample_rate": 0.0})
+        for _ in range(50):
+            self.logger.debug("noisy")
+        self.logger.warning("kept")
+        self.logger.debug("forced", sample_rate=1.0)
+
+        self.assertEqual([line["msg"] for line in self.read_lines()], ["kept", "forced"])
+
+        self.logger.configure({"log_debug_sample_rate": 0.5})
+        for _ in range(400):
+            self.logger.debug("half")
+        sampled = [line for line in self.read_lines() if line["msg"] == "half"]
+        self.assertTrue(100 < len(sampled) < 300)
+        self.assertEqual(sampled[0]["sample_rate"], 0.5)
+
+class TestDailyRotatingFileHandler(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        self.temp_dir.cleanup()
+
+    def write(self, handler, count):
+        """Emit count records through a handler"""
+        for i in range(count):
+            handler.handle(logging.makeLogRecord({"msg": f"record {i:03d} " + "x" * 50, "levelno": 20, "levelname": "INFO"}))
+
+    def test_rotates_by_size(self):
+        """Past max_bytes the day's file is renamed with an index"""
+        handler = DailyRotatingFileHandler(self.temp_dir.name, max_bytes=300)
+        self.write(handler, 12)
+        handler.close()
+
+        today = date.today().isoformat()
+        names = sorted(os.listdir(self.temp_dir.name))
+        self.assertIn(f"assistant_{today}.jsonl", names)
+        self.assertIn(f"assistant_{today}.1.jsonl", names)
+        for name in names:
+            self.assertLessEqual(os.path.getsize(os.path.join(self.temp_dir.name, name)), 300)
+
+    def test_rotates_by_day_and_deletes_expired(self):
+        """A new day starts a new file; files past the retention are deleted"""
+        old_day = (date.today() - timedelta(days=30)).isoformat()
+        expired = os.path.join(self.temp_dir.name, f"assistant_{old_day}.jsonl")
+        open(expired, "w").close()
+
+        handler = DailyRotatingFileHandler(self.temp_dir.name, retention_days=0)
+        handler.day = date.today() - timedelta(days=1)
+        handler.baseFilename = os.path.abspath(handler._path(handler.day))
+        handler.retention_days = 7
+        self.write(handler, 1)
+        handler.close()
+
+        self.assertFalse(os.path.exists(expired))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, f"assistant_{date.today().isoformat()}.jsonl")))
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
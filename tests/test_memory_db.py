@@ -0,0 +1,146 @@
+import unittest
+import os
+import asyncio
+import tempfile
+import threading
+from utils.memory_db import MemoryDB, close_all
+from utils.memory_manager import MemoryManager, MemoryStore, create_schema
+
+class TestMemoryDB(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'memory.db')
+        self.db = MemoryDB(self.db_path, queue_size=4, max_batch=8)
+        self.db.ensure_schema("memory_items", create_schema)
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        self.db.close()
+        close_all()
+        self.temp_dir.cleanup()
+
+    def insert(self, text):
+        return lambda conn: conn.execute(
+            "INSERT INTO memory_items (namespace, item_id, text) VALUES ('test', 0, ?)", (text,)
+        )
+
+    def count(self):
+        return self.db.submit_read(
+            lambda conn: conn.execute("SELECT COUNT(*) FROM memory_items").fetchone()[0]
+        ).result()
+
+    def test_writes_are_batched(self):
+        """Queued writes are committed in batches"""
+        # Hold the writer so that the next writes queue up
+        release = threading.Event()
+        blocker = self.db.submit_write(lambda conn: release.wait(5))
+        futures = [self.db.submit_write(self.insert(f"item {i}")) for i in range(3)]
+        release.set()
+
+        for future in futures + [blocker]:
+            future.result(5)
+        self.assertEqual(self.count(), 3)
+
+        metrics = self.db.metrics()
+        self.assertEqual(metrics["writes"], 5)  # schema + blocker + 3 inserts
+        self.assertGreaterEqual(metrics["max_batch_size"], 3)
+
+    def test_failed_write_is_isolated(self):
+        """A failing write does not roll back its batch"""
+        release = threading.Event()
+        self.db.submit_write(lambda conn: release.wait(5))
+        good = self.db.submit_write(self.insert("good"))
+        bad = self.db.submit_write(lambda conn: conn.execute("INSERT INTO missing_table VALUES (1)"))
+        release.set()
+
+        good.result(5)
+        with self.assertRaises(Exception):
+            bad.result(5)
+        self.assertEqual(self.count(), 1)
+        self.assertEqual(self.db.metrics()["write_errors"], 1)
+
+    def test_cancelled_write_keeps_the_writer_alive(self):
+        """Cancelling an awaited write drops it without stopping the writer thread"""
+        release = threading.Event()
+        self.db.submit_write(lambda conn: release.wait(5))
+
+        async def cancel_then_write():
+            task = asyncio.create_task(self.db.write(self.insert("cancelled")))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            release.set()
+            await asyncio.wait_for(self.db.write(self.insert("after")), 5)
+
+        asyncio.run(cancel_then_write())
+        self.assertTrue(self.db._writer.is_alive())
+        self.assertEqual(self.count(), 1)
+
+    def test_backpressure(self):
+        """Writers wait when the bounded queue is full"""
+        release = threading.Event()
+        self.db.submit_write(lambda conn: release.wait(5))
+
+        async def flood():
+            tasks = [asyncio.create_task(self.db.write(self.insert(f"item {i}"))) for i in range(8)]
+            await asyncio.sleep(0.05)
+            release.set()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(flood())
+        self.assertEqual(self.count(), 8)
+        self.assertGreater(self.db.metrics()["backpressure_waits"], 0)
+
+    def test_hit_flush_does_not_wait_for_a_full_queue(self):
+        """flushHits keeps the hits pending instead of blocking on a full queue"""
+        manager = MemoryManager(namespace="hits", db_path=self.db_path, load=False)
+        manager.db = self.db
+        item_id = manager.addItem("remembered")
+        self.assertEqual(manager.checkpoint(), 1)
+
+        release = threading.Event()
+        self.db.submit_write(lambda conn: release.wait(5))
+        while True:
+            try:
+                self.db.submit_write(lambda conn: None, block=False)
+            except Exception:
+                break
+
+        manager.stats.hit(item_id)
+        self.assertFalse(manager.flushHits())
+        self.assertEqual(manager.pending_changes(), 1)
+        release.set()
+        self.assertEqual(manager.checkpoint(), 1)
+        manager.clear()
+
+    def test_async_memory_api(self):
+        """MemoryManager async API test"""
+        async def scenario():
+            manager = MemoryManager(max_items=2, namespace="async", db_path=self.db_path, load=False)
+            await manager.addItemAsync("first")
+            await manager.addItemAsync("second")
+            await manager.addItemAsync("third")
+
+            reloaded = MemoryManager(namespace="async", db_path=self.db_path, load=False)
+            self.assertTrue(await reloaded.loadAsync())
+            self.assertEqual(reloaded.getItems(), ["second", "third"])
+            manager.clear()
+            reloaded.clear()
+
+            store = MemoryStore(max_hot_namespaces=1, db_path=self.db_path)
+            (await store.get_async("alice")).addItem("Alice likes tea")
+            await store.get_async("bob")
+            self.assertEqual(store.hot_namespaces(), ["bob"])
+            self.assertEqual((await store.get_async("alice")).getItems(), ["Alice likes tea"])
+            self.assertTrue(await store.save_all_async())
+            self.assertIn("db", store.metrics())
+
+        asyncio.run(scenario())
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,124 @@
+import unittest
+import os
+import tempfile
+from utils.memory_db import close_all
+from utils.memory_manager import MemoryManager, MemoryStore, namespace_key
+
+class TestMemoryStore(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'memory.db')
+        self.store = MemoryStore(max_hot_namespaces=2, max_items=5, db_path=self.db_path)
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        close_all()
+        self.temp_dir.cleanup()
+
+    def test_namespace_key(self):
+        """Namespace key building test"""
+        self.assertEqual(namespace_key(), "default")
+        self.assertEqual(namespace_key("alice"), "alice")
+        self.assertEqual(namespace_key("alice", "s1"), "alice:s1")
+
+    def test_namespaces_are_isolated(self):
+        """Namespace isolation test"""
+        self.store.get("alice").addItem("Alice likes tea")
+        self.store.get("bob").addItem("Bob likes coffee")
+
+        self.assertEqual(self.store.get("alice").getItems(), ["Alice likes tea"])
+        self.assertEqual(self.store.get("bob").getItems(), ["Bob likes coffee"])
+
+    def test_cold_namespace_reloaded_from_disk(self):
+        """LRU eviction and reload test"""
+        self.store.get("alice").addItem("Alice likes tea")
+        self.store.get("bob").addItem("Bob likes coffee")
+        self.store.get("carol").addItem("Carol likes juice")
+
+        # alice was the least recently used namespace
+        self.assertEqual(self.store.hot_namespaces(), ["bob", "carol"])
+        self.assertIn("alice", self.store.namespaces())
+
+        self.assertEqual(self.store.get("alice").getItems(), ["Alice likes tea"])
+        self.assertEqual(self.store.hot_namespaces(), ["carol", "alice"])
+
+    def test_pinned_namespaces_stay_hot(self):
+        """Namespaces pinned by open sessions are never evicted, even over the hot limit"""
+        alice = self.store.get("alice", pin=True)
+        bob = self.store.get("bob", pin=True)
+        alice.addItem("Alice likes tea")
+        carol = self.store.get("carol")
+
+        self.assertEqual(self.store.hot_namespaces(), ["alice", "bob", "carol"])
+        self.assertFalse(self.store.evict("alice"))
+        self.assertIs(self.store.get("alice"), alice)
+        self.assertEqual(alice.getItems(), ["Alice likes tea"])
+
+        self.store.unpin("alice")
+        self.store.get("dave")
+        self.assertEqual(self.store.hot_namespaces(), ["bob", "dave"])
+        self.assertIsNot(self.store.get("carol"), carol)
+
+    def test_checkpoint_saves_ann_index(self):
+        """checkpoint_all writes the ANN index of hot namespaces; close releases them"""
+        embeddings_dir = os.path.join(self.temp_dir.name, 'embeddings')
+        store = MemoryStore(db_path=self.db_path, embeddings_dir=embeddings_dir,
+                            embedding_options={"embedding_dim": 16, "batch_size": 1, "ann_threshold": 2})
+        alice = store.get("alice")
+        for i in range(4):
+            alice.addItem(f"Alice fact {i}")
+        ann_path = alice.embedding_store.ann_path
+        self.assertFalse(os.path.exists(ann_path))
+
+        self.assertEqual(store.checkpoint_all(), 4)
+        self.assertTrue(os.path.exists(ann_path))
+
+        self.assertEqual(store.close(), 0)
+        self.assertEqual(store.hot_namespaces(), [])
+        self.assertIsNone(alice.embedding_store._matrix)
+
+    def test_per_namespace_limit(self):
+        """Per-namespace capacity test"""
+        self.store.set_limit("alice", 2)
+        alice = self.store.get("alice")
+        for i in range(4):
+            alice.addItem(f"Memory {i}")
+
+        self.assertEqual(alice.getItems(), ["Memory 2", "Memory 3"])
+
+    def test_configure_applies_to_hot_namespaces(self):
+        """Reconfigured capacity and flush size reach loaded namespaces, overrides kept"""
+        self.store.set_limit("bob", 4)
+        alice, bob = self.store.get("alice"), self.store.get("bob")
+        for i in range(4):
+            alice.addItem(f"Alice {i}")
+            bob.addItem(f"Bob {i}")
+
+        self.store.configure(max_items=2, hit_flush_size=7, eviction_policy="lru")
+
+        self.assertEqual(alice.getItems(), ["Alice 2", "Alice 3"])
+        self.assertEqual(len(bob.getItems()), 4)
+        self.assertEqual(alice.hit_flush_size, 7)
+        self.assertEqual(bob.eviction_policy.name, "lru")
+
+    def test_save_keeps_other_namespaces(self):
+        """Namespace-scoped save test"""
+        self.store.get("alice").addItem("Alice likes tea")
+        self.store.get("bob").addItem("Bob likes coffee")
+        self.assertTrue(self.store.save_all())
+
+        # Saving one namespace again must not drop the rows of another
+        alice = self.store.get("alice")
+        alice.addItem("Alice lives in Izmir")
+        self.assertTrue(alice.saveToSQLite())
+
+        reloaded = MemoryManager(namespace="bob", db_path=self.db_path)
+        self.assertEqual(reloaded.getItems(), ["Bob likes coffee"])
+        reloaded.clear()
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
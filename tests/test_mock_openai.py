@@ -0,0 +1,56 @@
+import time
+import asyncio
+import unittest
+from benchmarks.mock_openai import MockOpenAIServer
+from utils.query import query_llm, collect_stream, get_llm_client
+
+SCRIPT = [{"match": "weather", "tool_calls": [{"name": "get_weather", "arguments": {"city": "Paris"}}]}]
+
+class TestMockOpenAIServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockOpenAIServer(script=SCRIPT).start()
+        cls.config = {"api_url": cls.server.url, "auth_token": "test", "model": "mock"}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_content_answer(self):
+        """query_llm gets the default content through the mock endpoint"""
+        response = asyncio.run(query_llm("Hello", config=self.config))
+        self.assertEqual(response.choices[0].finish_reason, "stop")
+        self.assertTrue(response.choices[0].message.content)
+        self.assertGreater(response.usage.total_tokens, 0)
+
+    def test_scripted_tool_calls_and_follow_up(self):
+        """Matching prompts get the scripted tool call; tool result passes get content"""
+        response = asyncio.run(query_llm("What is the weather?", config=self.config))
+        call = response.choices[0].message.tool_calls[0]
+        self.assertEqual(call.function.name, "get_weather")
+        self.assertEqual(call.function.arguments, '{"city": "Paris"}')
+
+        response = asyncio.run(query_llm("What is the weather?", answer="Sunny", current_tool="get_weather", config=self.config))
+        self.assertEqual(response.choices[0].message.content, self.server.follow_up)
+
+    def test_streaming_token_rate(self):
+        """Streamed answers arrive token by token at the configured rate"""
+        server = MockOpenAIServer(latency=0.05, tokens_per_second=100, script=[{"content": "one two three four five"}]).start()
+        try:
+            client = get_llm_client(server.url, "test")
+            tokens = []
+            start = time.perf_counter()
+            response = collect_stream(
+                client.chat.completions.create(model="mock", messages=[{"role": "user", "content": "Hi"}], stream=True),
+                tokens.append
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            server.stop()
+
+        self.assertEqual(tokens, ["one", " two", " three", " four", " five"])
+        self.assertEqual(response.choices[0].message.content, "one two three four five")
+        self.assertGreaterEqual(elapsed, 0.05 + 5 / 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import os
+import sys
+import json
+import asyncio
+import tempfile
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
+from utils.tool_registry import ToolRegistry
+from utils.plugins import discover_directory, discover_entry_points
+
+MODULE = '''
+import sys
+IMPORTS = sys.modules.setdefault("plugin_import_count", [])
+IMPORTS.append(__name__)
+
+async def convert(value, unit, secrets=None):
+    return f"{value} {unit} ({secrets['key']})"
+
+def shout(text):
+    return text.upper()
+'''
+
+class TestPlugins(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.registry = ToolRegistry()
+        sys.modules.pop("plugin_import_count", None)
+
+        @self.registry.tool
+        async def get_weather(city: str) -> str:
+            """Built-in tool"""
+            return city
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        for name in [name for name in sys.modules if name.startswith(("assistant_plugins.", "entry_plugin"))]:
+            del sys.modules[name]
+        sys.modules.pop("plugin_import_count", None)
+        self.temp_dir.cleanup()
+
+    def write_plugin(self, directory, manifest, module="impl.py"):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "plugin.json"), "w") as file:
+            json.dump(manifest, file)
+        with open(os.path.join(directory, module), "w") as file:
+            file.write(MODULE)
+
+    def manifest(self, module="impl.py"):
+        return {
+            "name": "units",
+            "module": module,
+            "tools": [
+                {
+                    "name": "convert_units",
+                    "function": "convert",
+                    "description": "Convert a value",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {"value": {"type": "number"}, "unit": {"type": "string"}},
+                        "required": ["value", "unit"]
+                    },
+                    "read_only": True,
+                    "dynamic": True,
+                    "context": ["secrets"]
+                },
+                {"name": "shout", "parameters": {"type": "object", "properties": {"text": {"type": "string"}}}},
+                {"name": "get_weather", "function": "shout"}
+            ]
+        }
+
+    def test_directory_plugins_load_on_first_call(self):
+        """Manifests are registered at discovery; modules are imported on the first call"""
+        plugins_dir = os.path.join(self.temp_dir.name, "plugins")
+        self.write_plugin(os.path.join(plugins_dir, "units"), self.manifest())
+        self.write_plugin(os.path.join(plugins_dir, "broken"), {"tools": [{"description": "no name"}]})
+
+        plugins = discover_directory(self.registry, plugins_dir)
+        self.assertEqual(plugins, {"units": ["convert_units", "shout"]})  # Built-in get_weather kept
+        self.assertNotIn("plugin_import_count", sys.modules)
+
+        spec = self.registry.get("convert_units")
+        self.assertFalse(spec.loaded)
+        self.assertTrue(spec.read_only)
+        self.assertEqual(self.registry.dynamic_tools(), ["convert_units"])
+        self.assertEqual(spec.schema["function"]["parameters"]["required"], ["value", "unit"])
+
+        async def scenario():
+            return [
+                await self.registry.call("convert_units", {"value": 3, "unit": "km"}, {"secrets": {"key": "k"}}),
+                await self.registry.call("shout", {"text": "hi"}),  # Blocking function, run on a thread
+                await self.registry.call("convert_units", {"value": 4, "unit": "m"}, {"secrets": {"key": "k"}})
+            ]
+
+        self.assertEqual(asyncio.run(scenario()), ["3 km (k)", "HI", "4 m (k)"])
+        self.assertTrue(spec.loaded)
+        self.assertEqual(sys.modules["plugin_import_count"], ["assistant_plugins.units.impl"])  # Imported once
+
+    def test_entry_point_plugins(self):
+        """Installed packages are found by entry point and their manifest read without importing them"""
+        package_dir = os.path.join(self.temp_dir.name, "site", "entry_plugin")
+        self.write_plugin(package_dir, self.manifest(module="entry_plugin.impl"))
+        with open(os.path.join(package_dir, "__init__.py"), "w") as file:
+            file.write("raise ImportError('package must not be imported at discovery')\n")
+
+        entry_point = EntryPoint(name="units", value="entry_plugin", group="ai_assistant.plugins")
+        sys.path.insert(0, os.path.join(self.temp_dir.name, "site"))
+        try:
+            with patch('utils.plugins.entry_points', return_value=[entry_point]):
+                plugins = discover_entry_points(self.registry)
+            self.assertEqual(plugins, {"units": ["convert_units", "shout"]})
+            self.assertNotIn("entry_plugin", sys.modules)
+
+            result = asyncio.run(self.registry.call("shout", {"text": "hey"}))
+            self.assertEqual(result, "Tool shout is unavailable: package must not be imported at discovery")
+        finally:
+            sys.path.remove(os.path.join(self.temp_dir.name, "site"))
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
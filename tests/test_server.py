@@ -0,0 +1,220 @@
+import unittest
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock, MagicMock
+from aiohttp import test_utils, web
+from utils.assistant import Assistant
+from utils.server import SessionManager, create_app
+from utils.query import collect_stream
+
+class FakeMemoryStore:
+    """Memory store returning a mock namespace per user and session"""
+    def __init__(self):
+        self.managers = {}
+        self.loads = 0
+        self.pins = {}
+
+    async def get_async(self, user_id=None, session_id=None, pin=False):
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        manager = MagicMock()
+        manager.namespace = f"{user_id}:{session_id}"
+        manager.checkpointAsync = AsyncMock(return_value=0)
+        self.managers[manager.namespace] = manager
+        if pin:
+            self.pins[manager.namespace] = self.pins.get(manager.namespace, 0) + 1
+        return manager
+
+    def unpin(self, namespace):
+        self.pins[namespace] -= 1
+
+async def fake_respond(self, user_input, ai_response=None, on_token=None, on_event=None):
+    """Echo the input, streaming it word by word"""
+    await asyncio.sleep(0.1)
+    if on_token:
+        for word in user_input.split():
+            on_token(word)
+    if on_event:
+        on_event({"type": "tool_call", "tool": "echo", "args": {}})
+    return f"{self.memory_manager.namespace}: {user_input}"
+
+class TestAssistantServer(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.store = FakeMemoryStore()
+        self.sessions = SessionManager(Assistant({}, {}, "prompt"), self.store, idle_timeout=60, max_sessions=2)
+
+    def run_client(self, scenario, token=None):
+        """Run a scenario against the app on a test server"""
+        async def run():
+            async with test_utils.TestClient(test_utils.TestServer(create_app(self.sessions, token))) as client:
+                return await scenario(client)
+        with patch('utils.assistant.Assistant.respond', fake_respond):
+            return asyncio.run(run())
+
+    def test_chat_sessions_are_isolated_and_concurrent(self):
+        """Concurrent chats run in parallel, each in its own memory namespace"""
+        async def scenario(client):
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            replies = await asyncio.gather(
+                client.post("/api/chat", json={"message": "hi", "user_id": "alice", "session_id": "a"}),
+                client.post("/api/chat", json={"message": "hey", "user_id": "bob", "session_id": "b"})
+            )
+            elapsed = loop.time() - started
+            return [await reply.json() for reply in replies], elapsed
+
+        (alice, bob), elapsed = self.run_client(scenario)
+        self.assertEqual(alice["response"], "alice:a: hi")
+        self.assertEqual(bob["response"], "bob:b: hey")
+        self.assertIn("latency_ms", alice)
+        self.assertLess(elapsed, 0.19)  # Sequential would take 0.2 s
+
+    def test_session_lifecycle(self):
+        """Sessions are created, reused, closed and bounded by max_sessions"""
+        async def scenario(client):
+            created = await (await client.post("/api/sessions", json={"user_id": "alice"})).json()
+            session_id = created["session_id"]
+            reply = await (await client.post("/api/chat", json={"message": "again", "session_id": session_id, "user_id": "alice"})).json()
+            closed = await client.delete(f"/api/sessions/{session_id}")
+            missing = await client.delete(f"/api/sessions/{session_id}")
+            bad = await client.post("/api/chat", json={})
+            for session_id in ("x", "y", "z"):
+                await client.post("/api/sessions", json={"session_id": session_id})
+            health = await (await client.get("/api/health")).json()
+            return created, reply, closed.status, missing.status, bad.status, health
+
+        created, reply, closed, missing, bad, health = self.run_client(scenario)
+        self.assertEqual(created["memory_namespace"], f"alice:{created['session_id']}")
+        self.assertEqual(reply["session_id"], created["session_id"])
+        self.assertEqual(closed, 200)
+        self.assertEqual(missing, 404)
+        self.assertEqual(bad, 400)
+        self.assertEqual(health["sessions"], 2)
+        self.store.managers[created["memory_namespace"]].checkpointAsync.assert_awaited()
+        self.assertEqual(self.store.pins[created["memory_namespace"]], 0)  # Unpinned on close
+
+    def test_sessions_bound_to_user(self):
+        """Concurrent requests share one session; other users are refused"""
+        async def scenario(client):
+            created = await asyncio.gather(*[
+                client.post("/api/sessions", json={"session_id": "s", "user_id": "alice"}) for _ in range(3)
+            ])
+            stolen = await client.post("/api/chat", json={"message": "hi", "session_id": "s", "user_id": "mallory"})
+            anonymous = await client.post("/api/chat", json={"message": "hi", "session_id": "s"})
+            socket = await client.get("/ws?session_id=s&user_id=mallory")
+            return [reply.status for reply in created], stolen.status, anonymous.status, socket.status
+
+        created, stolen, anonymous, socket = self.run_client(scenario)
+        self.assertEqual(created, [201, 201, 201])
+        self.assertEqual(self.store.loads, 1)
+        self.assertEqual(self.store.pins, {"alice:s": 0})  # One pin, released at shutdown
+        self.assertEqual((stolen, anonymous, socket), (403, 403, 403))
+
+    def test_websocket_streams_events(self):
+        """WebSocket turns stream tokens and tool events before the final response"""
+        async def scenario(client):
+            async with client.ws_connect("/ws?user_id=carol&session_id=c") as ws:
+                session = await ws.receive_json()
+                await ws.send_json({"message": "tell me more"})
+                events = []
+                while not events or events[-1]["type"] not in ("done", "error"):
+                    events.append(await ws.receive_json())
+                return session, events
+
+        session, events = self.run_client(scenario)
+        self.assertEqual(session["memory_namespace"], "carol:c")
+        tokens = [event["text"] for event in events if event["type"] == "token"]
+        self.assertEqual(tokens, ["tell", "me", "more"])
+        self.assertIn("tool_call", [event["type"] for event in events])
+        self.assertEqual(events[-1], {"type": "done", "response": "carol:c: tell me more"})
+
+    def test_websocket_events_keep_order_under_backpressure(self):
+        """Slow sends do not let later tokens or the final message overtake earlier ones"""
+        send_json = web.WebSocketResponse.send_json
+
+        async def slow_send_json(ws, data, *args, **kwargs):
+            if data.get("text") == "tell":
+                await asyncio.sleep(0.05)  # The socket is draining
+            return await send_json(ws, data, *args, **kwargs)
+
+        async def scenario(client):
+            async with client.ws_connect("/ws?user_id=dave&session_id=d") as ws:
+                await ws.receive_json()
+                await ws.send_json({"message": "tell me more"})
+                events = []
+                while not events or events[-1]["type"] not in ("done", "error"):
+                    events.append(await ws.receive_json())
+                return events
+
+        with patch.object(web.WebSocketResponse, "send_json", slow_send_json):
+            events = self.run_client(scenario)
+        self.assertEqual([event.get("text", event["type"]) for event in events],
+                         ["tell", "me", "more", "tool_call", "done"])
+
+    def test_token_auth(self):
+        """Requests without the bearer token are rejected"""
+        async def scenario(client):
+            denied = await client.get("/api/health")
+            allowed = await client.get("/api/health", headers={"Authorization": "Bearer secret"})
+            return denied.status, allowed.status
+
+        self.assertEqual(self.run_client(scenario, token="secret"), (401, 200))
+
+    def test_idle_sessions_expire(self):
+        """Sweeping closes sessions unused for longer than the idle timeout"""
+        async def scenario():
+            session = await self.sessions.get("old")
+            session.last_used -= 120
+            await self.sessions.get("new")
+            return await self.sessions.sweep()
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+        self.assertEqual(list(self.sessions.sessions), ["new"])
+
+    def test_busy_sessions_not_evicted(self):
+        """Going over max_sessions closes the least recently used idle session, never one mid-turn"""
+        async def scenario():
+            busy = await self.sessions.get("busy")
+            await self.sessions.get("idle")
+            busy.last_used -= 120
+            async with busy.lock:
+                new = await self.sessions.get("new")
+                evicted = sorted(self.sessions.sessions)
+                async with new.lock:
+                    await self.sessions.get("newer")  # Every other session is busy
+            return evicted, sorted(self.sessions.sessions)
+
+        evicted, crowded = asyncio.run(scenario())
+        self.assertEqual(evicted, ["busy", "new"])
+        self.assertEqual(crowded, ["busy", "new", "newer"])
+
+    def test_collect_stream(self):
+        """Streamed chunks are assembled into a complete message"""
+        def chunk(content=None, tool_calls=None):
+            delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+            return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+        def call(index, id=None, name=None, arguments=None):
+            return SimpleNamespace(index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments))
+
+        tokens = []
+        response = collect_stream([
+            chunk("Hello"),
+            chunk(" world"),
+            chunk(tool_calls=[call(0, "call_1", "get_weather", '{"loc')]),
+            chunk(tool_calls=[call(0, arguments='ation": "Paris"}')])
+        ], tokens.append)
+
+        message = response.choices[0].message
+        self.assertEqual(tokens, ["Hello", " world"])
+        self.assertEqual(message.content, "Hello world")
+        self.assertEqual(message.tool_calls[0].id, "call_1")
+        self.assertEqual(message.tool_calls[0].function.name, "get_weather")
+        self.assertEqual(message.tool_calls[0].function.arguments, '{"location": "Paris"}')
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,110 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, patch
+from utils.speculative import SpeculativeQuery, normalize_transcript
+
+class TestSpeculativeQuery(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.calls = []
+
+    async def run_query(self, text):
+        self.calls.append(text)
+        await asyncio.sleep(0.01)
+        return f"response to {text}"
+
+    def test_normalize(self):
+        """Casing and punctuation do not change the transcript"""
+        self.assertEqual(normalize_transcript("What's the  weather, today?"), "what s the weather today")
+        self.assertEqual(normalize_transcript(""), "")
+
+    def test_matching_final_reuses_result(self):
+        """A matching final transcript keeps the in-flight query"""
+        async def scenario():
+            speculator = SpeculativeQuery(self.run_query)
+            speculator.on_partial("what is the weather")
+            speculator.on_partial("What is the weather")  # Same request, not restarted
+            return await speculator.resolve("What is the weather?"), speculator.metrics()
+
+        result, metrics = asyncio.run(scenario())
+        self.assertEqual(result, "response to what is the weather")
+        self.assertEqual(self.calls, ["what is the weather"])
+        self.assertEqual(metrics, {"started": 1, "hits": 1, "misses": 0, "failures": 0})
+
+    def test_mismatch_restarts(self):
+        """A different final transcript cancels and reruns the query"""
+        async def scenario():
+            speculator = SpeculativeQuery(self.run_query)
+            speculator.on_partial("open the browser")
+            speculator.on_partial("open the browser and search")
+            return await speculator.resolve("Open the browser and search for news."), speculator.metrics()
+
+        result, metrics = asyncio.run(scenario())
+        self.assertEqual(result, "response to Open the browser and search for news.")
+        self.assertEqual(metrics, {"started": 2, "hits": 0, "misses": 2, "failures": 0})
+
+    def test_short_partials_ignored(self):
+        """Partials below the word minimum are not speculated on"""
+        async def scenario():
+            speculator = SpeculativeQuery(self.run_query, min_words=3)
+            speculator.on_partial("hello")
+            return await speculator.resolve("hello"), speculator.metrics()
+
+        result, metrics = asyncio.run(scenario())
+        self.assertEqual(result, "response to hello")
+        self.assertEqual(metrics["started"], 0)
+
+    def test_debounced_partials(self):
+        """Only a partial that stays unchanged for the debounce time starts a speculative query"""
+        speculated = []
+
+        async def speculate(text):
+            speculated.append(text)
+            return f"speculated {text}"
+
+        async def scenario():
+            speculator = SpeculativeQuery(self.run_query, debounce=0.05, speculate=speculate)
+            for partial in ("what is the", "what is the weather", "what is the weather in"):
+                speculator.on_partial(partial)
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)
+            matched = await speculator.resolve("What is the weather in")
+
+            speculator.on_partial("and in paris then")
+            early = await speculator.resolve("And in Paris then?")  # Before the debounce elapsed
+            return matched, early, speculator.metrics()
+
+        matched, early, metrics = asyncio.run(scenario())
+        self.assertEqual(speculated, ["what is the weather in"])
+        self.assertEqual(matched, "speculated what is the weather in")
+        self.assertEqual(early, "response to And in Paris then?")
+        self.assertEqual(self.calls, ["And in Paris then?"])
+        self.assertEqual(metrics, {"started": 1, "hits": 1, "misses": 0, "failures": 0})
+
+    def test_failed_query_not_repeated(self):
+        """A voice turn whose resolved query failed does not query the LLM again"""
+        import main
+
+        async def failing(text):
+            self.calls.append(text)
+            return None
+
+        async def scenario():
+            speculator = SpeculativeQuery(failing)
+            speculator.on_partial("what is the weather")
+            await main.handleVoiceTurn("What is the weather?", {"final": 0.0}, speculator)
+            return speculator.metrics()
+
+        assistant = MagicMock()
+        with patch.object(main, "get_assistant", return_value=assistant), patch("builtins.print") as printed:
+            metrics = asyncio.run(scenario())
+        self.assertEqual(self.calls, ["what is the weather"])
+        self.assertEqual(metrics["failures"], 1)
+        assistant.respond.assert_not_called()
+        printed.assert_called_with("Failed to get response from AI.")
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
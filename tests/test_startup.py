@@ -0,0 +1,54 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold `import main` budget; text mode must not pay for the LLM client or voice stacks
+IMPORT_BUDGET_SECONDS = 1.5
+HEAVY_MODULES = ("openai", "numpy", "pyttsx3", "RealtimeSTT", "speech_recognition", "torch", "transformers")
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+def run_python(code):
+    """Run code in a fresh interpreter, from a scratch directory so its logs stay out of logs/"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        return subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=work_dir, env=dict(os.environ, PYTHONPATH=ROOT_DIR), capture_output=True, text=True, check=True
+        )
+
+def measure_import(module, runs=3):
+    """Best-of-n cold import time of a module in fresh interpreters"""
+    results = []
+    for _ in range(runs):
+        output = run_python(PROBE.format(module=module, heavy=HEAVY_MODULES)).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return min(results, key=lambda result: result["seconds"])
+
+class TestStartup(unittest.TestCase):
+    def test_main_import_is_light(self):
+        """Importing main loads no heavy subsystem and stays within the time budget"""
+        result = measure_import("main")
+        self.assertEqual(result["loaded"], [])
+        self.assertLess(result["seconds"], IMPORT_BUDGET_SECONDS)
+
+    def test_execute_response_does_not_import_main(self):
+        """Tool execution no longer imports the application entry point"""
+        result = run_python("import sys, utils.execute_response; print('main' in sys.modules)")
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "False")
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
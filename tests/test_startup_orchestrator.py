@@ -0,0 +1,76 @@
+import unittest
+import os
+import json
+import time
+import asyncio
+import tempfile
+from unittest.mock import patch
+from utils.startup import StartupOrchestrator, get_public_ip
+
+class TestStartupOrchestrator(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, 'ip_cache.json')
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        self.temp_dir.cleanup()
+
+    def test_steps_run_concurrently(self):
+        """Async and blocking warm-ups overlap and are recorded in the timeline"""
+        async def slow_async():
+            await asyncio.sleep(0.2)
+
+        def slow_blocking():
+            time.sleep(0.2)
+
+        def broken():
+            raise RuntimeError("no model")
+
+        async def scenario():
+            startup = StartupOrchestrator()
+            startup.add("llm", slow_async)
+            startup.add("tts", slow_blocking)
+            startup.add("stt", broken)
+            startup.add("warmup", lambda: False)
+            started = time.perf_counter()
+            self.assertTrue(await startup.wait(timeout=5))
+            return startup, time.perf_counter() - started
+
+        startup, elapsed = asyncio.run(scenario())
+        self.assertLess(elapsed, 0.35)  # Sequential would take 0.4 s
+
+        steps = {step["name"]: step for step in startup.timeline()}
+        self.assertEqual(steps["llm"]["status"], "ok")
+        self.assertEqual(steps["tts"]["status"], "ok")
+        self.assertEqual(steps["stt"]["status"], "error")
+        self.assertEqual(steps["warmup"]["status"], "failed")
+        self.assertGreaterEqual(steps["llm"]["duration_ms"], 150)
+        self.assertIn("ready", startup.format_timeline())
+
+    def test_public_ip_cache(self):
+        """A fresh cached IP is used without a lookup; a stale one is the fallback"""
+        with open(self.cache_path, 'w') as file:
+            json.dump({"ip": "203.0.113.7", "fetched_at": time.time()}, file)
+
+        with patch('aiohttp.ClientSession') as session:
+            ip = asyncio.run(get_public_ip(self.cache_path, ttl=60))
+        self.assertEqual(ip, "203.0.113.7")
+        session.assert_not_called()
+
+        with open(self.cache_path, 'w') as file:
+            json.dump({"ip": "203.0.113.7", "fetched_at": time.time() - 120}, file)
+        with patch('aiohttp.ClientSession', side_effect=OSError("offline")):
+            ip = asyncio.run(get_public_ip(self.cache_path, ttl=60))
+        self.assertEqual(ip, "203.0.113.7")
+
+        os.remove(self.cache_path)
+        with patch('aiohttp.ClientSession', side_effect=OSError("offline")):
+            self.assertEqual(asyncio.run(get_public_ip(self.cache_path, ttl=60)), "unknown")
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
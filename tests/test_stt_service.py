@@ -0,0 +1,68 @@
+import unittest
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+from utils.stt_service import SpeechToTextService
+
+class FakeRecorder:
+    """Recorder returning scripted utterances, then blocking until aborted"""
+
+    def __init__(self, utterances):
+        self.utterances = list(utterances)
+        self.aborted = threading.Event()
+
+    def text(self):
+        if self.utterances:
+            return self.utterances.pop(0)
+        self.aborted.wait(5)
+        raise RuntimeError("aborted")
+
+    def abort(self):
+        self.aborted.set()
+
+    def shutdown(self):
+        pass
+
+class TestSpeechToTextService(unittest.TestCase):
+    def test_recorder_created_once(self):
+        """The recorder is loaded once and transcripts are queued"""
+        recorder = FakeRecorder(["hello jarvis", "  ", "what time is it"])
+        factory = MagicMock(return_value=recorder)
+
+        async def scenario():
+            service = SpeechToTextService()
+            with patch.object(SpeechToTextService, '_create_recorder', factory):
+                service.start()
+                first = await asyncio.wait_for(service.get(), 5)
+                second = await asyncio.wait_for(service.get(), 5)
+                service.stop()
+            return first, second
+
+        self.assertEqual(asyncio.run(scenario()), ("hello jarvis", "what time is it"))
+        factory.assert_called_once()
+
+    def test_wakeword_callback(self):
+        """Wake word callback test"""
+        callback = MagicMock()
+        service = SpeechToTextService(on_wakeword=callback)
+        service._wakeword_detected()
+        callback.assert_called_once()
+
+    def test_partial_transcripts(self):
+        """Stabilized partials reach the event loop and enable realtime transcription"""
+        async def scenario():
+            partials = []
+            service = SpeechToTextService(on_partial=partials.append)
+            service._loop = asyncio.get_running_loop()
+            service._partial_transcript(" what is the ")
+            service._partial_transcript("")
+            await asyncio.sleep(0)
+            return partials
+
+        self.assertEqual(asyncio.run(scenario()), ["what is the"])
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
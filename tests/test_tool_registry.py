@@ -0,0 +1,154 @@
+import unittest
+import json
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Dict, List, Literal, Optional
+from unittest.mock import patch
+from utils.tool_registry import ToolRegistry, ToolError
+from utils.execute_response import run_tool_calls, execute_response
+
+def tool_call(name, **arguments):
+    return SimpleNamespace(function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+
+class TestToolRegistry(unittest.TestCase):
+    def setUp(self):
+        """Setup to run before each test"""
+        self.registry = ToolRegistry()
+        self.calls = []
+
+        @self.registry.tool(read_only=True, cacheable=True, dynamic=True)
+        async def lookup(query: str, limit: int = 3, tags: Optional[List[str]] = None, *, secrets: Dict[str, Any] = None) -> str:
+            """
+            Look something up
+
+            Args:
+                query: What to look up
+                limit: Maximum results,
+                    at least 1
+            """
+            self.calls.append(("lookup", query))
+            await asyncio.sleep(0.05)
+            return f"{query}:{limit}:{secrets['key']}"
+
+        @self.registry.tool(name="switch", timeout=0.05, max_concurrency=1)
+        async def set_switch(state: Literal["on", "off"], delay: float = 0.0) -> Dict[str, str]:
+            """Flip the switch"""
+            self.calls.append(("switch", state))
+            await asyncio.sleep(delay)
+            return {"state": state}
+
+    def test_schema_from_signature(self):
+        """Schemas come from annotations and docstrings; context parameters are hidden"""
+        lookup, switch = self.registry.schemas()
+        self.assertEqual(lookup["function"]["description"], "Look something up")
+        self.assertEqual(lookup["function"]["parameters"], {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "What to look up"},
+                "limit": {"type": "integer", "description": "Maximum results, at least 1"},
+                "tags": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["query"]
+        })
+        self.assertEqual(switch["function"]["name"], "switch")
+        self.assertEqual(switch["function"]["parameters"]["properties"]["state"], {"type": "string", "enum": ["on", "off"]})
+        self.assertEqual(self.registry.dynamic_tools(), ["lookup"])
+        self.assertIs(self.registry.schemas(), self.registry.schemas())  # Built once
+        self.assertEqual([schema["function"]["name"] for schema in self.registry.schemas(exclude="lookup")], ["switch"])
+
+    def test_call(self):
+        """Dispatch injects context, validates arguments, caches and times out"""
+        async def scenario():
+            context = {"secrets": {"key": "k"}}
+            return [
+                await self.registry.call("lookup", {"query": "a", "extra": 1}, context),
+                await self.registry.call("lookup", {"query": "a"}, context),  # Cached
+                await self.registry.call("lookup", {}, context),
+                await self.registry.call("missing", {}),
+                await self.registry.call("switch", {"state": "on"}),
+                await self.registry.call("switch", {"state": "off", "delay": 1})
+            ]
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results[0], "a:3:k")
+        self.assertEqual(results[1], "a:3:k")
+        self.assertEqual(self.calls.count(("lookup", "a")), 1)
+        self.assertEqual(results[2], "Missing arguments for lookup: query")
+        self.assertEqual(results[3], "Unknown tool: missing")
+        self.assertEqual(json.loads(results[4]), {"state": "on"})
+        self.assertEqual(results[5], "Tool switch timed out")
+
+    def test_cache_skips_failures_and_follows_context(self):
+        """Failed calls are not cached; changed context values miss the cache"""
+        @self.registry.tool(read_only=True, cacheable=True)
+        async def forecast(city: str, *, secrets: Dict[str, Any] = None) -> str:
+            """Forecast"""
+            self.calls.append(("forecast", city))
+            if not (secrets or {}).get("key"):
+                raise ToolError("API key not configured")
+            return f"{city}:{secrets['key']}"
+
+        async def scenario():
+            return [
+                await self.registry.call("forecast", {"city": "Paris"}, {"secrets": {}}),
+                await self.registry.call("forecast", {"city": "Paris"}, {"secrets": {}}),
+                await self.registry.call("forecast", {"city": "Paris"}, {"secrets": {"key": "k1"}}),
+                await self.registry.call("forecast", {"city": "Paris"}, {"secrets": {"key": "k1"}}),  # Cached
+                await self.registry.call("forecast", {"city": "Paris"}, {"secrets": {"key": "k2"}})
+            ]
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results, ["API key not configured"] * 2 + ["Paris:k1", "Paris:k1", "Paris:k2"])
+        self.assertEqual(self.calls.count(("forecast", "Paris")), 4)
+
+    def test_read_only_calls_run_concurrently(self):
+        """Consecutive read-only calls overlap; side-effecting calls keep their order"""
+        calls = [
+            tool_call("lookup", query="x"),
+            tool_call("lookup", query="y"),
+            tool_call("lookup", query="z"),
+            tool_call("switch", state="on")
+        ]
+        events = []
+        context = {"secrets": {"key": "k"}, "on_event": events.append}
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            with patch('utils.execute_response.get_tool_registry', return_value=self.registry):
+                results = await run_tool_calls(calls, context, "")
+            return results, loop.time() - started
+
+        results, elapsed = asyncio.run(scenario())
+        self.assertEqual(results, [("lookup", "x:3:k"), ("lookup", "y:3:k"), ("lookup", "z:3:k"), ("switch", '{"state": "on"}')])
+        self.assertLess(elapsed, 0.12)  # Sequential would take 0.15 s
+        self.assertEqual([event["type"] for event in events].count("tool_result"), 4)
+
+    def test_execute_response_passes_dynamic_results_back(self):
+        """Dynamic tool results go through the assistant"""
+        class FakeAssistant:
+            async def process_tool_result(self, tool_name, result, user_input, context=None):
+                return f"{tool_name} said {result}"
+
+        message = SimpleNamespace(tool_calls=[tool_call("lookup", query="q")], content=None)
+        response = SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        context = {"secrets": {"key": "k"}, "assistant": FakeAssistant()}
+
+        with patch('utils.execute_response.get_tool_registry', return_value=self.registry):
+            result = asyncio.run(execute_response(response, "", context, dynamic_tools=["lookup"]))
+        self.assertEqual(result, "lookup said q:3:k")
+
+    def test_builtin_tools(self):
+        """The built-in tools are registered with their metadata"""
+        import tools
+        names = [schema["function"]["name"] for schema in tools.registry.schemas()]
+        self.assertEqual(names, ["get_weather", "search_wikipedia", "get_news", "execute_command", "open_browser", "add_memory", "python_code"])
+        self.assertEqual(tools.registry.dynamic_tools(), ["get_weather", "search_wikipedia", "get_news", "add_memory"])
+        self.assertTrue(tools.registry.get("search_wikipedia").read_only)
+        self.assertFalse(tools.registry.get("execute_command").read_only)
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
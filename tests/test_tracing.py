@@ -0,0 +1,222 @@
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from aiohttp import web, ClientSession
+from utils.tracing import Tracer, span, traced, current_span, http_trace_config, CLIENT
+from utils.tool_registry import get_tool_registry
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "traces.jsonl")
+        self.tracer = Tracer(self.path)
+        self.patcher = patch("utils.tracing._tracer", self.tracer)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tracer.shutdown()
+        self.tmp.cleanup()
+
+    def lines(self):
+        self.tracer.flush()
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as file:
+            return [json.loads(line) for line in file]
+
+    def spans(self):
+        return [span for line in self.lines() for span in line["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+
+    def test_nested_spans_exported_as_otlp(self):
+        """A trace is written as one OTLP JSON line when its root ends"""
+        with span("turn", **{"turn.id": "abc", "input.chars": 5}) as root:
+            with span("llm.query", CLIENT) as child:
+                child.set_attribute("gen_ai.usage.input_tokens", 12)
+            self.assertEqual(self.lines(), [])  # Buffered until the root ends
+
+        lines = self.lines()
+        self.assertEqual(len(lines), 1)
+        resource = lines[0]["resourceSpans"][0]
+        self.assertEqual(resource["resource"]["attributes"][0]["value"]["stringValue"], "ai-assistant")
+        spans = {span["name"]: span for span in resource["scopeSpans"][0]["spans"]}
+        self.assertEqual(spans["llm.query"]["traceId"], spans["turn"]["traceId"])
+        self.assertEqual(spans["llm.query"]["parentSpanId"], root.span_id)
+        self.assertNotIn("parentSpanId", spans["turn"])
+        self.assertEqual(spans["llm.query"]["kind"], CLIENT)
+        self.assertIn({"key": "gen_ai.usage.input_tokens", "value": {"intValue": "12"}}, spans["llm.query"]["attributes"])
+        self.assertIn({"key": "turn.id", "value": {"stringValue": "abc"}}, spans["turn"]["attributes"])
+        self.assertEqual(len(spans["turn"]["traceId"]), 32)
+        self.assertLessEqual(int(spans["turn"]["startTimeUnixNano"]), int(spans["llm.query"]["startTimeUnixNano"]))
+        self.assertIsNone(current_span())
+
+    def test_context_follows_tasks_and_threads(self):
+        """Spans in gathered tasks and worker threads are children of the span that started them"""
+        def blocking():
+            with span("thread"):
+                pass
+
+        @traced("tool")
+        async def tool():
+            await asyncio.to_thread(blocking)
+
+        async def turn():
+            with span("turn") as root:
+                await asyncio.gather(tool(), tool())
+                return root
+
+        root = asyncio.run(turn())
+        spans = self.spans()
+        tools = [span for span in spans if span["name"] == "tool"]
+        threads = [span for span in spans if span["name"] == "thread"]
+        self.assertEqual(len(spans), 5)
+        self.assertTrue(all(span["parentSpanId"] == root.span_id for span in tools))
+        self.assertEqual(sorted(span["parentSpanId"] for span in threads), sorted(span["spanId"] for span in tools))
+
+    def test_errors_marked(self):
+        """An exception leaving a span sets its status to error"""
+        with self.assertRaises(ValueError):
+            with span("turn"):
+                raise ValueError("boom")
+
+        status = self.spans()[0]["status"]
+        self.assertEqual(status, {"code": 2, "message": "boom"})
+
+    def test_min_duration_and_late_spans(self):
+        """Fast traces are dropped; spans ending after their root are appended with the same trace id"""
+        self.tracer.configure(min_duration_ms=10_000)
+        with span("fast"):
+            pass
+        self.assertEqual(self.lines(), [])
+
+        self.tracer.configure(min_duration_ms=0)
+        with span("turn") as root:
+            tts = self.tracer.start_span("tts")
+        tts.end()
+
+        lines = self.lines()
+        self.assertEqual(len(lines), 2)
+        late = lines[1]["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        self.assertEqual(late["name"], "tts")
+        self.assertEqual(late["traceId"], root.trace.trace_id)
+        self.assertEqual(self.tracer.traces, 1)
+
+    def test_disabled(self):
+        """With tracing off, spans are None and nothing is written"""
+        self.tracer.configure(enabled=False)
+        with span("turn") as root:
+            self.assertIsNone(root)
+            self.assertIsNone(current_span())
+        self.assertEqual(self.lines(), [])
+
+    def test_http_client_spans(self):
+        """Outbound aiohttp requests get CLIENT spans without their query string"""
+        async def handler(request):
+            return web.json_response({"ok": True}, status=200 if request.path == "/ok" else 500)
+
+        async def run():
+            app = web.Application()
+            app.router.add_get("/ok", handler)
+            app.router.add_get("/fail", handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            try:
+                with span("tool"):
+                    async with ClientSession(trace_configs=[http_trace_config()]) as session:
+                        for path in ("/ok", "/fail"):
+                            async with session.get(f"http://127.0.0.1:{port}{path}", params={"appid": "secret"}) as response:
+                                await response.read()
+            finally:
+                await runner.cleanup()
+            return port
+
+        port = asyncio.run(run())
+        spans = [span for span in self.spans() if span["kind"] == CLIENT]
+        self.assertEqual([span["name"] for span in spans], ["GET", "GET"])
+        attributes = {item["key"]: item["value"] for item in spans[0]["attributes"]}
+        self.assertEqual(attributes["url.full"]["stringValue"], f"http://127.0.0.1:{port}/ok")
+        self.assertEqual(attributes["http.response.status_code"]["intValue"], "200")
+        self.assertNotIn("secret", json.dumps(spans))
+        self.assertEqual(spans[1]["status"]["code"], 2)
+
+    def test_turn_trace(self):
+        """A handleAI turn with a dynamic tool is one trace covering LLM calls, the tool and its follow-up"""
+        import main
+        from benchmarks.mock_openai import MockOpenAIServer
+        from utils.assistant import Assistant
+        from utils.latency import start_turn
+
+        registry = get_tool_registry()
+
+        @registry.tool(read_only=True, dynamic=True)
+        async def trace_lookup(query: str) -> str:
+            """
+            Test lookup
+
+            Args:
+                query: Query
+            """
+            return "found"
+
+        script = [{"match": "look", "tool_calls": [{"name": "trace_lookup", "arguments": {"query": "x"}}]}]
+        server = MockOpenAIServer(script=script).start()
+        config = {"api_url": server.url, "auth_token": "test", "model": "mock"}
+        assistant = Assistant(config, {}, "prompt", memory_manager=MagicMock(getItems=lambda: [], namespace="t"),
+                              dynamic_tools=["trace_lookup"])
+        try:
+            with patch.object(main, "assistant", assistant), patch.object(main, "speech_enabled", False), \
+                 patch("builtins.print"):
+                async def turn():
+                    start_turn("text")
+                    await main.handleAI("please look it up")
+                asyncio.run(turn())
+        finally:
+            server.stop()
+            registry.remove("trace_lookup")
+
+        spans = self.spans()
+        by_id = {span["spanId"]: span for span in spans}
+        names = [span["name"] for span in spans]
+        self.assertEqual(len({span["traceId"] for span in spans}), 1)
+        self.assertEqual(names.count("llm.query"), 2)
+        self.assertEqual(names.count("llm.prompt"), 2)
+        self.assertEqual(names.count("llm.request"), 2)
+        self.assertIn("memory.recall", names)
+        tool = next(span for span in spans if span["name"] == "tool trace_lookup")
+        follow_up = next(span for span in spans if span["name"] == "assistant.process_tool_result")
+        root = next(span for span in spans if span["name"] == "turn")
+        self.assertEqual(by_id[tool["parentSpanId"]]["name"], "assistant.respond")
+        self.assertEqual(by_id[follow_up["parentSpanId"]]["name"], "assistant.respond")
+        self.assertEqual(by_id[by_id[tool["parentSpanId"]]["parentSpanId"]], root)
+
+    def test_respond_opens_turn_span(self):
+        """Turns outside handleAI (server sessions, batch items) get their own root turn span"""
+        from utils.assistant import Assistant
+        from utils.latency import start_turn
+
+        assistant = Assistant({}, {}, "prompt", memory_manager=MagicMock(getItems=lambda: [], namespace="t"))
+        response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Hello", tool_calls=None))])
+
+        async def turns():
+            for _ in range(2):
+                start_turn("http")
+                await assistant.respond("hi", response, remember=False)
+
+        asyncio.run(turns())
+        spans = self.spans()
+        roots = [span for span in spans if "parentSpanId" not in span]
+        self.assertEqual([span["name"] for span in roots], ["turn", "turn"])
+        self.assertIn({"key": "turn.source", "value": {"stringValue": "http"}}, roots[0]["attributes"])
+        self.assertNotEqual(roots[0]["traceId"], roots[1]["traceId"])
+        respond = next(span for span in spans if span["name"] == "assistant.respond")
+        self.assertIn(respond["parentSpanId"], {span["spanId"] for span in roots})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import os
+import asyncio
+import tempfile
+import threading
+from unittest.mock import MagicMock, patch
+from utils.audio_cache import AudioCache
+from utils.tts_service import TextToSpeechWorker, split_sentences
+
+class FakeEngine:
+    """Engine recording spoken chunks; blocks on chunks containing 'slow'"""
+
+    def __init__(self):
+        self.spoken = []
+        self.stopped = threading.Event()
+        self.current = None
+
+    def say(self, text):
+        self.current = text
+
+    def runAndWait(self):
+        if "slow" in self.current:
+            self.stopped.wait(5)
+        self.spoken.append(self.current)
+
+    def stop(self):
+        self.stopped.set()
+
+    def save_to_file(self, text, path):
+        self.current = text
+        with open(path, 'w') as file:
+            file.write(text)
+
+class TestTextToSpeechWorker(unittest.TestCase):
+    def test_split_sentences(self):
+        """Sentence chunking test"""
+        self.assertEqual(
+            split_sentences("Hello sir. The weather is sunny!\nAnything else?"),
+            ["Hello sir.", "The weather is sunny!", "Anything else?"]
+        )
+        self.assertEqual(split_sentences("   "), [])
+        self.assertTrue(all(len(chunk) <= 301 for chunk in split_sentences("word " * 200)))
+
+    def test_speak_does_not_block(self):
+        """Speech is queued and spoken on the worker thread"""
+        engine = FakeEngine()
+        worker = TextToSpeechWorker()
+        with patch.object(TextToSpeechWorker, '_create_engine', return_value=engine):
+            worker.speak("First sentence. Second sentence.")
+            asyncio.run(asyncio.wait_for(worker.wait_idle(), 5))
+            worker.stop()
+
+        self.assertEqual(engine.spoken, ["First sentence.", "Second sentence."])
+
+    def test_cancel_flushes_queue(self):
+        """Barge-in cancellation test"""
+        engine = FakeEngine()
+        worker = TextToSpeechWorker()
+        with patch.object(TextToSpeechWorker, '_create_engine', return_value=engine):
+            worker.speak("A slow sentence. Never spoken. Also never spoken.")
+            worker.ready.wait(5)
+            worker.cancel()
+            self.assertFalse(worker.is_speaking)
+            worker.stop()
+
+        self.assertTrue(engine.stopped.is_set())
+        self.assertNotIn("Never spoken.", engine.spoken)
+
+    def test_pipelined_playback_uses_cache(self):
+        """Rendered sentences are played in order and reused from the cache"""
+        engine = FakeEngine()
+        played = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            worker = TextToSpeechWorker(cache=AudioCache(os.path.join(temp_dir, 'tts_cache')))
+
+            def play_file(path, generation):
+                with open(path) as file:
+                    played.append(file.read())
+
+            with patch.object(TextToSpeechWorker, '_create_engine', return_value=engine), \
+                 patch.object(TextToSpeechWorker, '_create_audio_output', return_value=MagicMock()), \
+                 patch.object(TextToSpeechWorker, '_play_file', side_effect=play_file), \
+                 patch.object(TextToSpeechWorker, '_close_stream'):
+                worker.speak("Let me check that for you, sir. One moment.")
+                asyncio.run(asyncio.wait_for(worker.wait_idle(), 5))
+                worker.speak("Let me check that for you, sir.")
+                asyncio.run(asyncio.wait_for(worker.wait_idle(), 5))
+                worker.stop()
+
+            self.assertEqual(played, ["Let me check that for you, sir.", "One moment.", "Let me check that for you, sir."])
+            self.assertEqual(engine.spoken, ["Let me check that for you, sir.", "One moment."])  # Rendered once each
+            self.assertEqual(worker.cache.hits, 1)
+
+def run_tests():
+    unittest.main()
+
+if __name__ == '__main__':
+    run_tests()
@@ -1,133 +1,114 @@
-TOOLS = [
-    {
-        "type": "function",
-        "function": {
-            "name": "get_weather",
-            "description": "Get weather forecast for a city",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "city": {
-                        "type": "string",
-                        "description": "The city to get weather for"
-                    }
-                },
-                "required": ["city"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "search_wikipedia",
-            "description": "Search Wikipedia for information",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The search query"
-                    }
-                },
-                "required": ["query"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_news",
-            "description": "Get news articles about a topic",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The news topic to search for"
-                    }
-                },
-                "required": ["query"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "execute_command",
-            "description": "Execute a system command",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "command_type": {
-                        "type": "string",
-                        "enum": ["cmd", "ps"],
-                        "description": "Type of command (cmd or ps)"
-                    },
-                    "command": {
-                        "type": "string",
-                        "description": "The command to execute"
-                    }
-                },
-                "required": ["command_type", "command"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "open_browser",
-            "description": "Open a URL in the default browser",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "url": {
-                        "type": "string",
-                        "description": "The URL to open"
-                    }
-                },
-                "required": ["url"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "add_memory",
-            "description": "Add a new text to memory",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "text": {
-                        "type": "string",
-                        "description": "The text to add to memory"
-                    }
-                },
-                "required": ["text"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "python_code",
-            "description": "Execute Python code for calculations, data processing and graph plotting",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "code": {
-                        "type": "string",
-                        "description": "The Python code to execute. You must define a variable 'result' to return the output. (Example: result = 2 + 2)"
-                    }
-                },
-                "required": ["code"]
-            }
-        }
-    },
-]
-
-DYNAMIC_TOOLS = [
-    "get_weather",
-    "search_wikipedia",
-    "get_news",
-    "add_memory"
-]
\ No newline at end of file
+import asyncio
+import webbrowser
+from typing import Any, Dict, Literal, Optional
+import utils.tool_utils as tool_utils
+from utils.execute_response import (
+    is_command_allowed,
+    is_domain_allowed,
+    execute_shell_command,
+    execute_powershell_command
+)
+from utils.tool_registry import get_tool_registry
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Tools are registered here with their schemas, derived from the signature
+# and the docstring's Args block. Keyword-only parameters (after *) are not
+# shown to the LLM; they are filled from the turn context.
+registry = get_tool_registry()
+
+@registry.tool(read_only=True, cacheable=True, dynamic=True, timeout=15, cache_ttl=600)
+async def get_weather(city: str, *, secrets: Dict[str, Any]) -> str:
+    """
+    Get weather forecast for a city
+
+    Args:
+        city: The city to get weather for
+    """
+    return await tool_utils.get_weather(city, (secrets or {}).get("weather_api_key"))
+
+@registry.tool(read_only=True, cacheable=True, dynamic=True, timeout=15, cache_ttl=3600)
+async def search_wikipedia(query: str) -> str:
+    """
+    Search Wikipedia for information
+
+    Args:
+        query: The search query
+    """
+    return await tool_utils.search_wikipedia(query)
+
+@registry.tool(read_only=True, cacheable=True, dynamic=True, timeout=15)
+async def get_news(query: str, *, secrets: Dict[str, Any]) -> str:
+    """
+    Get news articles about a topic
+
+    Args:
+        query: The news topic to search for
+    """
+    return await tool_utils.get_news(query, (secrets or {}).get("news_api_key"))
+
+@registry.tool(timeout=10, max_concurrency=1)
+async def execute_command(command_type: Literal["cmd", "ps"], command: str) -> str:
+    """
+    Execute a system command
+
+    Args:
+        command_type: Type of command (cmd or ps)
+        command: The command to execute
+    """
+    if not is_command_allowed(command_type, command):
+        return f"Command '{command}' cannot be executed due to security restrictions."
+
+    success, output = await (
+        execute_shell_command(command)
+        if command_type == "cmd"
+        else execute_powershell_command(command)
+    )
+
+    if success:
+        logger.info(f"Command executed successfully: {command}")
+        return output
+    logger.error(f"Command execution failed: {output}")
+    return f"Command error: {output}"
+
+@registry.tool(timeout=10)
+async def open_browser(url: str) -> str:
+    """
+    Open a URL in the default browser
+
+    Args:
+        url: The URL to open
+    """
+    if not is_domain_allowed(url):
+        return f"URL '{url}' cannot be opened due to security restrictions."
+
+    try:
+        await asyncio.to_thread(webbrowser.open, url)
+        return "Browser opened successfully"
+    except Exception as e:
+        logger.error(f"Browser command error: {e}")
+        return f"URL opening error: {str(e)}"
+
+@registry.tool(dynamic=True)
+async def add_memory(text: str, importance: Optional[float] = None, *, memory_namespace: Optional[str] = None) -> str:
+    """
+    Add a new text to memory
+
+    Args:
+        text: The text to add to memory
+        importance: How important the memory is to keep, from 0 (trivia) to 1 (essential)
+    """
+    return await tool_utils.add_memory(text, memory_namespace, importance or 0.0)
+
+@registry.tool
+async def python_code(code: str) -> str:
+    """
+    Execute Python code for calculations, data processing and graph plotting
+
+    Args:
+        code: The Python code to execute. You must define a variable 'result' to return the output. (Example: result = 2 + 2)
+    """
+    if not code or not isinstance(code, str):
+        return "Invalid Python code"
+    return await tool_utils.python_code(code)
@@ -0,0 +1,268 @@
+import os
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+DEFAULT_NPROBE = 8
+MIN_NLIST = 16
+MAX_NLIST = 4096
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+RETRAIN_GROWTH = 4
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so inner product equals cosine similarity"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+class _InvertedList:
+    """Growable (ids, vectors) arrays of one IVF cell"""
+
+    def __init__(self, dim: int, capacity: int = 16):
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.vectors = np.empty((capacity, dim), dtype=np.float32)
+        self.size = 0
+
+    def append(self, ids: np.ndarray, vectors: np.ndarray) -> int:
+        """Append rows and return the position of the first one"""
+        start = self.size
+        needed = start + len(ids)
+        if needed > len(self.ids):
+            capacity = max(needed, len(self.ids) * 2)
+            self.ids = np.resize(self.ids, capacity)
+            grown = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+            grown[:start] = self.vectors[:start]
+            self.vectors = grown
+        self.ids[start:needed] = ids
+        self.vectors[start:needed] = vectors
+        self.size = needed
+        return start
+
+    def remove(self, position: int) -> Optional[int]:
+        """Swap-remove a row and return the id moved into its place"""
+        last = self.size - 1
+        moved = None
+        if position != last:
+            self.ids[position] = self.ids[last]
+            self.vectors[position] = self.vectors[last]
+            moved = int(self.ids[position])
+        self.size = last
+        return moved
+
+class IVFFlatIndex:
+    def __init__(
+        self,
+        dim: int,
+        nlist: int = 0,
+        nprobe: int = DEFAULT_NPROBE,
+        train_size: int = 0
+    ):
+        """
+        Initialize inverted-file index with exact (flat) scoring inside cells
+
+        Vectors are searched brute force until train_size vectors have been
+        added; the index then clusters them into nlist cells with k-means and
+        only scans the nprobe cells closest to each query. With an automatic
+        nlist the cells are rebuilt whenever the index grows RETRAIN_GROWTH-fold.
+
+        Args:
+            dim: Vector dimension
+            nlist: Number of cells (0 picks sqrt(n) when training)
+            nprobe: Number of cells scanned per query (higher = better recall, slower)
+            train_size: Vector count that triggers training (0 picks 64*nlist)
+        """
+        self.dim = dim
+        self.nlist = nlist
+        self.auto_nlist = nlist == 0
+        self.nprobe = nprobe
+        self.train_size = train_size or max(MIN_NLIST, nlist or MIN_NLIST) * KMEANS_SAMPLE_PER_LIST
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[_InvertedList] = [_InvertedList(dim)]
+        self.locations: Dict[int, Tuple[int, int]] = {}
+        self.trained_on = 0
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Return the nearest cell of each vector"""
+        if self.centroids is None:
+            return np.zeros(len(vectors), dtype=np.intp)
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def _insert(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        """Insert normalized vectors into their cells"""
+        cells = self._assign(vectors)
+        order = np.argsort(cells, kind="stable")
+        cells, ids, vectors = cells[order], ids[order], vectors[order]
+        boundaries = np.flatnonzero(np.diff(cells)) + 1
+
+        for chunk in np.split(np.arange(len(ids)), boundaries):
+            if not len(chunk):
+                continue
+            cell = int(cells[chunk[0]])
+            start = self.lists[cell].append(ids[chunk], vectors[chunk])
+            for offset, item_id in enumerate(ids[chunk]):
+                self.locations[int(item_id)] = (cell, start + offset)
+
+    def train(self, vectors: Optional[np.ndarray] = None) -> None:
+        """
+        Cluster vectors with spherical k-means and rebuild the cells
+
+        Args:
+            vectors: Training vectors (defaults to every indexed vector)
+        """
+        ids, stored = self._all()
+        sample = _normalize(np.asarray(vectors, dtype=np.float32)) if vectors is not None else stored
+        if not len(sample):
+            return
+
+        nlist = self.nlist
+        if self.auto_nlist:
+            nlist = int(np.clip(np.sqrt(max(len(stored), len(sample))), MIN_NLIST, MAX_NLIST))
+        nlist = min(nlist, len(sample))
+        rng = np.random.default_rng(0)
+        max_sample = nlist * KMEANS_SAMPLE_PER_LIST
+        if len(sample) > max_sample:
+            sample = sample[rng.choice(len(sample), max_sample, replace=False)]
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=nlist)
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = _normalize(sums)
+
+        self.centroids = centroids.astype(np.float32)
+        self.nlist = nlist
+        self.lists = [_InvertedList(self.dim) for _ in range(nlist)]
+        self.locations = {}
+        self.trained_on = max(len(ids), len(sample))
+        if len(ids):
+            self._insert(ids, stored)
+        logger.info(f"Trained IVF index with {nlist} cells on {len(sample)} vectors")
+
+    def _all(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return every indexed (ids, vectors)"""
+        ids = [lst.ids[:lst.size] for lst in self.lists]
+        vectors = [lst.vectors[:lst.size] for lst in self.lists]
+        return (
+            np.concatenate(ids) if ids else np.empty(0, dtype=np.int64),
+            np.concatenate(vectors) if vectors else np.empty((0, self.dim), dtype=np.float32)
+        )
+
+    def add(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        """
+        Insert or replace vectors
+
+        Args:
+            ids: Item ids
+            vectors: 2-D array of vectors, one row per id
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(ids):
+            return
+
+        for item_id in ids:
+            self.remove(int(item_id))
+
+        self._insert(ids, _normalize(np.asarray(vectors, dtype=np.float32)))
+        if not self.is_trained and len(self) >= self.train_size:
+            self.train()
+        elif self.is_trained and self.auto_nlist and len(self) >= self.trained_on * RETRAIN_GROWTH:
+            self.train()
+
+    def remove(self, item_id: int) -> bool:
+        """
+        Delete a vector
+
+        Returns:
+            bool: True if the id was indexed
+        """
+        location = self.locations.pop(item_id, None)
+        if location is None:
+            return False
+
+        cell, position = location
+        moved = self.lists[cell].remove(position)
+        if moved is not None:
+            self.locations[moved] = (cell, position)
+        return True
+
+    def search(self, query: np.ndarray, k: int = 5, nprobe: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Return approximate k nearest neighbours by cosine similarity
+
+        Args:
+            query: Query vector
+            k: Number of results
+            nprobe: Cells to scan (defaults to self.nprobe)
+
+        Returns:
+            List of (item_id, similarity) pairs, most similar first
+        """
+        if not len(self) or k <= 0:
+            return []
+
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(-1))
+        if self.is_trained:
+            probe = min(nprobe or self.nprobe, self.nlist)
+            cells = np.argpartition(-(self.centroids @ query), probe - 1)[:probe]
+        else:
+            cells = [0]
+
+        lists = [self.lists[cell] for cell in cells if self.lists[cell].size]
+        if not lists:
+            return []
+        ids = np.concatenate([lst.ids[:lst.size] for lst in lists])
+        scores = np.concatenate([lst.vectors[:lst.size] @ query for lst in lists])
+
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def save(self, path: str) -> None:
+        """Persist the index to a .npz file"""
+        ids, vectors = self._all()
+        temp_path = path + ".tmp.npz"
+        np.savez(
+            temp_path,
+            ids=ids,
+            vectors=vectors,
+            centroids=self.centroids if self.centroids is not None else np.empty((0, self.dim), dtype=np.float32),
+            params=np.asarray([
+                self.dim, self.nlist, self.nprobe, self.train_size, int(self.auto_nlist), self.trained_on
+            ], dtype=np.int64)
+        )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFFlatIndex":
+        """Load an index saved with save()"""
+        with np.load(path) as data:
+            dim, nlist, nprobe, train_size, auto_nlist, trained_on = (int(v) for v in data["params"])
+            index = cls(dim, nlist=nlist, nprobe=nprobe, train_size=train_size)
+            index.auto_nlist = bool(auto_nlist)
+            index.trained_on = trained_on
+            if len(data["centroids"]):
+                index.centroids = data["centroids"]
+                index.lists = [_InvertedList(dim) for _ in range(len(index.centroids))]
+            if len(data["ids"]):
+                index._insert(data["ids"], data["vectors"])
+        return index
+
+# Export
+export = {
+    'IVFFlatIndex': IVFFlatIndex
+}
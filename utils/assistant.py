@@ -0,0 +1,226 @@
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional
+from utils.execute_response import execute_response
+from utils.query import query_llm
+from utils.startup import get_public_ip
+from utils.config_manager import get_config_manager
+from utils.history import ConversationHistory
+from utils.tracing import span, traced, turn_span
+from utils.logger import get_logger
+from utils.plugins import load_plugins
+from tools import registry as tool_registry
+
+logger = get_logger()
+
+# Constants
+DEFAULT_PROMPT_FILE = "system_prompt.txt"
+
+def load_system_prompt(path: str = DEFAULT_PROMPT_FILE) -> str:
+    with open(path, "r") as file:
+        return file.read()
+
+class Assistant:
+    def __init__(
+        self,
+        config: Optional[Mapping[str, Any]],
+        secrets: Optional[Mapping[str, Any]],
+        system_prompt: str,
+        memory_manager: Any = None,
+        dynamic_tools: Optional[List[str]] = None
+    ):
+        """
+        Conversation turn pipeline: memory recall, LLM query and tool execution
+
+        Holds no audio or UI state, so text, voice, replay and other front
+        ends share it. The memory manager is created on first use. Plugin
+        tools are discovered (manifests only) when the first assistant is
+        created.
+
+        Args:
+            config: Config values (None to follow the shared, hot-reloaded config snapshot)
+            secrets: API keys (None to follow the shared config snapshot)
+            system_prompt: System prompt sent with every query
+            memory_manager: Memory namespace to use (default namespace of the shared store if None)
+            dynamic_tools: Tools whose results are passed back through the LLM (the registry's dynamic tools if None)
+        """
+        self._config = config
+        self._secrets = secrets
+        self.system_prompt = system_prompt
+        load_plugins(self.config)
+        self.dynamic_tools = tool_registry.dynamic_tools() if dynamic_tools is None else dynamic_tools
+        self.system_ip: Optional[str] = None
+        self.history = ConversationHistory.from_config(self.config)
+        self._memory_manager = memory_manager
+        self._memory_lock = threading.Lock()  # Memory may be warmed up on a worker thread
+
+    @classmethod
+    def from_files(cls, prompt_path: str = DEFAULT_PROMPT_FILE, **kwargs) -> "Assistant":
+        """Create an assistant following the shared config snapshot, with the prompt of system_prompt.txt"""
+        return cls(None, None, load_system_prompt(prompt_path), **kwargs)
+
+    @property
+    def config(self) -> Mapping[str, Any]:
+        """Config values (the current snapshot when following the shared config)"""
+        return get_config_manager().config if self._config is None else self._config
+
+    @property
+    def secrets(self) -> Mapping[str, Any]:
+        return get_config_manager().secrets if self._secrets is None else self._secrets
+
+    def spawn(self, memory_manager: Any = None) -> "Assistant":
+        """Create an assistant sharing this one's config, prompt, tools and IP, with its own memory and history"""
+        assistant = Assistant(
+            self._config,
+            self._secrets,
+            self.system_prompt,
+            memory_manager=memory_manager,
+            dynamic_tools=self.dynamic_tools
+        )
+        assistant.system_ip = self.system_ip
+        return assistant
+
+    @property
+    def memory_manager(self):
+        with self._memory_lock:
+            if self._memory_manager is None:
+                from utils.memory_manager import get_memory_store
+                self._memory_manager = get_memory_store().get()
+            return self._memory_manager
+
+    @memory_manager.setter
+    def memory_manager(self, manager: Any) -> None:
+        with self._memory_lock:
+            self._memory_manager = manager
+
+    async def init_system(self) -> None:
+        """Look up the public IP sent as context (cached on disk for ip_cache_ttl seconds)"""
+        self.system_ip = await get_public_ip(ttl=float(self.config.get("ip_cache_ttl", 3600)))
+
+    def context(self, on_token: Optional[Callable[[str], None]] = None, on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Context passed to execute_response"""
+        return {
+            "secrets": self.secrets,
+            "system_ip": self.system_ip or "unknown",
+            "memory_namespace": self.memory_manager.namespace,
+            "assistant": self,
+            "on_token": on_token,
+            "on_event": on_event
+        }
+
+    async def recall_memories(self, user_input: str) -> List[str]:
+        """Return the memories sent to the LLM (the k most similar if memory_recall_k is set)"""
+        recall_k = int(self.config.get("memory_recall_k", 0) or 0)
+        if recall_k > 0:
+            return await self.memory_manager.searchAsync(user_input, recall_k)
+        return self.memory_manager.getItems()
+
+    async def query_ai(self, user_input: str, **kwargs) -> Any:
+        """Recall memories and query the LLM (no side effects, safe to speculate)"""
+        with span("memory.recall") as recall_span:
+            memories = await self.recall_memories(user_input)
+            if recall_span is not None:
+                recall_span.set_attribute("memories", len(memories))
+        return await query_llm(
+            prompt=user_input,
+            memory_texts=memories,
+            system_ip=self.system_ip or "unknown",
+            config=self.config,
+            model=self.config.get('llm_model', 'gpt-3.5-turbo'),
+            system_prompt=self.system_prompt,
+            history=self.history.messages() or None,
+            **kwargs
+        )
+
+    async def process_tool_result(
+        self,
+        tool_name: str,
+        result: str,
+        user_input: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Process tool result through AI if needed"""
+        context = context or self.context()
+        if tool_name in self.dynamic_tools:
+            with span("assistant.process_tool_result", **{"tool.name": tool_name}):
+                ai_response = await self.query_ai(
+                    user_input,
+                    answer=result,  # Pass the tool result as context
+                    current_tool=tool_name,
+                    on_token=context.get("on_token")
+                )
+                if ai_response:
+                    response = await execute_response(
+                        ai_response,
+                        user_input,
+                        context,
+                        dynamic_tools=self.dynamic_tools
+                    )
+                    return response if response else result
+        return result
+
+    async def respond(
+        self,
+        user_input: str,
+        ai_response: Any = None,
+        on_token: Optional[Callable[[str], None]] = None,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        remember: bool = True
+    ) -> Optional[str]:
+        """
+        Run one turn (in a root "turn" span unless the caller opened one)
+
+        Args:
+            user_input: User message
+            ai_response: Already available LLM response (e.g. speculative prefill)
+            on_token: Streams LLM content fragments (called on the event loop)
+            on_event: Receives tool_call and tool_result events
+            remember: Add the turn, with its tool results, to the conversation history
+
+        Returns:
+            Response text, or None if the LLM query failed
+        """
+        with turn_span(user_input, speculative=ai_response is not None):
+            return await self._respond(user_input, ai_response, on_token, on_event, remember)
+
+    @traced("assistant.respond")
+    async def _respond(
+        self,
+        user_input: str,
+        ai_response: Any,
+        on_token: Optional[Callable[[str], None]],
+        on_event: Optional[Callable[[Dict[str, Any]], None]],
+        remember: bool
+    ) -> Optional[str]:
+        if ai_response is None:
+            ai_response = await self.query_ai(user_input, on_token=on_token)
+        if not ai_response:
+            return None
+
+        tool_results: List[List[Any]] = []  # [name, arguments, result, call id]
+
+        def record(event: Dict[str, Any]) -> None:
+            if event["type"] == "tool_call":
+                tool_results.append([event["name"], event["arguments"], None, event.get("id")])
+            elif event["type"] == "tool_result":
+                pending = next((call for call in tool_results if call[0] == event["name"] and call[2] is None
+                                and call[3] == event.get("id")), None)
+                if pending is not None:
+                    pending[2] = event["result"]
+            if on_event:
+                on_event(event)
+
+        response = await execute_response(
+            ai_response,
+            user_input,
+            self.context(on_token, record if remember else on_event),
+            dynamic_tools=self.dynamic_tools
+        )
+        if remember and response:
+            self.history.add(user_input, response, [tuple(call[:3]) for call in tool_results if call[2] is not None])
+        return response
+
+# Export
+export = {
+    'Assistant': Assistant,
+    'load_system_prompt': load_system_prompt
+}
@@ -0,0 +1,171 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+DEFAULT_CACHE_DIR = "tts_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+AUDIO_EXTENSION = ".wav"
+
+class AudioCache:
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Content-addressed on-disk cache of rendered speech
+
+        Files are named by a hash of the text and voice settings, so a phrase
+        is synthesized once and replayed afterwards. The least recently used
+        files are deleted when the cache grows past max_bytes.
+
+        Args:
+            directory: Cache directory
+            max_bytes: Maximum total size of cached audio
+        """
+        self.directory = directory
+        self.max_bytes = max(0, int(max_bytes))
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._size = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self) -> None:
+        """Rebuild the LRU index from the files on disk (oldest access first)"""
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(AUDIO_EXTENSION):
+                continue
+            path = os.path.join(self.directory, name)
+            key = name[:-len(AUDIO_EXTENSION)]
+            try:
+                if "." in key:  # Unfinished render from an earlier run
+                    os.remove(path)
+                    continue
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, key, stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._size += size
+
+    @staticmethod
+    def key(text: str, voice: str = "") -> str:
+        """
+        Cache key for a phrase
+
+        Args:
+            text: Spoken text
+            voice: Voice settings the audio was rendered with
+
+        Returns:
+            Hex digest identifying the rendered audio
+        """
+        return hashlib.sha256(f"{voice}\0{text}".encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + AUDIO_EXTENSION)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up rendered audio, marking it as recently used
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Path of the audio file, or None on a miss
+        """
+        path = self.path(key)
+        with self._lock:
+            if key not in self._entries or not os.path.exists(path):
+                self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        try:
+            os.utime(path)  # Keep the on-disk order for the next start
+        except OSError:
+            pass
+        return path
+
+    def put(self, key: str, source_path: str) -> Optional[str]:
+        """
+        Move a freshly rendered file into the cache
+
+        Args:
+            key: Cache key
+            source_path: Rendered audio file (moved, not copied)
+
+        Returns:
+            Path of the cached file, or None if it could not be stored
+        """
+        path = self.path(key)
+        try:
+            size = os.path.getsize(source_path)
+            if size == 0:
+                os.remove(source_path)
+                return None
+            os.replace(source_path, path)
+        except OSError as e:
+            logger.error(f"Error caching audio: {e}")
+            return None
+
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = size
+            self._size += size
+            self._evict(keep=key)
+        return path
+
+    def temp_path(self, key: str) -> str:
+        """Path to render into before put()"""
+        return os.path.join(self.directory, f"{key}.{threading.get_ident()}.part{AUDIO_EXTENSION}")
+
+    def _discard(self, key: str) -> None:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._size -= size
+
+    def _evict(self, keep: str) -> None:
+        """Delete least recently used files until the cache fits"""
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            self._discard(key)
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Delete all cached audio"""
+        with self._lock:
+            for key in list(self._entries):
+                try:
+                    os.remove(self.path(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._size = 0
+
+# Export
+export = {
+    'AudioCache': AudioCache
+}
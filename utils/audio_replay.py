@@ -0,0 +1,257 @@
+import os
+import time
+import wave
+import asyncio
+import numpy as np
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from utils.tts_service import TextToSpeechWorker
+from utils.latency import TurnTimer, percentile
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+SAMPLE_RATE = 16000  # What the STT recorder expects
+CHUNK_SAMPLES = 512  # 32 ms per fed chunk
+TAIL_SILENCE_SECONDS = 1.5  # Lets end-of-speech detection finalize the last utterance
+SETTLE_SECONDS = 10.0  # Wait for late transcripts after a file was fed
+
+def find_wav_files(path: str) -> List[str]:
+    """
+    WAV files to replay
+
+    Args:
+        path: A WAV file or a directory of them
+
+    Returns:
+        Sorted list of WAV file paths
+    """
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(".wav")
+        )
+    return [path]
+
+def load_wav(path: str) -> Tuple[bytes, float]:
+    """
+    Load a PCM WAV file as 16 kHz mono 16-bit audio
+
+    Args:
+        path: WAV file path
+
+    Returns:
+        Tuple of (PCM bytes, duration in seconds)
+    """
+    with wave.open(path, "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported sample width: {width * 8} bits")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE and len(samples):
+        positions = np.arange(0, len(samples), rate / SAMPLE_RATE)
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    return pcm.tobytes(), len(pcm) / SAMPLE_RATE
+
+def feed_audio(recorder: Any, pcm: bytes, speed: float = 1.0, tail_silence: float = TAIL_SILENCE_SECONDS) -> None:
+    """
+    Feed PCM audio into a recorder created with use_microphone=False
+
+    Args:
+        recorder: RealtimeSTT AudioToTextRecorder
+        pcm: 16 kHz mono 16-bit audio
+        speed: Playback speed (1.0 = real time, 0 = as fast as possible)
+        tail_silence: Seconds of silence appended after the audio
+    """
+    pcm = pcm + bytes(int(tail_silence * SAMPLE_RATE) * 2)
+    chunk_bytes = CHUNK_SAMPLES * 2
+    chunk_seconds = CHUNK_SAMPLES / SAMPLE_RATE / speed if speed > 0 else 0.0
+    started_at = time.perf_counter()
+
+    for index, offset in enumerate(range(0, len(pcm), chunk_bytes)):
+        recorder.feed_audio(pcm[offset:offset + chunk_bytes])
+        if chunk_seconds:
+            # Schedule against the start time so sleeps do not accumulate drift
+            delay = started_at + (index + 1) * chunk_seconds - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+class NullEngine:
+    """pyttsx3-compatible engine that produces no audio"""
+
+    def say(self, text: str) -> None:
+        pass
+
+    def runAndWait(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+class NullTextToSpeechWorker(TextToSpeechWorker):
+    """TTS worker with a null audio sink, for headless replay"""
+
+    def _create_engine(self):
+        return NullEngine()
+
+    def _create_audio_output(self):
+        return None
+
+async def replay_file(
+    path: str,
+    stt: Any,
+    run_turn: Callable[[str, Dict[str, float]], Awaitable[Optional[TurnTimer]]],
+    tts: Optional[TextToSpeechWorker] = None,
+    speed: float = 1.0,
+    settle: float = SETTLE_SECONDS
+) -> Dict[str, Any]:
+    """
+    Replay one WAV file through STT and the turn pipeline
+
+    Args:
+        path: WAV file
+        stt: Started SpeechToTextService whose recorder does not use the microphone
+        run_turn: Coroutine handling a transcript and its STT timings, returning the turn
+        tts: TTS worker to wait for after each turn
+        speed: Feed speed (1.0 = real time, 0 = as fast as possible)
+        settle: Seconds to wait for transcripts after the audio was fed
+
+    Returns:
+        Per-file report (wall_seconds ends when the audio was fed or the
+        last turn and its speech finished, leaving out the settle wait)
+    """
+    pcm, duration = load_wav(path)
+    started_at = time.perf_counter()
+    finished_at = started_at
+    feeder = asyncio.ensure_future(asyncio.to_thread(feed_audio, stt.recorder, pcm, speed))
+    fed_at: List[float] = []
+    feeder.add_done_callback(lambda _: fed_at.append(time.perf_counter()))
+    transcripts: List[str] = []
+    turns: List[TurnTimer] = []
+
+    while True:
+        try:
+            text = await asyncio.wait_for(stt.get(), settle if feeder.done() else 0.1)
+        except asyncio.TimeoutError:
+            if feeder.done():
+                break
+            continue
+
+        transcripts.append(text)
+        turn = await run_turn(text, stt.last_timings)
+        if tts is not None:
+            await tts.wait_idle()
+        finished_at = time.perf_counter()
+        if turn is not None:
+            turns.append(turn)
+
+    await feeder  # Surface feeding errors
+    wall_seconds = max(finished_at, *fed_at) - started_at
+    return {
+        "file": path,
+        "audio_seconds": round(duration, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "real_time_factor": round(wall_seconds / duration, 3) if duration else None,
+        "transcripts": transcripts,
+        "turns": [turn.to_record() for turn in turns]
+    }
+
+async def replay(
+    paths: List[str],
+    stt: Any,
+    run_turn: Callable[[str, Dict[str, float]], Awaitable[Optional[TurnTimer]]],
+    tts: Optional[TextToSpeechWorker] = None,
+    speed: float = 1.0
+) -> Dict[str, Any]:
+    """
+    Replay WAV files and build a latency and throughput report
+
+    Args:
+        paths: WAV files
+        stt: SpeechToTextService created with use_microphone=False
+        run_turn: Coroutine handling a transcript and its STT timings, returning the turn
+        tts: TTS worker to wait for after each turn
+        speed: Feed speed (1.0 = real time, 0 = as fast as possible)
+
+    Returns:
+        Report with one entry per file and a summary
+    """
+    stt.start()
+    await asyncio.to_thread(stt.ready.wait)
+    if stt.recorder is None:
+        raise RuntimeError("Speech-to-text recorder failed to load")
+
+    files = []
+    for path in paths:
+        try:
+            report = await replay_file(path, stt, run_turn, tts=tts, speed=speed)
+        except Exception as e:
+            logger.error(f"Replay error for {path}: {e}")
+            report = {"file": path, "error": str(e)}
+        files.append(report)
+        print(format_file_report(report))
+
+    return {"speed": speed, "files": files, "summary": summarize(files)}
+
+def summarize(files: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Throughput totals and latency percentiles over all replayed turns"""
+    audio_seconds = sum(report.get("audio_seconds", 0.0) for report in files)
+    wall_seconds = sum(report.get("wall_seconds", 0.0) for report in files)
+    stages: Dict[str, List[float]] = {}
+    for report in files:
+        for turn in report.get("turns", []):
+            for stage, ms in list(turn["stages"].items()) + [("total", turn["total_ms"])]:
+                stages.setdefault(stage, []).append(ms)
+
+    return {
+        "files": len(files),
+        "errors": sum(1 for report in files if "error" in report),
+        "turns": sum(len(report.get("turns", [])) for report in files),
+        "audio_seconds": round(audio_seconds, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "audio_seconds_per_second": round(audio_seconds / wall_seconds, 3) if wall_seconds else None,
+        "stages": {
+            stage: {
+                "count": len(values),
+                **{f"p{p}": round(percentile(sorted(values), p), 2) for p in (50, 95, 99)}
+            }
+            for stage, values in stages.items()
+        }
+    }
+
+def format_file_report(report: Dict[str, Any]) -> str:
+    """One-line summary of a replayed file"""
+    name = os.path.basename(report["file"])
+    if "error" in report:
+        return f"{name}: error: {report['error']}"
+
+    totals = [turn["total_ms"] for turn in report["turns"]]
+    latency = f", mean turn {sum(totals) / len(totals):.0f} ms" if totals else ""
+    return (
+        f"{name}: {report['audio_seconds']:.1f}s audio in {report['wall_seconds']:.1f}s "
+        f"(RTF {report['real_time_factor']}), {len(report['turns'])} turn(s){latency}"
+    )
+
+# Export
+export = {
+    'find_wav_files': find_wav_files,
+    'load_wav': load_wav,
+    'feed_audio': feed_audio,
+    'NullTextToSpeechWorker': NullTextToSpeechWorker,
+    'replay': replay,
+    'replay_file': replay_file
+}
@@ -0,0 +1,215 @@
+import time
+import signal
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from utils.latency import percentile
+from utils.config_manager import Config, get_config, get_config_manager
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+DEFAULT_INTERVAL = 30.0
+DEFAULT_MAX_CHANGES = 20
+MAX_POLL_INTERVAL = 1.0
+METRICS_WINDOW = 200
+
+class AutoSaver:
+    def __init__(
+        self,
+        store: Any,
+        interval: float = DEFAULT_INTERVAL,
+        max_changes: int = DEFAULT_MAX_CHANGES,
+        enabled: bool = True
+    ):
+        """
+        Background checkpoints of the memory store
+
+        Only changes since the last checkpoint are written (see
+        MemoryManager.checkpoint): when max_changes are pending, or when
+        changes have been pending for interval seconds. stop() writes what
+        is left, so a shutdown loses nothing even with auto-save disabled.
+
+        Args:
+            store: MemoryStore to checkpoint
+            interval: Seconds after which pending changes are written
+            max_changes: Pending changes that trigger a write before the interval
+            enabled: Run periodic checkpoints (the auto_save config key)
+        """
+        self.store = store
+        self.interval = max(0.1, interval)
+        self.max_changes = max(1, max_changes)
+        self.enabled = enabled
+        self.last_flush = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._durations: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._counts = {"flushes": 0, "rows": 0, "errors": 0}
+
+    def configure(
+        self,
+        interval: Optional[float] = None,
+        max_changes: Optional[int] = None,
+        enabled: Optional[bool] = None
+    ) -> None:
+        """Change the checkpoint triggers while running"""
+        if interval is not None:
+            self.interval = max(0.1, interval)
+        if max_changes is not None:
+            self.max_changes = max(1, max_changes)
+        if enabled is not None:
+            self.enabled = enabled
+
+    def due(self) -> Optional[str]:
+        """Reason a checkpoint is due ("changes" or "interval"), None if not"""
+        if not self.enabled:
+            return None
+        pending = self.store.pending_changes()
+        if pending >= self.max_changes:
+            return "changes"
+        if pending and time.monotonic() - self.last_flush >= self.interval:
+            return "interval"
+        return None
+
+    async def flush(self, reason: str = "manual") -> int:
+        """
+        Write pending changes now
+
+        Args:
+            reason: Logged trigger (changes, interval, shutdown, manual)
+
+        Returns:
+            Number of rows written, -1 on error
+        """
+        async with self._lock:
+            started_at = time.perf_counter()
+            written = await self.store.checkpoint_all_async()
+            duration_ms = (time.perf_counter() - started_at) * 1000
+            self.last_flush = time.monotonic()
+
+        self._durations.append(duration_ms)
+        self._counts["flushes"] += 1
+        if written < 0:
+            self._counts["errors"] += 1
+            logger.error("Auto-save (%s) failed after %.1f ms, changes kept for the next flush", reason, duration_ms,
+                         reason=reason, latency_ms=round(duration_ms, 1))
+        else:
+            self._counts["rows"] += written
+            logger.info("Auto-save (%s): %d rows written in %.1f ms", reason, written, duration_ms,
+                        reason=reason, rows=written, latency_ms=round(duration_ms, 1))
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(min(MAX_POLL_INTERVAL, self.interval))
+            reason = self.due()
+            if reason is not None:
+                # Shielded: stop() waits for a flush in progress instead of cancelling its writes
+                await asyncio.shield(self.flush(reason))
+
+    def start(self) -> None:
+        """Start the checkpoint task on the running event loop"""
+        if self._task is None or self._task.done():
+            self.last_flush = time.monotonic()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> int:
+        """
+        Stop the checkpoint task and write the remaining changes
+
+        A periodic flush in progress is not cancelled; the final flush
+        waits for it.
+
+        Returns:
+            Number of rows written by the final flush, -1 on error
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        return await self.flush("shutdown")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Checkpoint counts, pending changes and flush duration percentiles"""
+        samples = sorted(self._durations)
+        return {
+            **self._counts,
+            "enabled": self.enabled,
+            "pending": self.store.pending_changes(),
+            "flush_p50_ms": round(percentile(samples, 50), 1),
+            "flush_p95_ms": round(percentile(samples, 95), 1),
+            "flush_max_ms": round(max(samples, default=0.0), 1),
+            "last_flush_s": round(time.monotonic() - self.last_flush, 1)
+        }
+
+    def format_metrics(self) -> str:
+        """Metrics as text"""
+        metrics = self.metrics()
+        state = "on" if metrics["enabled"] else "off"
+        return (
+            f"auto-save {state}: {metrics['flushes']} flushes, {metrics['rows']} rows, {metrics['errors']} errors, "
+            f"{metrics['pending']} changes pending (last flush {metrics['last_flush_s']:.0f}s ago)\n"
+            f"flush p50 {metrics['flush_p50_ms']:.1f}ms, p95 {metrics['flush_p95_ms']:.1f}ms, "
+            f"max {metrics['flush_max_ms']:.1f}ms"
+        )
+
+def install_signal_handlers(task: Optional[asyncio.Task] = None) -> None:
+    """
+    Cancel the main task on SIGTERM, as Ctrl+C does, so shutdown paths
+    (and their final flush) run instead of the process being killed
+
+    Args:
+        task: Task to cancel (the current task by default)
+    """
+    task = task or asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    if task is None or not hasattr(signal, "SIGTERM"):
+        return
+
+    def terminate() -> None:
+        logger.info("SIGTERM received, shutting down")
+        task.cancel()
+
+    try:
+        loop.add_signal_handler(signal.SIGTERM, terminate)
+    except (NotImplementedError, RuntimeError):
+        # Event loops without signal support (Windows)
+        signal.signal(signal.SIGTERM, lambda signum, frame: loop.call_soon_threadsafe(terminate))
+
+# Global auto-saver instance
+_auto_saver: Optional[AutoSaver] = None
+
+def _settings(config: Config) -> Dict[str, Any]:
+    return {
+        "interval": float(config.get("auto_save_interval", DEFAULT_INTERVAL)),
+        "max_changes": int(config.get("auto_save_changes", DEFAULT_MAX_CHANGES)),
+        "enabled": bool(config.get("auto_save", True))
+    }
+
+def get_auto_saver() -> AutoSaver:
+    """Get global auto-saver of the memory store (settings from config.yaml, updated on reload)"""
+    global _auto_saver
+    if _auto_saver is None:
+        from utils.memory_manager import get_memory_store
+
+        saver = _auto_saver = AutoSaver(get_memory_store(), **_settings(get_config()))
+
+        def apply(old: Config, new: Config) -> None:
+            settings = _settings(new)
+            if settings != _settings(old):
+                saver.configure(**settings)
+                logger.info(f"Auto-save settings updated: {settings}")
+
+        get_config_manager().subscribe(apply)
+    return _auto_saver
+
+# Export
+export = {
+    'AutoSaver': AutoSaver,
+    'get_auto_saver': get_auto_saver,
+    'install_signal_handlers': install_signal_handlers
+}
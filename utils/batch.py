@@ -0,0 +1,276 @@
+import os
+import json
+import time
+import asyncio
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Tuple
+from utils.assistant import Assistant
+from utils.latency import start_turn, percentile
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+DEFAULT_CONCURRENCY = 4
+
+def read_prompts(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Stream the items of a JSONL prompt file
+
+    Each line is an object with "prompt" (or "message") and optional "id",
+    "user_id" and "session_id", or a bare JSON string. Blank lines are
+    skipped; unparsable lines are yielded with an "error".
+
+    Args:
+        path: Input file path
+
+    Yields:
+        Tuples of (1-based line number, item)
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        for line_no, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield line_no, {"error": f"Invalid JSON: {e}"}
+                continue
+            if isinstance(item, str):
+                item = {"prompt": item}
+            elif not isinstance(item, dict):
+                item = {"error": "Item must be an object or a string"}
+            yield line_no, item
+
+def load_completed(path: str) -> Set[int]:
+    """
+    Line numbers already answered in an output file
+
+    Lines whose latest record has an error are retried, so they are not
+    included. A truncated last record (from an interruption) is ignored.
+
+    Args:
+        path: Output file path
+
+    Returns:
+        Set of completed input line numbers
+    """
+    completed: Set[int] = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("error"):
+                completed.discard(record.get("line"))
+            else:
+                completed.add(record.get("line"))
+    return completed
+
+class BatchRunner:
+    def __init__(
+        self,
+        assistant: Assistant,
+        memory_store: Any = None,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ):
+        """
+        Run prompts through the assistant's turn pipeline concurrently
+
+        Items without user_id/session_id share the assistant's memory
+        namespace; the others get an Assistant bound to their own namespace,
+        pinned in the store while the item runs. Items with a session_id are
+        added to that session's conversation history, one at a time in input
+        order; the others are answered on their own.
+
+        Args:
+            assistant: Assistant holding the config, secrets and system prompt
+            memory_store: MemoryStore for per-item namespaces
+            concurrency: Maximum prompts in flight
+        """
+        self.assistant = assistant
+        self.memory_store = memory_store
+        self.concurrency = max(1, concurrency)
+        self._assistants: Dict[str, Assistant] = {}
+        self._session_locks: Dict[Tuple[Any, Any], asyncio.Lock] = {}
+
+    async def _respond(self, item: Dict[str, Any], prompt: str, on_event: Callable[[Dict[str, Any]], None]) -> Optional[str]:
+        """Answer an item with the assistant of its namespace, one turn at a time per session"""
+        user_id, session_id = item.get("user_id"), item.get("session_id")
+        if self.memory_store is None or (user_id is None and session_id is None):
+            return await self.assistant.respond(prompt, on_event=on_event, remember=False)
+        if session_id is None:
+            return await self._respond_in_namespace(user_id, session_id, prompt, on_event)
+
+        # Locks are taken in task start order, so a session's items run in input order
+        lock = self._session_locks.setdefault((user_id, session_id), asyncio.Lock())
+        async with lock:
+            return await self._respond_in_namespace(user_id, session_id, prompt, on_event)
+
+    async def _respond_in_namespace(self, user_id: Any, session_id: Any, prompt: str, on_event: Callable[[Dict[str, Any]], None]) -> Optional[str]:
+        # Pinned for the turn; between items the store may evict the namespace and reload it later
+        memory = await self.memory_store.get_async(user_id=user_id, session_id=session_id, pin=True)
+        try:
+            assistant = self._assistants.get(memory.namespace)
+            if assistant is None:
+                assistant = self._assistants[memory.namespace] = self.assistant.spawn(memory)
+            elif assistant.memory_manager is not memory:
+                assistant.memory_manager = memory
+            # Only items of a named session continue a conversation
+            return await assistant.respond(prompt, on_event=on_event, remember=session_id is not None)
+        finally:
+            self.memory_store.unpin(memory.namespace)
+
+    async def run_item(self, line_no: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run one prompt
+
+        Args:
+            line_no: Input line number
+            item: Parsed input item
+
+        Returns:
+            Result record with response, latency, stages, usage, tool calls and error
+        """
+        record: Dict[str, Any] = {"line": line_no, "id": item.get("id", line_no)}
+        prompt = str(item.get("prompt") or item.get("message") or "").strip()
+        record["prompt"] = prompt
+        tool_calls = []
+
+        def on_event(event: Dict[str, Any]) -> None:
+            if event["type"] == "tool_call":
+                tool_calls.append({"id": event.get("id"), "name": event["name"], "arguments": event["arguments"]})
+            elif event["type"] == "tool_result":
+                # Read-only calls run concurrently, so results arrive in any order
+                call = next((call for call in tool_calls if "result" not in call and call["id"] == event.get("id")
+                             and call["name"] == event["name"]), None)
+                if call is not None:
+                    call["result"] = event["result"]
+
+        # Runs in its own task, so the turn (and its marks) belong to this item only
+        turn = start_turn("batch")
+        turn.annotate("line", line_no)
+        response, error = None, item.get("error")
+        if not error and not prompt:
+            error = "Missing prompt"
+        if not error:
+            try:
+                response = await self._respond(item, prompt, on_event)
+                if response is None:
+                    error = "Failed to get response from AI"
+            except Exception as e:
+                logger.error(f"Batch item {line_no} failed: {e}")
+                error = str(e)
+        turn.finish("response")
+
+        record.update({
+            "response": response,
+            "latency_ms": round(turn.total_ms(), 1),
+            "stages": {stage: round(ms, 1) for stage, ms in turn.durations().items()},
+            "usage": turn.attributes.get("usage"),
+            "tool_calls": tool_calls,
+            "error": error
+        })
+        return record
+
+    async def run(self, input_path: str, output_path: str, resume: bool = True) -> Dict[str, Any]:
+        """
+        Run every prompt of a JSONL file, appending result records to a JSONL file
+
+        The input is streamed: at most `concurrency` items are read ahead of
+        the ones finished. Records are written (and flushed) as items finish,
+        so an interrupted run resumes from the completed lines.
+
+        Args:
+            input_path: JSONL prompt file
+            output_path: JSONL result file
+            resume: Skip lines already answered in output_path (otherwise it is overwritten)
+
+        Returns:
+            Summary of this run
+        """
+        completed = load_completed(output_path) if resume else set()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending: Set[asyncio.Task] = set()
+        records = []
+        started_at = time.perf_counter()
+
+        with open(output_path, "a" if resume else "w", encoding="utf-8") as output:
+            if output.tell() > 0:
+                with open(output_path, "rb") as existing:
+                    existing.seek(-1, os.SEEK_END)
+                    if existing.read(1) != b"\n":
+                        output.write("\n")  # Terminate a record truncated by an interruption
+
+            async def run_one(line_no: int, item: Dict[str, Any]) -> None:
+                try:
+                    record = await self.run_item(line_no, item)
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    output.flush()
+                    records.append(record)
+                finally:
+                    semaphore.release()
+
+            try:
+                for line_no, item in read_prompts(input_path):
+                    if line_no in completed:
+                        continue
+                    await semaphore.acquire()
+                    task = asyncio.ensure_future(run_one(line_no, item))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                if pending:
+                    await asyncio.gather(*pending)
+            except asyncio.CancelledError:
+                # Interrupted: in-flight items are dropped and rerun on resume
+                for task in pending:
+                    task.cancel()
+                raise
+
+        summary = summarize(records, time.perf_counter() - started_at)
+        summary["skipped"] = len(completed)
+        return summary
+
+def summarize(records, elapsed: float) -> Dict[str, Any]:
+    """
+    Aggregate result records
+
+    Args:
+        records: Result records
+        elapsed: Wall-clock seconds of the run
+
+    Returns:
+        Counts, latency percentiles, token totals and throughput
+    """
+    latencies = sorted(record["latency_ms"] for record in records if not record["error"])
+    tokens: Dict[str, int] = {}
+    for record in records:
+        for key, value in (record.get("usage") or {}).items():
+            tokens[key] = tokens.get(key, 0) + value
+
+    return {
+        "items": len(records),
+        "ok": len(latencies),
+        "errors": len(records) - len(latencies),
+        "tool_calls": sum(len(record["tool_calls"]) for record in records),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 1),
+            "p95": round(percentile(latencies, 95), 1),
+            "p99": round(percentile(latencies, 99), 1),
+            "max": round(max(latencies, default=0.0), 1)
+        },
+        "usage": tokens,
+        "elapsed_s": round(elapsed, 2),
+        "items_per_s": round(len(records) / elapsed, 2) if elapsed > 0 else 0.0
+    }
+
+# Export
+export = {
+    'BatchRunner': BatchRunner,
+    'read_prompts': read_prompts,
+    'load_completed': load_completed,
+    'summarize': summarize
+}
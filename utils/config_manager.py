@@ -1,10 +1,82 @@
 import os
 import yaml
-from typing import Dict, Any, Optional
+import threading
+from types import MappingProxyType
+from typing import Dict, Any, Callable, Iterator, List, Mapping, Optional
 from utils.logger import get_logger
 
 logger = get_logger()
 
+# Constants
+DEFAULT_CONFIG_FILE = "config.yaml"
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of a config value (lists become tuples, dicts read-only mappings)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+class Config(Mapping):
+    __slots__ = ("_values", "secrets", "version", "mtime")
+
+    def __init__(
+        self,
+        values: Mapping[str, Any],
+        secrets: Optional[Mapping[str, Any]] = None,
+        version: int = 0,
+        mtime: Optional[float] = None
+    ):
+        """
+        Immutable, validated configuration snapshot
+
+        Reads like a dict (config["timeout"], config.get("timeout")) or by
+        attribute (config.timeout). Values have the types of
+        ConfigManager.DEFAULT_CONFIG once validated. A reload builds a new
+        snapshot instead of changing this one, so a snapshot taken at the
+        start of a turn stays consistent for the whole turn.
+
+        Args:
+            values: Config values
+            secrets: API keys
+            version: Reload counter (0 for the first load)
+            mtime: Modification time of the file it was loaded from
+        """
+        object.__setattr__(self, "_values", _freeze(dict(values)))
+        object.__setattr__(self, "secrets", _freeze(dict(secrets or {})))
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "mtime", mtime)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getattr__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError("Config snapshots are immutable")
+
+    def __repr__(self) -> str:
+        return f"Config(version={self.version}, {dict(self._values)!r})"
+
+    def changed_keys(self, other: "Config") -> List[str]:
+        """Keys whose values differ from another snapshot ("secrets" if any secret differs)"""
+        keys = sorted(key for key in set(self) | set(other) if self.get(key) != other.get(key))
+        if dict(self.secrets) != dict(other.secrets):
+            keys.append("secrets")
+        return keys
+
 class ConfigManager:
     # Default values
     DEFAULT_CONFIG = {
@@ -17,7 +89,48 @@ class ConfigManager:
         "batch_size": 100,
         "max_vectors": 1000,
         "auto_save": True,
-        "timeout": 30
+        "auto_save_interval": 30,
+        "auto_save_changes": 20,
+        "timeout": 30,
+        "embeddings_dir": "embeddings",
+        "embedding_model": "",
+        "embedding_dim": 512,
+        "embedding_dtype": "float32",
+        "memory_recall_k": 0,
+        "ann_threshold": 50000,
+        "ann_nprobe": 8,
+        "eviction_policy": "scored",
+        "hit_flush_size": 50,
+        "tts_cache_dir": "tts_cache",
+        "tts_cache_size_mb": 64,
+        "speculative_prefill": False,
+        "speculative_min_words": 3,
+        "speculative_debounce_ms": 150,
+        "llm_warmup": True,
+        "ip_cache_ttl": 3600,
+        "server_host": "127.0.0.1",
+        "server_port": 8080,
+        "server_token": "",
+        "session_idle_timeout": 1800,
+        "max_sessions": 1000,
+        "batch_concurrency": 4,
+        "llm_max_concurrency": 2,
+        "llm_endpoint_concurrency": {},
+        "llm_shed_queue_depth": 8,
+        "plugin_dirs": ["plugins"],
+        "plugin_entry_points": True,
+        "config_reload": True,
+        "config_reload_interval": 2.0,
+        "history_max_turns": 20,
+        "history_token_budget": 1500,
+        "history_tool_result_chars": 500,
+        "log_max_bytes": 10485760,
+        "log_retention_days": 14,
+        "log_debug_sample_rate": 1.0,
+        "log_console_level": "INFO",
+        "tracing": True,
+        "trace_file": "logs/traces.jsonl",
+        "trace_min_ms": 0
     }
 
     DEFAULT_SECRETS = {
@@ -25,18 +138,36 @@ class ConfigManager:
         "news_api_key": None
     }
 
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = DEFAULT_CONFIG_FILE):
         """
         Initialize configuration manager
-        
+
+        The file is parsed once into an immutable Config snapshot that every
+        module shares. reload() (or the watcher thread) swaps in a new
+        validated snapshot when the file changes; an invalid file keeps the
+        previous one.
+
         Args:
             config_path: Path to configuration file
         """
         self.config_path = config_path
-        self.config = self.DEFAULT_CONFIG.copy()
-        self.secrets = self.DEFAULT_SECRETS.copy()
+        self._snapshot = Config(self.DEFAULT_CONFIG, self.DEFAULT_SECRETS)
+        self._file_state: Optional[tuple] = None  # (mtime_ns, size) of the loaded file
+        self._subscribers: List[Callable[[Config, Config], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
         self._load_config()
 
+    @property
+    def config(self) -> Config:
+        """Current configuration snapshot"""
+        return self._snapshot
+
+    @property
+    def secrets(self) -> Mapping[str, Any]:
+        return self._snapshot.secrets
+
     def _load_config(self) -> None:
         """Load configuration file"""
         try:
@@ -45,36 +176,118 @@ class ConfigManager:
                 self._create_template()
                 return
 
-            with open(self.config_path, 'r') as file:
-                yaml_config = yaml.safe_load(file)
+            stat = os.stat(self.config_path)
+            self._file_state = (stat.st_mtime_ns, stat.st_size)
+            self._snapshot = self._read(version=0, mtime=stat.st_mtime)
 
-            if not yaml_config:
-                logger.error("Empty config file")
-                return
+        except Exception as e:
+            logger.error(f"Error loading config: {e}")
 
-            # Load config section
-            if 'config' in yaml_config:
-                loaded_config = {
-                    key: value for item in yaml_config['config']
-                    for key, value in item.items()
-                }
-                self.config.update(loaded_config)
+    def _read(self, version: int, mtime: Optional[float]) -> Config:
+        """Parse and validate the config file into a new snapshot"""
+        with open(self.config_path, 'r') as file:
+            yaml_config = yaml.safe_load(file)
 
-            # Load secrets section
-            if 'secrets' in yaml_config:
-                loaded_secrets = {
-                    key: value for item in yaml_config['secrets']
-                    for key, value in item.items()
-                }
-                self.secrets.update(loaded_secrets)
+        if not yaml_config:
+            raise ValueError("Empty config file")
 
-            self._validate_config()
+        config = self.DEFAULT_CONFIG.copy()
+        secrets = self.DEFAULT_SECRETS.copy()
 
-        except Exception as e:
-            logger.error(f"Error loading config: {e}")
+        # Load config section
+        if 'config' in yaml_config:
+            config.update({
+                key: value for item in yaml_config['config'] or []
+                for key, value in item.items()
+            })
+
+        # Load secrets section
+        if 'secrets' in yaml_config:
+            secrets.update({
+                key: value for item in yaml_config['secrets'] or []
+                for key, value in item.items()
+            })
+
+        self._validate_config(config, secrets)
+        return Config(config, secrets, version=version, mtime=mtime)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Swap in a new snapshot if the config file changed
+
+        Args:
+            force: Reload even if the modification time is unchanged
+
+        Returns:
+            True if a new snapshot was installed
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.config_path)
+            except OSError:
+                return False
+            file_state = (stat.st_mtime_ns, stat.st_size)
+            if file_state == self._file_state and not force:
+                return False
+            self._file_state = file_state  # An invalid file is not retried until it changes again
+
+            old = self._snapshot
+            try:
+                new = self._read(version=old.version + 1, mtime=stat.st_mtime)
+            except Exception as e:
+                logger.error(f"Invalid config file, keeping the previous config: {e}")
+                return False
+
+            changed = new.changed_keys(old)
+            if not changed:
+                return False
+            self._snapshot = new  # Readers see the old or the new snapshot, never a mix
+            subscribers = list(self._subscribers)
+
+        logger.info(f"Config reloaded (version {new.version}): {', '.join(changed)}")
+        for callback in subscribers:
+            try:
+                callback(old, new)
+            except Exception as e:
+                logger.error(f"Error applying reloaded config: {e}")
+        return True
+
+    def subscribe(self, callback: Callable[[Config, Config], None]) -> None:
+        """
+        Call callback(old, new) after every reload
+
+        For settings baked into long-lived objects (limits, pools); values
+        read per call from the snapshot need no subscription. Callbacks run
+        on the thread that reloaded.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def start_watching(self, interval: float = DEFAULT_RELOAD_INTERVAL) -> None:
+        """Poll the config file's modification time on a daemon thread and reload on change"""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def watch():
+            while not self._stop.wait(interval):
+                self.reload()
+
+        self._watcher = threading.Thread(target=watch, name="config-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
 
     def _create_template(self) -> None:
-        """Create template config file"""
+        """Create template config file (an existing, commented template is kept)"""
+        if os.path.exists(self.config_path + '.template'):
+            logger.info(f"Copy {self.config_path}.template to {self.config_path} and fill in your settings")
+            return
+
         try:
             template = {
                 'config': [
@@ -94,28 +307,75 @@ class ConfigManager:
         except Exception as e:
             logger.error(f"Error creating config template: {e}")
 
-    def _validate_config(self) -> None:
-        """Validate configuration values"""
+    def _validate_config(self, config: Dict[str, Any], secrets: Dict[str, Any]) -> None:
+        """Validate configuration values (in place)"""
         # Check LM Studio URL
-        if not self.config['lm_studio_completions_url'].startswith(('http://', 'https://')):
+        if not config['lm_studio_completions_url'].startswith(('http://', 'https://')):
             logger.warning("Invalid LM Studio URL format")
-            self.config['lm_studio_completions_url'] = self.DEFAULT_CONFIG['lm_studio_completions_url']
+            config['lm_studio_completions_url'] = self.DEFAULT_CONFIG['lm_studio_completions_url']
 
         # Check model name
-        if not isinstance(self.config['llm_model'], str):
+        if not isinstance(config['llm_model'], str):
             logger.warning("Invalid model name")
-            self.config['llm_model'] = self.DEFAULT_CONFIG['llm_model']
+            config['llm_model'] = self.DEFAULT_CONFIG['llm_model']
 
         # Check numeric values
-        self.config['temperature'] = float(self.config.get('temperature', 0.7))
-        self.config['max_tokens'] = int(self.config.get('max_tokens', -1))
-        self.config['batch_size'] = max(1, int(self.config.get('batch_size', 100)))
-        self.config['max_vectors'] = max(1, int(self.config.get('max_vectors', 1000)))
-        self.config['timeout'] = max(1, int(self.config.get('timeout', 30)))
+        config['temperature'] = float(config.get('temperature', 0.7))
+        config['max_tokens'] = int(config.get('max_tokens', -1))
+        config['batch_size'] = max(1, int(config.get('batch_size', 100)))
+        config['max_vectors'] = max(1, int(config.get('max_vectors', 1000)))
+        config['timeout'] = max(1, int(config.get('timeout', 30)))
+        config['embedding_dim'] = max(8, int(config.get('embedding_dim', 512)))
+        config['memory_recall_k'] = max(0, int(config.get('memory_recall_k', 0)))
+        config['ann_threshold'] = max(0, int(config.get('ann_threshold', 50000)))
+        config['ann_nprobe'] = max(1, int(config.get('ann_nprobe', 8)))
+        config['hit_flush_size'] = max(1, int(config.get('hit_flush_size', 50)))
+        config['tts_cache_size_mb'] = max(1, int(config.get('tts_cache_size_mb', 64)))
+        config['speculative_min_words'] = max(1, int(config.get('speculative_min_words', 3)))
+        config['speculative_debounce_ms'] = max(0, int(config.get('speculative_debounce_ms', 150)))
+        config['ip_cache_ttl'] = max(0, int(config.get('ip_cache_ttl', 3600)))
+        config['server_port'] = int(config.get('server_port', 8080))
+        config['session_idle_timeout'] = max(1, int(config.get('session_idle_timeout', 1800)))
+        config['max_sessions'] = max(1, int(config.get('max_sessions', 1000)))
+        config['batch_concurrency'] = max(1, int(config.get('batch_concurrency', 4)))
+        config['llm_max_concurrency'] = max(1, int(config.get('llm_max_concurrency', 2)))
+        config['llm_shed_queue_depth'] = max(0, int(config.get('llm_shed_queue_depth', 8)))
+        config['config_reload_interval'] = max(0.1, float(config.get('config_reload_interval', 2.0)))
+        config['auto_save'] = bool(config.get('auto_save', True))
+        config['auto_save_interval'] = max(0.1, float(config.get('auto_save_interval', 30)))
+        config['auto_save_changes'] = max(1, int(config.get('auto_save_changes', 20)))
+        config['history_max_turns'] = max(0, int(config.get('history_max_turns', 20)))
+        config['history_token_budget'] = max(0, int(config.get('history_token_budget', 1500)))
+        config['history_tool_result_chars'] = max(0, int(config.get('history_tool_result_chars', 500)))
+        config['log_max_bytes'] = max(0, int(config.get('log_max_bytes', 10485760)))
+        config['log_retention_days'] = max(0, int(config.get('log_retention_days', 14)))
+        config['log_debug_sample_rate'] = min(1.0, max(0.0, float(config.get('log_debug_sample_rate', 1.0))))
+        if str(config.get('log_console_level', 'INFO')).upper() not in ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'):
+            logger.warning("Invalid log_console_level")
+            config['log_console_level'] = self.DEFAULT_CONFIG['log_console_level']
+        config['tracing'] = bool(config.get('tracing', True))
+        config['trace_min_ms'] = max(0.0, float(config.get('trace_min_ms', 0)))
+        if isinstance(config.get('plugin_dirs'), str):
+            config['plugin_dirs'] = [config['plugin_dirs']]
+        if not isinstance(config.get('plugin_dirs'), list):
+            logger.warning("Invalid plugin directories")
+            config['plugin_dirs'] = self.DEFAULT_CONFIG['plugin_dirs']
+        if not isinstance(config.get('llm_endpoint_concurrency'), dict):
+            logger.warning("Invalid LLM endpoint concurrency")
+            config['llm_endpoint_concurrency'] = {}
+        if not 0 < config['server_port'] < 65536:
+            logger.warning("Invalid server port")
+            config['server_port'] = self.DEFAULT_CONFIG['server_port']
+        if config.get('eviction_policy') not in ('fifo', 'lru', 'lfu', 'scored'):
+            logger.warning("Invalid eviction policy")
+            config['eviction_policy'] = self.DEFAULT_CONFIG['eviction_policy']
+        if config.get('embedding_dtype') not in ('float32', 'float16'):
+            logger.warning("Invalid embedding dtype")
+            config['embedding_dtype'] = self.DEFAULT_CONFIG['embedding_dtype']
 
         # Check API keys
-        for key in self.secrets:
-            if not self.secrets[key] or self.secrets[key] == 'your_api_key':
+        for key in secrets:
+            if not secrets[key] or secrets[key] == 'your_api_key':
                 logger.warning(f"Missing or invalid API key: {key}")
 
     def get_config(self, key: str, default: Any = None) -> Any:
@@ -128,9 +388,10 @@ class ConfigManager:
 
     def get_all_config(self) -> Dict[str, Any]:
         """Get all configuration"""
+        snapshot = self._snapshot
         return {
-            'config': self.config,
-            'secrets': self.secrets
+            'config': snapshot,
+            'secrets': snapshot.secrets
         }
 
 # Global config instance
@@ -143,7 +404,13 @@ def get_config_manager() -> ConfigManager:
         _config_manager = ConfigManager()
     return _config_manager
 
+def get_config() -> Config:
+    """Current configuration snapshot"""
+    return get_config_manager().config
+
 # Export
 export = {
-    'get_config_manager': get_config_manager
+    'Config': Config,
+    'get_config_manager': get_config_manager,
+    'get_config': get_config
 }
\ No newline at end of file
@@ -0,0 +1,86 @@
+import sys
+import asyncio
+import threading
+from typing import Optional, TextIO
+from utils.logger import get_logger
+
+logger = get_logger()
+
+class AsyncConsole:
+    def __init__(self, stream: Optional[TextIO] = None):
+        """
+        Non-blocking line reader for the console
+
+        A daemon thread blocks on the input stream and hands each line to
+        the event loop, so the loop keeps running background work while it
+        waits for the user.
+
+        Args:
+            stream: Input stream (defaults to sys.stdin)
+        """
+        self.stream = stream or sys.stdin
+        self.lines: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Start the reader thread
+
+        Args:
+            loop: Event loop that consumes the lines (defaults to the running loop)
+        """
+        if self._thread is not None:
+            return
+
+        self._loop = loop or asyncio.get_running_loop()
+        self.lines = asyncio.Queue()
+        self._thread = threading.Thread(target=self._run, name="console-reader", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Reader thread: forward lines until end of input (None marks EOF)"""
+        while True:
+            try:
+                line = self.stream.readline()
+            except Exception as e:
+                logger.error(f"Console read error: {e}")
+                line = ""
+
+            if not line:
+                self._publish(None)
+                break
+            self._publish(line.rstrip("\r\n"))
+
+    def _publish(self, line: Optional[str]) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.lines.put_nowait, line)
+
+    async def readline(self, prompt: str = "") -> str:
+        """
+        Print a prompt and wait for the next line without blocking the loop
+
+        Args:
+            prompt: Prompt printed before waiting
+
+        Returns:
+            The line without its newline
+
+        Raises:
+            EOFError: At end of input
+        """
+        if self.lines is None:
+            self.start()
+        if prompt:
+            print(prompt, end="", flush=True)
+
+        line = await self.lines.get()
+        if line is None:
+            self.lines.put_nowait(None)  # Keep reporting EOF
+            raise EOFError
+        return line
+
+# Export
+export = {
+    'AsyncConsole': AsyncConsole
+}
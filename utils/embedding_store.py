@@ -0,0 +1,390 @@
+import os
+import re
+import json
+import hashlib
+import threading
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+DEFAULT_EMBEDDING_DIM = 512
+DEFAULT_CAPACITY = 1024
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+class HashingEmbedder:
+    """Dependency-free bag-of-words embedder using the signed hashing trick"""
+
+    def __init__(self, dim: int = DEFAULT_EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _token_slots(self, text: str) -> Tuple[List[int], List[float]]:
+        """Map tokens and word bigrams of a text to (slot, sign) pairs"""
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        slots, signs = [], []
+        for feature in features:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+            slots.append(digest % self.dim)
+            signs.append(1.0 if (digest >> 63) & 1 else -1.0)
+        return slots, signs
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed a batch of texts into L2-normalized float32 vectors"""
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            slots, signs = self._token_slots(text)
+            rows.extend([row] * len(slots))
+            cols.extend(slots)
+            values.extend(signs)
+
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(vectors, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)),
+                  np.asarray(values, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+class OpenAIEmbedder:
+    """Embedder backed by an OpenAI-compatible /embeddings endpoint (e.g. LM Studio)"""
+
+    def __init__(self, model: str, api_url: str, auth_token: str = "lm-studio"):
+        import openai
+
+        self.name = model
+        self.model = model
+        self.client = openai.OpenAI(api_key=auth_token or "lm-studio", base_url=api_url)
+        self.dim: Optional[int] = None
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed a batch of texts with a single API request"""
+        response = self.client.embeddings.create(model=self.model, input=list(texts))
+        vectors = np.asarray([item.embedding for item in response.data], dtype=np.float32)
+        self.dim = vectors.shape[1]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+def create_embedder(config: Dict) -> Callable[[Sequence[str]], np.ndarray]:
+    """
+    Create the embedder selected in configuration
+
+    Args:
+        config: Configuration values
+
+    Returns:
+        Embedder callable (OpenAI-compatible endpoint if embedding_model is set, hashing otherwise)
+    """
+    model = config.get("embedding_model")
+    if model and config.get("api_url"):
+        return OpenAIEmbedder(model, config["api_url"], config.get("auth_token", ""))
+    return HashingEmbedder(int(config.get("embedding_dim", DEFAULT_EMBEDDING_DIM)))
+
+class EmbeddingStore:
+    def __init__(
+        self,
+        path: str,
+        embedder: Optional[Callable[[Sequence[str]], np.ndarray]] = None,
+        dtype: str = "float32",
+        batch_size: int = 100,
+        ann_threshold: int = 0,
+        ann_nprobe: int = 8
+    ):
+        """
+        Initialize memory-mapped embedding store
+
+        Vectors are kept in a .npy file where row N holds the embedding of
+        memory id N, with a mask of the stored rows in a .present.npy file.
+        Texts are queued and embedded in batches of batch_size.
+
+        Args:
+            path: Path of the .npy file
+            embedder: Callable embedding a list of texts into a 2-D array
+            dtype: Storage dtype (float32 or float16)
+            batch_size: Number of pending texts that triggers a batch embedding
+            ann_threshold: Item count above which searches use an IVF-flat ANN index (0 disables)
+            ann_nprobe: Number of IVF cells scanned per ANN query
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError("dtype must be float32 or float16")
+
+        self.path = path
+        self.meta_path = os.path.splitext(path)[0] + ".json"
+        self.ann_path = os.path.splitext(path)[0] + ".ivf.npz"
+        self.present_path = os.path.splitext(path)[0] + ".present.npy"
+        self.ann_threshold = max(0, int(ann_threshold))
+        self.ann_nprobe = ann_nprobe
+        self.ann_index = None
+        self._ann_dirty = False  # Index changed since it was loaded or saved
+        self.embedder = embedder or HashingEmbedder()
+        self.dtype = np.dtype(dtype)
+        self.batch_size = max(1, int(batch_size))
+        self.pending: Dict[int, str] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._present: np.ndarray = np.zeros(0, dtype=bool)
+        self._lock = threading.RLock()
+        self._open()
+
+    def _open(self) -> None:
+        """Map an existing vector file if it matches the embedder"""
+        if not os.path.exists(self.path) or not os.path.exists(self.meta_path):
+            return
+
+        try:
+            with open(self.meta_path, "r") as file:
+                meta = json.load(file)
+
+            if meta.get("embedder") != getattr(self.embedder, "name", None) or meta.get("dtype") != self.dtype.name:
+                logger.info(f"Embedder changed, discarding {self.path}")
+                return
+
+            self._matrix = np.load(self.path, mmap_mode="r+")
+            self._present = self._load_present()
+            logger.info(f"Mapped {int(self._present.sum())} embeddings from {self.path}")
+            self._load_ann_index()
+            self._maybe_build_ann_index()
+        except Exception as e:
+            logger.error(f"Error mapping embeddings: {e}")
+            self._matrix = None
+            self._present = np.zeros(0, dtype=bool)
+
+    def _load_present(self) -> np.ndarray:
+        """Load the saved presence mask, scanning the vectors only if it is missing or stale"""
+        rows = self._matrix.shape[0]
+        if os.path.exists(self.present_path):
+            try:
+                present = np.load(self.present_path)
+                if present.shape == (rows,) and present.dtype == bool:
+                    return present
+            except Exception as e:
+                logger.error(f"Error loading embedding presence mask: {e}")
+
+        # Files written before the mask existed: read every row once, then save the mask
+        logger.info(f"Scanning {self.path} for stored embeddings")
+        present = np.zeros(rows, dtype=bool)
+        for start in range(0, rows, DEFAULT_CAPACITY):
+            present[start:start + DEFAULT_CAPACITY] = np.any(self._matrix[start:start + DEFAULT_CAPACITY] != 0, axis=1)
+        self._present = present
+        self._write_present()
+        return present
+
+    def _write_present(self) -> None:
+        """Save the presence mask next to the vector file, so startup does not scan the vectors"""
+        temp_path = self.present_path + ".tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                np.save(file, self._present)
+            os.replace(temp_path, self.present_path)
+        except Exception as e:
+            logger.error(f"Error saving embedding presence mask: {e}")
+
+    def _load_ann_index(self) -> None:
+        """Load the persisted ANN index if it still matches the vector file"""
+        if not self.ann_threshold or not os.path.exists(self.ann_path):
+            return
+
+        try:
+            from utils.ann_index import IVFFlatIndex
+
+            index = IVFFlatIndex.load(self.ann_path)
+            if len(index) == int(self._present.sum()) and index.dim == self._matrix.shape[1]:
+                index.nprobe = self.ann_nprobe
+                self.ann_index = index
+                logger.info(f"Loaded ANN index with {len(index)} vectors")
+            else:
+                logger.info("ANN index is stale, it will be rebuilt")
+        except Exception as e:
+            logger.error(f"Error loading ANN index: {e}")
+
+    def _maybe_build_ann_index(self) -> None:
+        """Build the ANN index once the store grows beyond ann_threshold"""
+        if self.ann_index is not None or not self.ann_threshold or self._matrix is None:
+            return
+
+        ids = np.flatnonzero(self._present)
+        if len(ids) <= self.ann_threshold:
+            return
+
+        from utils.ann_index import IVFFlatIndex
+
+        index = IVFFlatIndex(self._matrix.shape[1], nprobe=self.ann_nprobe)
+        index.add(ids, np.asarray(self._matrix[ids], dtype=np.float32))
+        self.ann_index = index
+        self._ann_dirty = True
+        logger.info(f"Built ANN index over {len(ids)} embeddings")
+
+    def _write_meta(self, dim: int) -> None:
+        """Write embedder metadata next to the vector file"""
+        with open(self.meta_path, "w") as file:
+            json.dump({
+                "embedder": getattr(self.embedder, "name", None),
+                "dtype": self.dtype.name,
+                "dim": dim
+            }, file)
+
+    def _reserve(self, max_id: int, dim: int) -> None:
+        """Grow the mapped file so that row max_id exists"""
+        if self._matrix is not None and self._matrix.shape[1] != dim:
+            logger.warning("Embedding dimension changed, rebuilding store")
+            self._matrix = None
+            self._present = np.zeros(0, dtype=bool)
+            self.ann_index = None
+
+        rows = 0 if self._matrix is None else self._matrix.shape[0]
+        if max_id < rows:
+            return
+
+        capacity = max(DEFAULT_CAPACITY, rows * 2)
+        while capacity <= max_id:
+            capacity *= 2
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = self.path + ".tmp.npy"
+        grown = np.lib.format.open_memmap(temp_path, mode="w+", dtype=self.dtype, shape=(capacity, dim))
+        if self._matrix is not None:
+            grown[:rows] = self._matrix
+        grown.flush()
+        del grown
+        self._matrix = None
+
+        os.replace(temp_path, self.path)
+        self._write_meta(dim)
+        self._matrix = np.load(self.path, mmap_mode="r+")
+        present = np.zeros(capacity, dtype=bool)
+        present[:len(self._present)] = self._present
+        self._present = present
+
+    def add(self, item_id: int, text: str) -> None:
+        """Queue a text for embedding, flushing when a full batch is pending"""
+        with self._lock:
+            self.pending[item_id] = text
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def ensure(self, item_ids: Sequence[int], texts: Sequence[str]) -> None:
+        """Queue the given items that have no stored embedding yet"""
+        with self._lock:
+            for item_id, text in zip(item_ids, texts):
+                if not self.contains(item_id):
+                    self.pending[item_id] = text
+            if self.pending:
+                self.flush()
+
+    def contains(self, item_id: int) -> bool:
+        """Check whether an embedding is stored for an id"""
+        return 0 <= item_id < len(self._present) and bool(self._present[item_id])
+
+    def remove(self, item_id: int) -> None:
+        """Drop the embedding of an id"""
+        with self._lock:
+            self.pending.pop(item_id, None)
+            if self.contains(item_id):
+                self._matrix[item_id] = 0
+                self._present[item_id] = False
+                if self.ann_index is not None:
+                    self.ann_index.remove(item_id)
+                    self._ann_dirty = True
+
+    def flush(self) -> int:
+        """
+        Embed all pending texts in one vectorized call
+
+        Returns:
+            Number of embedded texts
+        """
+        with self._lock:
+            if not self.pending:
+                return 0
+
+            ids = list(self.pending.keys())
+            try:
+                vectors = np.asarray(self.embedder(list(self.pending.values())), dtype=np.float32)
+            except Exception as e:
+                logger.error(f"Embedding error: {e}")
+                return 0
+
+            self._reserve(max(ids), vectors.shape[1])
+            index = np.asarray(ids, dtype=np.intp)
+            self._matrix[index] = vectors.astype(self.dtype)
+            self._present[index] = True
+            self._matrix.flush()
+            self._write_present()
+            self.pending.clear()
+
+            if self.ann_index is not None:
+                self.ann_index.add(ids, vectors)
+                self._ann_dirty = True
+            else:
+                self._maybe_build_ann_index()
+
+            logger.debug(f"Embedded {len(ids)} memory items")
+            return len(ids)
+
+    def search(self, query: str, item_ids: Sequence[int], k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Return the k most similar items among item_ids
+
+        Args:
+            query: Query text
+            item_ids: Ids of the candidate items
+            k: Number of results
+
+        Returns:
+            List of (item_id, cosine similarity) pairs, most similar first
+        """
+        with self._lock:
+            self.flush()
+            if self._matrix is None or not len(item_ids) or k <= 0:
+                return []
+
+            query_vector = np.asarray(self.embedder([query]), dtype=np.float32)[0]
+
+            if self.ann_index is not None:
+                allowed = set(item_ids)
+                results = [(item_id, score) for item_id, score in self.ann_index.search(query_vector, k * 2)
+                           if item_id in allowed][:k]
+                if len(results) == min(k, len(allowed)):
+                    return results
+
+            candidates = np.asarray([i for i in item_ids if self.contains(i)], dtype=np.intp)
+            if not len(candidates):
+                return []
+
+            # Single matrix-vector product over the mapped rows
+            limit = int(candidates.max()) + 1
+            scores = self._matrix[:limit] @ query_vector.astype(self.dtype)
+            candidate_scores = scores[candidates].astype(np.float32)
+
+            k = min(k, len(candidates))
+            top = np.argpartition(-candidate_scores, k - 1)[:k]
+            top = top[np.argsort(-candidate_scores[top])]
+            return [(int(candidates[i]), float(candidate_scores[i])) for i in top]
+
+    def save(self) -> None:
+        """Write the mapped vectors to disk, and the ANN index if it changed"""
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+                self._write_present()
+            if self.ann_index is not None and self._ann_dirty:
+                try:
+                    self.ann_index.save(self.ann_path)
+                    self._ann_dirty = False
+                except Exception as e:
+                    logger.error(f"Error saving ANN index: {e}")
+
+    def close(self) -> None:
+        """Flush pending texts, save and unmap the vector file"""
+        with self._lock:
+            self.flush()
+            self.save()
+            self._matrix = None
+
+# Export
+export = {
+    'EmbeddingStore': EmbeddingStore,
+    'HashingEmbedder': HashingEmbedder,
+    'OpenAIEmbedder': OpenAIEmbedder,
+    'create_embedder': create_embedder
+}
@@ -0,0 +1,298 @@
+import math
+import time
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+DEFAULT_HALF_LIFE = 7 * 24 * 3600  # One week, in seconds
+
+class AccessStats:
+    """In-memory recall statistics of memory items, flushed to SQLite in batches"""
+
+    def __init__(self):
+        self.added_at: Dict[int, float] = {}
+        self.last_access: Dict[int, float] = {}
+        self.recall_count: Dict[int, int] = {}
+        self.importance: Dict[int, float] = {}
+        self.dirty: set = set()
+        self._index = None
+
+    def track(
+        self,
+        item_id: int,
+        importance: float = 0.0,
+        added_at: Optional[float] = None,
+        recall_count: int = 0,
+        last_access: Optional[float] = None
+    ) -> None:
+        """Start tracking an item"""
+        added_at = added_at if added_at is not None else time.time()
+        self.added_at[item_id] = added_at
+        self.last_access[item_id] = last_access if last_access is not None else added_at
+        self.recall_count[item_id] = recall_count
+        self.importance[item_id] = importance
+        if self._index is not None:
+            self._index.update(item_id)
+
+    def hit(self, item_id: int, now: Optional[float] = None) -> None:
+        """Record a retrieval hit"""
+        if item_id not in self.added_at:
+            return
+        self.last_access[item_id] = now if now is not None else time.time()
+        self.recall_count[item_id] += 1
+        self.dirty.add(item_id)
+        if self._index is not None:
+            self._index.update(item_id)
+
+    def forget(self, item_id: int) -> None:
+        """Stop tracking an item"""
+        for table in (self.added_at, self.last_access, self.recall_count, self.importance):
+            table.pop(item_id, None)
+        self.dirty.discard(item_id)
+
+    def clear(self) -> None:
+        """Stop tracking every item"""
+        for table in (self.added_at, self.last_access, self.recall_count, self.importance):
+            table.clear()
+        self.dirty.clear()
+        self._index = None
+
+    def take_dirty(self) -> List[Tuple[int, int, float]]:
+        """Return and reset pending (item_id, recall_count, last_access) updates"""
+        rows = [
+            (item_id, self.recall_count[item_id], self.last_access[item_id])
+            for item_id in self.dirty if item_id in self.added_at
+        ]
+        self.dirty.clear()
+        return rows
+
+    def victim(self, policy: "EvictionPolicy", now: Optional[float] = None) -> Optional[int]:
+        """
+        Return the id of the item an indexed policy would evict
+
+        The policy's index is built on first use and then kept up to date by
+        track and hit; forgotten items are dropped lazily. Swapping the policy
+        rebuilds it.
+
+        Args:
+            policy: Policy with an index_class
+            now: Current time (defaults to time.time())
+
+        Returns:
+            Item id, or None if no item is tracked
+        """
+        if self._index is None or self._index.policy is not policy:
+            self._index = policy.index_class(policy, self)
+        return self._index.victim(now if now is not None else time.time())
+
+class _HeapIndex:
+    """Lazy min-heap of tracked items by their policy key; stale entries are skipped at the top"""
+
+    def __init__(self, policy: "EvictionPolicy", stats: AccessStats):
+        self.policy = policy
+        self.stats = stats
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        self.heap = [(self.policy.key(item_id, self.stats), item_id) for item_id in self.stats.added_at]
+        heapq.heapify(self.heap)
+
+    def update(self, item_id: int) -> None:
+        heapq.heappush(self.heap, (self.policy.key(item_id, self.stats), item_id))
+        if len(self.heap) > 2 * len(self.stats.added_at) + 64:
+            self.rebuild()
+
+    def victim(self, now: float) -> Optional[int]:
+        heap, stats = self.heap, self.stats
+        while heap and (heap[0][1] not in stats.added_at or self.policy.key(heap[0][1], stats) != heap[0][0]):
+            heapq.heappop(heap)
+        return heap[0][1] if heap else None
+
+class _ScoredIndex:
+    """
+    Tracked items grouped by the time-independent part of their score
+
+    Each group is a heap by last access, so its least recent item has its
+    lowest score. The recency term lies between 0 and recency_weight, so groups
+    are visited in ascending order only until they cannot beat the best score.
+    """
+
+    def __init__(self, policy: "ScoredPolicy", stats: AccessStats):
+        self.policy = policy
+        self.stats = stats
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        self.groups: Dict[float, List[Tuple[float, int]]] = {}
+        self.levels: List[float] = []
+        self.size = 0
+        for item_id in self.stats.added_at:
+            self._push(item_id)
+
+    def _push(self, item_id: int) -> None:
+        base = self.policy.base_score(item_id, self.stats)
+        group = self.groups.get(base)
+        if group is None:
+            group = self.groups[base] = []
+            heapq.heappush(self.levels, base)
+        heapq.heappush(group, (self.stats.last_access[item_id], item_id))
+        self.size += 1
+
+    def update(self, item_id: int) -> None:
+        self._push(item_id)
+        if self.size > 2 * len(self.stats.added_at) + 64:
+            self.rebuild()
+
+    def _valid(self, base: float, entry: Tuple[float, int]) -> bool:
+        last_access, item_id = entry
+        stats = self.stats
+        return (
+            item_id in stats.added_at
+            and stats.last_access[item_id] == last_access
+            and self.policy.base_score(item_id, stats) == base
+        )
+
+    def victim(self, now: float) -> Optional[int]:
+        best, victim, visited = math.inf, None, []
+        floor = min(self.policy.recency_weight, 0.0)
+        while self.levels and self.levels[0] + floor < best:
+            base = heapq.heappop(self.levels)
+            group = self.groups[base]
+            while group and not self._valid(base, group[0]):
+                heapq.heappop(group)
+                self.size -= 1
+            if not group:
+                del self.groups[base]
+                continue
+            visited.append(base)
+            score = base + self.policy.recency(group[0][0], now)
+            if score < best:
+                best, victim = score, group[0][1]
+        for base in visited:
+            heapq.heappush(self.levels, base)
+        return victim
+
+def _position(item_ids: Sequence[int], item_id: Optional[int]) -> int:
+    """Position of an item id in item_ids (0 if it is missing)"""
+    try:
+        return item_ids.index(item_id)
+    except ValueError:
+        return 0
+
+class EvictionPolicy:
+    """Base eviction policy; selects the item to drop when memory is full"""
+    name = "base"
+
+    def select_victim(self, item_ids: Sequence[int], stats: AccessStats) -> int:
+        """
+        Select the item to evict
+
+        Args:
+            item_ids: Ids of the stored items, oldest first
+            stats: Recall statistics of the items
+
+        Returns:
+            Position of the victim in item_ids
+        """
+        raise NotImplementedError
+
+class FIFOPolicy(EvictionPolicy):
+    """Evict the oldest item"""
+    name = "fifo"
+
+    def select_victim(self, item_ids: Sequence[int], stats: AccessStats) -> int:
+        return 0
+
+class LRUPolicy(EvictionPolicy):
+    """Evict the least recently recalled item"""
+    name = "lru"
+    index_class = _HeapIndex
+
+    def key(self, item_id: int, stats: AccessStats) -> Tuple:
+        return (stats.last_access[item_id],)
+
+    def select_victim(self, item_ids: Sequence[int], stats: AccessStats) -> int:
+        return _position(item_ids, stats.victim(self))
+
+class LFUPolicy(EvictionPolicy):
+    """Evict the least frequently recalled item, least recent first on ties"""
+    name = "lfu"
+    index_class = _HeapIndex
+
+    def key(self, item_id: int, stats: AccessStats) -> Tuple:
+        return (stats.recall_count[item_id], stats.last_access[item_id])
+
+    def select_victim(self, item_ids: Sequence[int], stats: AccessStats) -> int:
+        return _position(item_ids, stats.victim(self))
+
+class ScoredPolicy(EvictionPolicy):
+    """Evict the item with the lowest combined recency, frequency and importance score"""
+    name = "scored"
+    index_class = _ScoredIndex
+
+    def __init__(
+        self,
+        recency_weight: float = 1.0,
+        frequency_weight: float = 1.0,
+        importance_weight: float = 2.0,
+        half_life: float = DEFAULT_HALF_LIFE
+    ):
+        """
+        Args:
+            recency_weight: Weight of the exponentially decayed time since last recall
+            frequency_weight: Weight of log(1 + recall count)
+            importance_weight: Weight of the importance score set at insert (0-1)
+            half_life: Seconds after which the recency term halves
+        """
+        self.recency_weight = recency_weight
+        self.frequency_weight = frequency_weight
+        self.importance_weight = importance_weight
+        self.decay = math.log(2) / max(half_life, 1.0)
+
+    def base_score(self, item_id: int, stats: AccessStats) -> float:
+        """Return the time-independent frequency and importance part of the score"""
+        return (
+            self.frequency_weight * math.log1p(stats.recall_count.get(item_id, 0))
+            + self.importance_weight * stats.importance.get(item_id, 0.0)
+        )
+
+    def recency(self, last_access: float, now: float) -> float:
+        """Return the recency part of the score"""
+        return self.recency_weight * math.exp(-self.decay * max(0.0, now - last_access))
+
+    def score(self, item_id: int, stats: AccessStats, now: float) -> float:
+        """Return the retention score of an item (higher is kept longer)"""
+        return self.base_score(item_id, stats) + self.recency(stats.last_access.get(item_id, now), now)
+
+    def select_victim(self, item_ids: Sequence[int], stats: AccessStats) -> int:
+        return _position(item_ids, stats.victim(self))
+
+POLICIES = {
+    policy.name: policy for policy in (FIFOPolicy, LRUPolicy, LFUPolicy, ScoredPolicy)
+}
+
+def create_policy(name: Optional[str]) -> EvictionPolicy:
+    """
+    Create an eviction policy by name
+
+    Args:
+        name: fifo, lru, lfu or scored
+
+    Returns:
+        Eviction policy (FIFO for unknown names)
+    """
+    policy = POLICIES.get((name or "fifo").lower())
+    if policy is None:
+        logger.warning(f"Unknown eviction policy '{name}', using fifo")
+        policy = FIFOPolicy
+    return policy()
+
+# Export
+export = {
+    'AccessStats': AccessStats,
+    'EvictionPolicy': EvictionPolicy,
+    'create_policy': create_policy
+}
@@ -1,11 +1,11 @@
 import json
-import webbrowser
 from typing import Dict, Optional, Any, Tuple, List
 import asyncio
 from functools import lru_cache
-from concurrent.futures import ThreadPoolExecutor
 from utils.logger import get_logger
-import utils.tool_utils as tool_utils
+from utils.latency import mark, annotate
+from utils.tool_registry import get_tool_registry
+from utils.tracing import span
 
 logger = get_logger()
 
@@ -102,104 +102,84 @@ async def handle_tool_call(tool_call: Any, context: Dict[str, Any], user_input:
     """
     try:
         function_name = tool_call.function.name
-        arguments = json.loads(tool_call.function.arguments)
+        arguments = json.loads(tool_call.function.arguments or "{}")
 
         print(f"{function_name}({" ,".join([f"{k}: \"{v}\"" for k, v in arguments.items()])})")
 
-        if function_name == "python_code":
-            if not arguments["code"] or not isinstance(arguments["code"], str):
-                return function_name, "Invalid Python code"
-
-            result = await tool_utils.python_code(arguments["code"])
-            return function_name, result
-
-        elif function_name == "get_weather":
-            result = await tool_utils.get_weather(
-                arguments["city"],
-                context["secrets"].get("weather_api_key")
-            )
-            return function_name, result
-
-        elif function_name == "search_wikipedia":
-            result = await tool_utils.search_wikipedia(arguments["query"])
-            return function_name, result
-
-        elif function_name == "get_news":
-            result = await tool_utils.get_news(
-                arguments["query"],
-                context["secrets"].get("news_api_key")
-            )
-            return function_name, result
-
-        elif function_name == "execute_command":
-            if not is_command_allowed(arguments["command_type"], arguments["command"]):
-                return function_name, f"Command '{arguments['command']}' cannot be executed due to security restrictions."
-
-            success, output = await (
-                execute_shell_command(arguments["command"]) 
-                if arguments["command_type"] == "cmd"
-                else execute_powershell_command(arguments["command"])
-            )
-
-            if success:
-                logger.info(f"Command executed successfully: {arguments['command']}")
-                return function_name, output
-            else:
-                logger.error(f"Command execution failed: {output}")
-                return function_name, f"Command error: {output}"
-
-        elif function_name == "open_browser":
-            if not is_domain_allowed(arguments["url"]):
-                return function_name, f"URL '{arguments['url']}' cannot be opened due to security restrictions."
-
-            try:
-                with ThreadPoolExecutor() as executor:
-                    await asyncio.get_event_loop().run_in_executor(
-                        executor,
-                        webbrowser.open,
-                        arguments["url"]
-                    )
-                return function_name, "Browser opened successfully"
-            except Exception as e:
-                logger.error(f"Browser command error: {e}")
-                return function_name, f"URL opening error: {str(e)}"
-
-        elif function_name == "add_memory":
-            try:
-                result = await tool_utils.add_memory(arguments["text"])
-                return function_name, result
-            except Exception as e:
-                logger.error(f"Memory add error: {e}")
-                return function_name, f"Error adding memory: {str(e)}"
-
-        return function_name, f"Unknown tool: {function_name}"
+        with span(f"tool {function_name}", **{"tool.name": function_name}) as tool_span:
+            result = await get_tool_registry().call(function_name, arguments, context)
+            if tool_span is not None:
+                tool_span.set_attribute("tool.result_chars", len(result))
+        return function_name, result
 
     except Exception as e:
         logger.error(f"Error handling tool call: {e}")
         return "unknown", f"Tool execution error: {str(e)}"
 
+async def run_tool_calls(tool_calls: List[Any], context: Dict[str, Any], user_input: str) -> List[Tuple[str, str]]:
+    """
+    Run the tool calls of a response in order
+
+    Consecutive read-only tools run concurrently; tools with side effects
+    run one at a time.
+
+    Returns: List of (tool_name, result) in call order
+    """
+    registry = get_tool_registry()
+    on_event = context.get("on_event")
+
+    async def run(tool_call: Any) -> Tuple[str, str]:
+        call_id = getattr(tool_call, "id", None)  # Pairs the result event with its call
+        if on_event:
+            on_event({"type": "tool_call", "id": call_id, "name": tool_call.function.name, "arguments": tool_call.function.arguments})
+        tool_name, result = await handle_tool_call(tool_call, context, user_input)
+        annotate("tool", tool_name)
+        if on_event:
+            on_event({"type": "tool_result", "id": call_id, "name": tool_name, "result": result})
+        return tool_name, result
+
+    results: List[Tuple[str, str]] = []
+    group: List[Any] = []
+    for tool_call in list(tool_calls) + [None]:
+        spec = registry.get(tool_call.function.name) if tool_call is not None else None
+        if spec is not None and spec.read_only:
+            group.append(tool_call)
+            continue
+        if group:
+            results.extend(await asyncio.gather(*[run(call) for call in group]))
+            group = []
+        if tool_call is not None:
+            results.append(await run(tool_call))
+    mark("tool")
+    return results
+
 async def execute_response(
     llm_response: Any,
     user_input: str,
     context: Dict[str, Any],
     dynamic_tools: Optional[List[str]] = None
 ) -> str:
-    """Execute AI response with OpenAI function calling support"""
-    from main import process_tool_result  # Import here to avoid circular dependency
-    
+    """
+    Execute AI response with OpenAI function calling support
+
+    Dynamic tool results are passed back through context["assistant"]
+    (utils.assistant.Assistant) when present. context["on_event"], if set,
+    receives tool_call and tool_result events.
+    """
     try:
         # Check for tool calls
         if hasattr(llm_response.choices[0].message, 'tool_calls') and llm_response.choices[0].message.tool_calls:
-            for tool_call in llm_response.choices[0].message.tool_calls:
-                # Get tool result
-                tool_name, result = await handle_tool_call(tool_call, context, user_input)
-                
-                # If this is a dynamic tool, process the result through AI
-                if dynamic_tools and tool_name in dynamic_tools:
-                    print("Processing dynamic tool result")
-                    return await process_tool_result(tool_name, result, user_input)
-                
-                return result
+            results = await run_tool_calls(llm_response.choices[0].message.tool_calls, context, user_input)
+            result = "\n\n".join(result for _, result in results)
+
+            # If a dynamic tool ran, process the results through AI
+            assistant = context.get("assistant")
+            dynamic = [tool_name for tool_name, _ in results if dynamic_tools and tool_name in dynamic_tools]
+            if dynamic and assistant is not None:
+                print("Processing dynamic tool result")
+                return await assistant.process_tool_result(dynamic[0], result, user_input, context)
+
+            return result
 
         # If we have content, return it
         if hasattr(llm_response.choices[0].message, 'content') and llm_response.choices[0].message.content:
@@ -215,5 +195,6 @@ async def execute_response(
 # Export
 export = {
     "execute_response": execute_response,
-    "handle_tool_call": handle_tool_call
+    "handle_tool_call": handle_tool_call,
+    "run_tool_calls": run_tool_calls
 }
\ No newline at end of file
@@ -0,0 +1,186 @@
+import json
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+DEFAULT_MAX_TURNS = 20
+DEFAULT_TOKEN_BUDGET = 1500
+DEFAULT_TOOL_RESULT_CHARS = 500
+CHARS_PER_TOKEN = 4  # Rough estimate for English text; no tokenizer is needed
+SUMMARY_SHARE = 0.15  # Part of the budget kept for the summary of older turns
+SUMMARY_TOPIC_CHARS = 80
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Approximate number of tokens
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+class HistoryTurn:
+    __slots__ = ("user", "topic", "messages", "tokens")
+
+    def __init__(self, user: str, response: str, tool_results: List[Tuple[str, Any, str]], tool_result_chars: int):
+        """
+        A finished turn, rendered to chat messages once
+
+        Args:
+            user: User message
+            response: Final response text
+            tool_results: (tool name, arguments, result) of the tools called in the turn
+            tool_result_chars: Characters kept of each tool result
+        """
+        self.user = user
+        self.topic = _shorten(user, SUMMARY_TOPIC_CHARS)
+        lines = []
+        for name, arguments, result in tool_results:
+            if not isinstance(arguments, str):
+                arguments = json.dumps(arguments, ensure_ascii=False, default=str)
+            lines.append(f"[{name}({arguments}) returned: {_shorten(result, tool_result_chars)}]")
+        lines.append(response)
+        self.messages: Tuple[Dict[str, str], ...] = (
+            {"role": "user", "content": user},
+            {"role": "assistant", "content": "\n".join(lines)}
+        )
+        self.tokens = sum(estimate_tokens(message["content"]) + 4 for message in self.messages)
+
+class ConversationHistory:
+    def __init__(
+        self,
+        max_turns: int = DEFAULT_MAX_TURNS,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        tool_result_chars: int = DEFAULT_TOOL_RESULT_CHARS
+    ):
+        """
+        Recent turns of one conversation, sent to the LLM before the new message
+
+        Turns are kept in a ring buffer of max_turns. The newest turns that
+        fit in token_budget are sent verbatim; older ones (including turns
+        that fell out of the ring buffer) are reduced to a one-line summary
+        of their topics. Turns are rendered when added, and the message list
+        is cached until the next turn, so a turn costs no re-serialization.
+
+        Args:
+            max_turns: Turns kept (0 disables the history)
+            token_budget: Estimated tokens of history sent with a query
+            tool_result_chars: Characters kept of each tool result
+        """
+        self.max_turns = max(0, max_turns)
+        self.token_budget = max(0, token_budget)
+        self.tool_result_chars = max(0, tool_result_chars)
+        self._turns: Deque[HistoryTurn] = deque(maxlen=self.max_turns or 1)
+        self._dropped: Deque[str] = deque(maxlen=self.max_turns or 1)  # Topics of turns out of the ring buffer
+        self._version = 0
+        self._cache: Optional[Tuple[int, List[Dict[str, str]]]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "ConversationHistory":
+        """Create a history with the history_* settings of a config snapshot"""
+        return cls(
+            max_turns=int(config.get("history_max_turns", DEFAULT_MAX_TURNS)),
+            token_budget=int(config.get("history_token_budget", DEFAULT_TOKEN_BUDGET)),
+            tool_result_chars=int(config.get("history_tool_result_chars", DEFAULT_TOOL_RESULT_CHARS))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_turns > 0 and self.token_budget > 0
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def add(self, user: str, response: str, tool_results: Optional[List[Tuple[str, Any, str]]] = None) -> None:
+        """
+        Record a finished turn
+
+        Args:
+            user: User message
+            response: Final response text
+            tool_results: (tool name, arguments, result) of the tools called in the turn
+        """
+        if not self.enabled or not user or not response:
+            return
+        turn = HistoryTurn(user, response, tool_results or [], self.tool_result_chars)
+        with self._lock:
+            if len(self._turns) == self._turns.maxlen:
+                self._dropped.append(self._turns[0].topic)
+            self._turns.append(turn)
+            self._version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._turns.clear()
+            self._dropped.clear()
+            self._version += 1
+
+    def messages(self) -> List[Dict[str, str]]:
+        """
+        Chat messages of the history within the token budget, oldest first
+
+        Returns:
+            Cached list of messages (do not modify it)
+        """
+        with self._lock:
+            cache = self._cache
+            if cache is not None and cache[0] == self._version:
+                return cache[1]
+
+            # Newest turns first, until the budget (less the summary share) is spent
+            budget = self.token_budget - int(self.token_budget * SUMMARY_SHARE)
+            kept: List[HistoryTurn] = []
+            for turn in reversed(self._turns):
+                if turn.tokens > budget:
+                    break
+                budget -= turn.tokens
+                kept.append(turn)
+            kept.reverse()
+
+            older = list(self._dropped) + [turn.topic for turn in list(self._turns)[:len(self._turns) - len(kept)]]
+            messages: List[Dict[str, str]] = []
+            if older:
+                messages.append({"role": "system", "content": self._summary(older)})
+            for turn in kept:
+                messages.extend(turn.messages)
+
+            self._cache = (self._version, messages)
+            return messages
+
+    def _summary(self, topics: List[str]) -> str:
+        """One-line summary of older turns, the most recent topics first to fit"""
+        limit = int(self.token_budget * SUMMARY_SHARE) * CHARS_PER_TOKEN
+        prefix = "Earlier in this conversation the user asked about: "
+        parts: List[str] = []
+        length = len(prefix)
+        for topic in reversed(topics):
+            if length + len(topic) + 2 > limit:
+                break
+            parts.append(topic)
+            length += len(topic) + 2
+        if not parts:
+            return f"Earlier in this conversation there were {len(topics)} more turns."
+        return prefix + "; ".join(reversed(parts))
+
+    def tokens(self) -> int:
+        """Estimated tokens of the messages sent with the next query"""
+        return sum(estimate_tokens(message["content"]) + 4 for message in self.messages())
+
+# Export
+export = {
+    'ConversationHistory': ConversationHistory,
+    'HistoryTurn': HistoryTurn,
+    'estimate_tokens': estimate_tokens
+}
@@ -0,0 +1,96 @@
+import os
+import queue
+import atexit
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+from utils.logger import get_logger
+
+logger = get_logger()
+
+class JsonLinesWriter:
+    def __init__(self, name: str):
+        """
+        Append lines to files from a background thread
+
+        write() only queues the line, so callers on the event loop never
+        touch the disk. The thread starts on the first write, appends queued
+        lines in one batch per file and is stopped by shutdown() (also run
+        at exit); lines written after that are appended directly.
+
+        Args:
+            name: Name of the writer thread
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._queue: "queue.SimpleQueue[Union[Tuple[str, str], threading.Event, None]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def write(self, path: str, line: str) -> None:
+        """
+        Queue a line for a file
+
+        Args:
+            path: File to append to (its directory is created if needed)
+            line: Line without its trailing newline
+        """
+        with self._lock:
+            if self._closed:
+                self._append(path, [line])  # Late lines at exit are written directly
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name=self.name, daemon=True)
+                self._thread.start()
+                atexit.register(self.shutdown)
+        self._queue.put((path, line))
+
+    def _append(self, path: str, lines: List[str]) -> None:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.error(f"Error writing {path}: {e}")
+
+    def _write_loop(self) -> None:
+        """Append queued lines, a batch per file, until shutdown() is called"""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines: Dict[str, List[str]] = {}
+            for item in batch:
+                if isinstance(item, tuple):
+                    lines.setdefault(item[0], []).append(item[1])
+            for path, chunk in lines.items():
+                self._append(path, chunk)
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in batch:
+                return
+
+    def flush(self, timeout: Optional[float] = 5.0) -> None:
+        """Wait until every line queued so far is written"""
+        if self._thread is not None and self._thread.is_alive():
+            written = threading.Event()
+            self._queue.put(written)
+            written.wait(timeout)
+
+    def shutdown(self) -> None:
+        """Write the queued lines and stop the thread; later lines are written directly"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(5)
+
+# Export
+export = {
+    'JsonLinesWriter': JsonLinesWriter
+}
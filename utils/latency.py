@@ -0,0 +1,263 @@
+import os
+import json
+import math
+import time
+import uuid
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from utils.jsonl_writer import JsonLinesWriter
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+DEFAULT_LATENCY_LOG = os.path.join("logs", "latency.jsonl")
+DEFAULT_WINDOW = 200
+PERCENTILES = (50, 95, 99)
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    Nearest-rank percentile
+
+    Args:
+        values: Sorted values
+        p: Percentile between 0 and 100
+
+    Returns:
+        Percentile value (0.0 for no values)
+    """
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100.0 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+class TurnTimer:
+    def __init__(self, source: str, started_at: Optional[float] = None):
+        """
+        Timing marks of one conversation turn
+
+        Each mark closes a stage: its duration is the time since the
+        previous mark (or the turn start).
+
+        Args:
+            source: Input source ("text" or "voice")
+            started_at: time.perf_counter() value the turn started at (defaults to now)
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.source = source
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.timestamp = time.time() - (time.perf_counter() - self.started_at)
+        self.marks: List[Tuple[str, float]] = []
+        self.attributes: Dict[str, Any] = {}
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def mark(self, stage: str, at: Optional[float] = None) -> None:
+        """
+        Close a stage
+
+        Args:
+            stage: Stage name
+            at: time.perf_counter() value the stage ended at (defaults to now)
+        """
+        with self._lock:
+            if not self.finished:
+                self.marks.append((stage, at if at is not None else time.perf_counter()))
+
+    def annotate(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def durations(self) -> Dict[str, float]:
+        """Stage durations in milliseconds (repeated stages are summed)"""
+        durations: Dict[str, float] = {}
+        previous = self.started_at
+        for stage, at in sorted(self.marks, key=lambda mark: mark[1]):
+            durations[stage] = durations.get(stage, 0.0) + (at - previous) * 1000
+            previous = at
+        return durations
+
+    def total_ms(self) -> float:
+        if not self.marks:
+            return 0.0
+        return (max(at for _, at in self.marks) - self.started_at) * 1000
+
+    def finish(self, stage: Optional[str] = None) -> None:
+        """
+        Optionally close a last stage, then record the turn (once)
+
+        Args:
+            stage: Final stage name
+        """
+        if stage:
+            self.mark(stage)
+        with self._lock:
+            if self.finished:
+                return
+            self.finished = True
+        get_latency_tracker().record(self)
+
+    def to_record(self) -> Dict[str, Any]:
+        return {
+            "timestamp": round(self.timestamp, 3),
+            "turn_id": self.id,
+            "source": self.source,
+            "stages": {stage: round(ms, 2) for stage, ms in self.durations().items()},
+            "total_ms": round(self.total_ms(), 2),
+            **self.attributes
+        }
+
+class LatencyTracker:
+    def __init__(self, log_path: Optional[str] = DEFAULT_LATENCY_LOG, window: int = DEFAULT_WINDOW):
+        """
+        Rolling per-stage latency statistics
+
+        Every finished turn is appended to a JSONL file, from a background
+        writer thread, and its stage durations are kept in a rolling window
+        for percentile summaries.
+
+        Args:
+            log_path: JSONL file for turn records (None to keep them in memory only)
+            window: Number of recent turns summarized per stage
+        """
+        self.log_path = log_path
+        self.window = max(1, window)
+        self.turns = 0
+        self._stages: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._writer = JsonLinesWriter("latency-writer")
+
+    def record(self, turn: TurnTimer) -> Dict[str, Any]:
+        """
+        Record a finished turn
+
+        Args:
+            turn: Finished turn
+
+        Returns:
+            The structured record (queued for the log file)
+        """
+        record = turn.to_record()
+        with self._lock:
+            self.turns += 1
+            for stage, ms in list(record["stages"].items()) + [("total", record["total_ms"])]:
+                self._stages.setdefault(stage, deque(maxlen=self.window)).append(ms)
+
+        if self.log_path:
+            self._writer.write(self.log_path, json.dumps(record))
+
+        stages = ", ".join(f"{stage}={ms:.0f}ms" for stage, ms in record["stages"].items())
+        logger.info(f"Turn latency ({record['source']}): total={record['total_ms']:.0f}ms {stages}")
+        return record
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Percentiles per stage over the rolling window
+
+        Returns:
+            {stage: {"count": n, "p50": ms, "p95": ms, "p99": ms}}
+        """
+        with self._lock:
+            stages = {stage: sorted(values) for stage, values in self._stages.items()}
+
+        summary = {}
+        for stage, values in stages.items():
+            summary[stage] = {"count": len(values)}
+            for p in PERCENTILES:
+                summary[stage][f"p{p}"] = round(percentile(values, p), 2)
+        return summary
+
+    def format_summary(self) -> str:
+        """Summary as a text table"""
+        summary = self.summary()
+        if not summary:
+            return "No turns recorded yet."
+
+        lines = [f"{'stage':<20}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+        for stage, stats in summary.items():
+            lines.append(
+                f"{stage:<20}{stats['count']:>7}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}"
+            )
+        return "\n".join(lines)
+
+    def flush(self, timeout: Optional[float] = 5.0) -> None:
+        """Wait until every record so far is written"""
+        self._writer.flush(timeout)
+
+    def shutdown(self) -> None:
+        """Write the queued records and stop the writer thread"""
+        self._writer.shutdown()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self.turns = 0
+
+# Turn of the current task (copied into tasks and threads started from it)
+_current_turn: ContextVar[Optional[TurnTimer]] = ContextVar("current_turn", default=None)
+
+def start_turn(source: str, started_at: Optional[float] = None) -> TurnTimer:
+    """
+    Start timing a turn in the current context
+
+    A previous turn that never finished (e.g. interrupted before its
+    answer was spoken) is recorded first.
+
+    Args:
+        source: Input source ("text" or "voice")
+        started_at: time.perf_counter() value the turn started at
+
+    Returns:
+        The new turn
+    """
+    previous = _current_turn.get()
+    if previous is not None and not previous.finished:
+        previous.annotate("interrupted", True)
+        previous.finish()
+
+    turn = TurnTimer(source, started_at)
+    _current_turn.set(turn)
+    return turn
+
+def current_turn() -> Optional[TurnTimer]:
+    return _current_turn.get()
+
+def mark(stage: str, at: Optional[float] = None) -> None:
+    """
+    Close a stage of the current turn (no-op outside a turn)
+
+    Args:
+        stage: Stage name
+        at: time.perf_counter() value the stage ended at (defaults to now)
+    """
+    turn = _current_turn.get()
+    if turn is not None:
+        turn.mark(stage, at)
+
+def annotate(key: str, value: Any) -> None:
+    """Attach an attribute to the current turn's record (no-op outside a turn)"""
+    turn = _current_turn.get()
+    if turn is not None:
+        turn.annotate(key, value)
+
+# Global latency tracker
+_latency_tracker: Optional[LatencyTracker] = None
+
+def get_latency_tracker() -> LatencyTracker:
+    """Get global latency tracker instance"""
+    global _latency_tracker
+    if _latency_tracker is None:
+        _latency_tracker = LatencyTracker()
+    return _latency_tracker
+
+# Export
+export = {
+    'TurnTimer': TurnTimer,
+    'LatencyTracker': LatencyTracker,
+    'start_turn': start_turn,
+    'current_turn': current_turn,
+    'mark': mark,
+    'annotate': annotate,
+    'get_latency_tracker': get_latency_tracker
+}
@@ -0,0 +1,280 @@
+import time
+import heapq
+import asyncio
+import itertools
+import contextvars
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+from utils.latency import percentile
+from utils.config_manager import Config, get_config, get_config_manager
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Priority classes, lower runs first
+INTERACTIVE = 0  # A user is waiting for the answer
+FOLLOW_UP = 1    # Tool result passes of a turn already underway
+BACKGROUND = 2   # Warm-ups and other work nobody is waiting for
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", FOLLOW_UP: "follow_up", BACKGROUND: "background"}
+
+# Constants
+DEFAULT_MAX_CONCURRENCY = 2
+DEFAULT_SHED_QUEUE_DEPTH = 8
+METRICS_WINDOW = 200
+
+class SchedulerOverloaded(Exception):
+    """Raised when background work is shed because the queue is too deep"""
+    pass
+
+class _Endpoint:
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self.waiting: List[Any] = []  # Heap of [priority, sequence, future]
+
+    def depth(self) -> int:
+        return sum(1 for entry in self.waiting if not entry[2].done())
+
+class LLMScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        endpoint_limits: Optional[Dict[str, int]] = None,
+        shed_queue_depth: int = DEFAULT_SHED_QUEUE_DEPTH
+    ):
+        """
+        Admission control in front of LLM endpoints
+
+        Each endpoint runs at most its concurrency limit of requests; the
+        rest wait in priority order (interactive, follow-up, background,
+        first come first served within a class). Background requests are
+        deferred behind everything else and shed when the endpoint's queue
+        is already shed_queue_depth deep.
+
+        Args:
+            max_concurrency: Default concurrent requests per endpoint
+            endpoint_limits: Concurrency limits of specific endpoints (by API URL)
+            shed_queue_depth: Queue depth at which background requests are rejected (0 never sheds)
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.endpoint_limits = dict(endpoint_limits or {})
+        self.shed_queue_depth = shed_queue_depth
+        self._endpoints: Dict[str, _Endpoint] = {}
+        self._sequence = itertools.count()
+        self._queue_ms: Dict[int, Deque[float]] = {priority: deque(maxlen=METRICS_WINDOW) for priority in PRIORITY_NAMES}
+        self._counts: Dict[int, Dict[str, int]] = {priority: {"admitted": 0, "queued": 0, "shed": 0} for priority in PRIORITY_NAMES}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _endpoint(self, name: str) -> _Endpoint:
+        endpoint = self._endpoints.get(name)
+        if endpoint is None:
+            limit = self.endpoint_limits.get(name, self.max_concurrency)
+            endpoint = self._endpoints[name] = _Endpoint(limit)
+        return endpoint
+
+    def configure_threadsafe(self, **limits) -> None:
+        """configure() from another thread (e.g. the config watcher)"""
+        loop = self._loop
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            loop.call_soon_threadsafe(lambda: self.configure(**limits))
+        else:
+            self.configure(**limits)
+
+    def configure(
+        self,
+        max_concurrency: Optional[int] = None,
+        endpoint_limits: Optional[Dict[str, int]] = None,
+        shed_queue_depth: Optional[int] = None
+    ) -> None:
+        """
+        Change the limits while running
+
+        Requests already admitted keep their slots; a raised limit admits
+        waiters immediately, a lowered one takes effect as slots are released.
+
+        Args:
+            max_concurrency: Default concurrent requests per endpoint
+            endpoint_limits: Concurrency limits of specific endpoints (by API URL)
+            shed_queue_depth: Queue depth at which background requests are rejected
+        """
+        if max_concurrency is not None:
+            self.max_concurrency = max(1, max_concurrency)
+        if endpoint_limits is not None:
+            self.endpoint_limits = dict(endpoint_limits)
+        if shed_queue_depth is not None:
+            self.shed_queue_depth = shed_queue_depth
+        for name, endpoint in self._endpoints.items():
+            endpoint.limit = max(1, self.endpoint_limits.get(name, self.max_concurrency))
+            self._dispatch(endpoint)
+
+    def _dispatch(self, endpoint: _Endpoint) -> None:
+        """Hand free slots to the highest priority waiters"""
+        while endpoint.active < endpoint.limit and endpoint.waiting:
+            _, _, future = heapq.heappop(endpoint.waiting)
+            if not future.done():
+                endpoint.active += 1
+                future.set_result(None)
+
+    async def acquire(self, name: str, priority: int = INTERACTIVE) -> float:
+        """
+        Wait for a request slot on an endpoint
+
+        Args:
+            name: Endpoint name (API URL)
+            priority: INTERACTIVE, FOLLOW_UP or BACKGROUND
+
+        Returns:
+            Milliseconds spent queued
+
+        Raises:
+            SchedulerOverloaded: Background request shed
+        """
+        endpoint = self._endpoint(name)
+        counts = self._counts[priority]
+        started_at = time.perf_counter()
+        self._loop = asyncio.get_running_loop()
+
+        if endpoint.active < endpoint.limit and not endpoint.depth():
+            endpoint.active += 1
+        else:
+            if priority == BACKGROUND and 0 < self.shed_queue_depth <= endpoint.depth():
+                counts["shed"] += 1
+                logger.warning(f"Shedding background LLM request, {endpoint.depth()} requests queued for {name}")
+                raise SchedulerOverloaded(f"LLM queue for {name} is {endpoint.depth()} deep")
+
+            counts["queued"] += 1
+            future = self._loop.create_future()
+            heapq.heappush(endpoint.waiting, [priority, next(self._sequence), future])
+            try:
+                await future  # The slot is handed over by release()
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self.release(name)  # Granted and cancelled at the same time
+                raise
+
+        counts["admitted"] += 1
+        queue_ms = (time.perf_counter() - started_at) * 1000
+        self._queue_ms[priority].append(queue_ms)
+        return queue_ms
+
+    def release(self, name: str) -> None:
+        """Free a slot, handing it to the highest priority waiter"""
+        endpoint = self._endpoint(name)
+        endpoint.active = max(0, endpoint.active - 1)
+        self._dispatch(endpoint)
+
+    @asynccontextmanager
+    async def slot(self, name: str, priority: int = INTERACTIVE) -> AsyncIterator[float]:
+        """
+        Hold a request slot for the duration of the block
+
+        Args:
+            name: Endpoint name (API URL)
+            priority: INTERACTIVE, FOLLOW_UP or BACKGROUND
+
+        Yields:
+            Milliseconds spent queued
+        """
+        queue_ms = await self.acquire(name, priority)
+        try:
+            yield queue_ms
+        finally:
+            self.release(name)
+
+    async def to_thread(self, name: str, fn: Callable[[], Any], priority: int = INTERACTIVE) -> Tuple[Any, float]:
+        """
+        Run a blocking request in a worker thread on a slot
+
+        The slot is held until the thread finishes, even if the caller is
+        cancelled meanwhile: the thread cannot be stopped, so releasing its
+        slot early would put more requests on the endpoint than its limit.
+
+        Args:
+            name: Endpoint name (API URL)
+            fn: Blocking call (run with a copy of the caller's context)
+            priority: INTERACTIVE, FOLLOW_UP or BACKGROUND
+
+        Returns:
+            The result of fn and the milliseconds spent queued
+        """
+        queue_ms = await self.acquire(name, priority)
+        try:
+            future = self._loop.run_in_executor(None, contextvars.copy_context().run, fn)
+        except BaseException:
+            self.release(name)
+            raise
+
+        def done(future: "asyncio.Future[Any]") -> None:
+            self.release(name)
+            if not future.cancelled():
+                future.exception()  # Retrieved here in case the caller was cancelled
+
+        future.add_done_callback(done)
+        return await asyncio.shield(future), queue_ms
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per-priority admission counts and queue time percentiles, per-endpoint load"""
+        priorities = {}
+        for priority, name in PRIORITY_NAMES.items():
+            samples = sorted(self._queue_ms[priority])
+            priorities[name] = {
+                **self._counts[priority],
+                "queue_p50_ms": round(percentile(samples, 50), 1),
+                "queue_p95_ms": round(percentile(samples, 95), 1),
+                "queue_max_ms": round(max(samples, default=0.0), 1)
+            }
+        endpoints = {
+            name: {"limit": endpoint.limit, "active": endpoint.active, "queued": endpoint.depth()}
+            for name, endpoint in self._endpoints.items()
+        }
+        return {"priorities": priorities, "endpoints": endpoints}
+
+    def format_metrics(self) -> str:
+        """Metrics as a text table"""
+        metrics = self.metrics()
+        lines = [f"{'priority':<12}{'admitted':>9}{'queued':>8}{'shed':>6}{'p50':>9}{'p95':>9}"]
+        for name, stats in metrics["priorities"].items():
+            lines.append(
+                f"{name:<12}{stats['admitted']:>9}{stats['queued']:>8}{stats['shed']:>6}"
+                f"{stats['queue_p50_ms']:>7.0f}ms{stats['queue_p95_ms']:>7.0f}ms"
+            )
+        for name, stats in metrics["endpoints"].items():
+            lines.append(f"{name}: {stats['active']}/{stats['limit']} active, {stats['queued']} queued")
+        return "\n".join(lines)
+
+# Global scheduler instance
+_llm_scheduler: Optional[LLMScheduler] = None
+
+def _limits(config: Config) -> Dict[str, Any]:
+    return {
+        "max_concurrency": int(config.get("llm_max_concurrency", DEFAULT_MAX_CONCURRENCY)),
+        "endpoint_limits": dict(config.get("llm_endpoint_concurrency") or {}),
+        "shed_queue_depth": int(config.get("llm_shed_queue_depth", DEFAULT_SHED_QUEUE_DEPTH))
+    }
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Get global LLM scheduler instance (limits from config.yaml, updated on reload)"""
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        scheduler = _llm_scheduler = LLMScheduler(**_limits(get_config()))
+
+        def apply(old: Config, new: Config) -> None:
+            limits = _limits(new)
+            if limits != _limits(old):
+                scheduler.configure_threadsafe(**limits)
+                logger.info(f"LLM scheduler limits updated: {limits}")
+
+        get_config_manager().subscribe(apply)
+    return _llm_scheduler
+
+# Export
+export = {
+    'LLMScheduler': LLMScheduler,
+    'SchedulerOverloaded': SchedulerOverloaded,
+    'INTERACTIVE': INTERACTIVE,
+    'FOLLOW_UP': FOLLOW_UP,
+    'BACKGROUND': BACKGROUND,
+    'get_llm_scheduler': get_llm_scheduler
+}
@@ -1,60 +1,233 @@
-import logging
 import os
-from datetime import datetime
+import re
+import json
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Mapping, Optional
+
+# Constants
+DEFAULT_LOG_DIR = "logs"
+DEFAULT_PREFIX = "assistant"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_RETENTION_DAYS = 14
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord attributes that are not structured fields
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "fields"}
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        """One JSON object per record: time, level, message, turn context and structured fields"""
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value  # turn_id, turn_source (ContextFilter)
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class ContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Tag a record with the current turn and span (runs in the caller, where the turn context is)"""
+        try:
+            from utils.latency import current_turn  # Both modules log through this one
+            from utils.tracing import current_span
+        except ImportError:
+            return True  # Still importing
+
+        turn = current_turn()
+        if turn is not None:
+            record.turn_id = turn.id
+            record.turn_source = turn.source
+        span = current_span()
+        if span is not None:
+            record.trace_id = span.trace.trace_id
+            record.span_id = span.span_id
+        return True
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Enqueue the record as is: formatting happens on the listener thread"""
+        return record
+
+class DailyRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    def __init__(
+        self,
+        log_dir: str = DEFAULT_LOG_DIR,
+        prefix: str = DEFAULT_PREFIX,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        retention_days: int = DEFAULT_RETENTION_DAYS
+    ):
+        """
+        JSON-lines file per day, rolled over by size within the day
+
+        Writes <prefix>_<date>.jsonl; past max_bytes the file is renamed to
+        <prefix>_<date>.<n>.jsonl and a new one started. On a new day, files
+        older than retention_days are deleted.
+
+        Args:
+            log_dir: Log directory
+            prefix: File name prefix
+            max_bytes: Size that triggers a rollover (0 for no limit)
+            retention_days: Days of log files kept (0 keeps all)
+        """
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self.day = date.today()
+        os.makedirs(log_dir, exist_ok=True)
+        super().__init__(self._path(self.day), "a", encoding="utf-8", delay=True)
+        self._delete_expired()
+
+    def _path(self, day: date, index: int = 0) -> str:
+        suffix = f".{index}" if index else ""
+        return os.path.join(self.log_dir, f"{self.prefix}_{day.isoformat()}{suffix}.jsonl")
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if date.today() != self.day:
+            return True
+        if self.max_bytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() + len(self.format(record)) + 1 > self.max_bytes
+
+    def doRollover(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+        today = date.today()
+        if today != self.day:
+            self.day = today
+            self.baseFilename = os.path.abspath(self._path(today))
+            self._delete_expired()
+        elif os.path.exists(self.baseFilename):
+            index = 1
+            while os.path.exists(self._path(today, index)):
+                index += 1
+            os.rename(self.baseFilename, self._path(today, index))
+        self.stream = self._open()
+
+    def _delete_expired(self) -> None:
+        """Delete the files of days older than retention_days"""
+        if self.retention_days <= 0:
+            return
+        cutoff = self.day - timedelta(days=self.retention_days)
+        pattern = re.compile(rf"^{re.escape(self.prefix)}_(\d{{4}}-\d{{2}}-\d{{2}})(\.\d+)?\.jsonl$")
+        for name in os.listdir(self.log_dir):
+            match = pattern.match(name)
+            if match and date.fromisoformat(match.group(1)) < cutoff:
+                try:
+                    os.remove(os.path.join(self.log_dir, name))
+                except OSError:
+                    pass
 
 class CustomLogger:
-    def __init__(self):
-        # Create log directory
-        self.log_dir = "logs"
-        if not os.path.exists(self.log_dir):
-            os.makedirs(self.log_dir)
+    def __init__(self, log_dir: str = DEFAULT_LOG_DIR, name: str = "AIAssistant"):
+        """
+        Application logger writing from a background thread
+
+        Log calls only enqueue the record; a QueueListener thread formats
+        it and writes JSON lines to the daily log file and human-readable
+        lines to the console. Messages may use %-style arguments, which are
+        then formatted on the listener thread, and keyword arguments become
+        structured fields of the JSON line (e.g. tool, latency_ms). Records
+        logged during a turn carry its turn_id.
 
-        # Daily log file name
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        self.log_file = os.path.join(self.log_dir, f"assistant_{current_date}.log")
+        Args:
+            log_dir: Log directory
+            name: Logger name
+        """
+        self.log_dir = log_dir
+        self.debug_sample_rate = 1.0
 
         # Configure logger
-        self.logger = logging.getLogger("AIAssistant")
+        self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
 
-        # File handler
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
+        # File handler (JSON lines)
+        self.file_handler = DailyRotatingFileHandler(log_dir)
+        self.file_handler.setLevel(logging.DEBUG)
+        self.file_handler.setFormatter(JsonFormatter())
+        self.log_file = self.file_handler.baseFilename
 
         # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
+        self.console_handler = logging.StreamHandler()
+        self.console_handler.setLevel(logging.INFO)
+        self.console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
 
-        # Set format
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        # Callers only enqueue; the listener thread does formatting and I/O
+        self.queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.queue_handler = DeferredQueueHandler(self.queue)
+        self.queue_handler.addFilter(ContextFilter())
+        self.logger.handlers = [self.queue_handler]
+        self.listener = logging.handlers.QueueListener(
+            self.queue, self.file_handler, self.console_handler, respect_handler_level=True
         )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
+        self.listener.start()
+        self._running = True
+        atexit.register(self.shutdown)
 
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+    def configure(self, config: Mapping[str, Any]) -> None:
+        """
+        Apply the log_* settings of a config snapshot
 
-    def debug(self, message):
-        """Log at debug level"""
-        self.logger.debug(message)
+        Args:
+            config: Config values (log_max_bytes, log_retention_days,
+                log_debug_sample_rate, log_console_level)
+        """
+        self.file_handler.max_bytes = int(config.get("log_max_bytes", DEFAULT_MAX_BYTES))
+        self.file_handler.retention_days = int(config.get("log_retention_days", DEFAULT_RETENTION_DAYS))
+        self.debug_sample_rate = min(max(float(config.get("log_debug_sample_rate", 1.0)), 0.0), 1.0)
+        self.console_handler.setLevel(str(config.get("log_console_level", "INFO")).upper())
 
-    def info(self, message):
+    def _log(self, level: int, message: str, args: tuple, fields: Dict[str, Any]) -> None:
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, message, *args, extra={"fields": fields} if fields else None)
+
+    def debug(self, message, *args, sample_rate: Optional[float] = None, **fields):
+        """
+        Log at debug level, keeping only a sample of records
+
+        Args:
+            sample_rate: Fraction of records kept (log_debug_sample_rate by default)
+        """
+        rate = self.debug_sample_rate if sample_rate is None else sample_rate
+        if rate < 1.0:
+            if random.random() >= rate:
+                return
+            fields["sample_rate"] = rate
+        self._log(logging.DEBUG, message, args, fields)
+
+    def info(self, message, *args, **fields):
         """Log at info level"""
-        self.logger.info(message)
+        self._log(logging.INFO, message, args, fields)
 
-    def warning(self, message):
+    def warning(self, message, *args, **fields):
         """Log at warning level"""
-        self.logger.warning(message)
+        self._log(logging.WARNING, message, args, fields)
 
-    def error(self, message):
+    def error(self, message, *args, **fields):
         """Log at error level"""
-        self.logger.error(message)
+        self._log(logging.ERROR, message, args, fields)
 
-    def critical(self, message):
+    def critical(self, message, *args, **fields):
         """Log at critical level"""
-        self.logger.critical(message)
+        self._log(logging.CRITICAL, message, args, fields)
 
     def log_exception(self, exc_type, exc_value, exc_traceback):
         """Log an exception"""
@@ -63,6 +236,20 @@ class CustomLogger:
             exc_info=(exc_type, exc_value, exc_traceback)
         )
 
+    def flush(self) -> None:
+        """Wait until every queued record is written"""
+        if self._running:
+            self.listener.stop()  # Drains the queue
+            self.listener.start()
+
+    def shutdown(self) -> None:
+        """Write the queued records and stop the listener thread; later records are written directly"""
+        if self._running:
+            self._running = False
+            self.listener.stop()
+            self.file_handler.addFilter(ContextFilter())
+            self.logger.handlers = [self.file_handler, self.console_handler]
+
 # Singleton instance
 _logger_instance = None
 
@@ -71,4 +258,4 @@ def get_logger():
     global _logger_instance
     if _logger_instance is None:
         _logger_instance = CustomLogger()
-    return _logger_instance
\ No newline at end of file
+    return _logger_instance
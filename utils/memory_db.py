@@ -0,0 +1,306 @@
+import os
+import time
+import queue
+import atexit
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_MAX_BATCH = 64
+DEFAULT_READ_POOL_SIZE = 2
+BUSY_TIMEOUT = 30
+
+SQLCallable = Callable[[sqlite3.Connection], Any]
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Open a connection configured for one writer and concurrent readers"""
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class MemoryDB:
+    def __init__(
+        self,
+        db_path: str,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        read_pool_size: int = DEFAULT_READ_POOL_SIZE
+    ):
+        """
+        Initialize SQLite access with a dedicated writer thread
+
+        Writes are queued on a bounded queue and committed by one thread, up
+        to max_batch writes per transaction. Reads run on a small thread pool
+        with one connection per thread. Neither ever runs on the caller thread.
+
+        Args:
+            db_path: Path to the SQLite database
+            queue_size: Maximum number of queued writes before callers are throttled
+            max_batch: Maximum number of writes committed in one transaction
+            read_pool_size: Number of reader threads/connections
+        """
+        self.db_path = db_path
+        self.max_batch = max(1, max_batch)
+        self._queue: "queue.Queue[Optional[Tuple[SQLCallable, Future]]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._read_pool = ThreadPoolExecutor(max_workers=max(1, read_pool_size), thread_name_prefix="memory-db-read")
+        self._schemas: set = set()
+        self._schema_lock = threading.Lock()
+        self._closed = False
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "writes": 0,
+            "write_errors": 0,
+            "batches": 0,
+            "max_batch_size": 0,
+            "reads": 0,
+            "backpressure_waits": 0,
+            "max_queue_depth": 0,
+            "write_seconds": 0.0,
+            "max_write_seconds": 0.0
+        }
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._writer = threading.Thread(target=self._write_loop, name="memory-db-writer", daemon=True)
+        self._writer.start()
+
+    def _count(self, **values: float) -> None:
+        """Increment metrics"""
+        with self._metrics_lock:
+            for key, value in values.items():
+                self._metrics[key] += value
+
+    def _write_loop(self) -> None:
+        """Commit queued writes in batches until close() is called"""
+        conn = _connect(self.db_path)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+
+                batch = [item]
+                stop = False
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                        break
+                    batch.append(item)
+
+                try:
+                    self._commit_batch(conn, batch)
+                except Exception as e:
+                    # Never let one batch stop the writer; later writes would hang
+                    logger.error(f"Memory database writer error: {e}")
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[Tuple[SQLCallable, Future]]) -> None:
+        """Run a batch of writes in one transaction, isolating failures with savepoints"""
+        # Writes cancelled by their caller are dropped; the rest can no longer be cancelled
+        batch = [(fn, future) for fn, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        start = time.perf_counter()
+        results: List[Tuple[Future, Any, Optional[BaseException]]] = []
+        errors = 0
+
+        try:
+            conn.execute("BEGIN")
+            for fn, future in batch:
+                conn.execute("SAVEPOINT write")
+                try:
+                    results.append((future, fn(conn), None))
+                    conn.execute("RELEASE write")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    results.append((future, None, e))
+                    errors += 1
+            conn.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"Memory database batch error: {e}")
+            try:
+                conn.execute("ROLLBACK")
+            except Exception:
+                pass
+            results = [(future, None, e) for _, future in batch]
+            errors = len(batch)
+
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        elapsed = time.perf_counter() - start
+        with self._metrics_lock:
+            self._metrics["writes"] += len(batch)
+            self._metrics["write_errors"] += errors
+            self._metrics["batches"] += 1
+            self._metrics["max_batch_size"] = max(self._metrics["max_batch_size"], len(batch))
+            self._metrics["write_seconds"] += elapsed
+            self._metrics["max_write_seconds"] = max(self._metrics["max_write_seconds"], elapsed)
+
+    def _commit_inline(self, fn: SQLCallable, future: Future) -> None:
+        """Run one write on a temporary connection of the caller thread"""
+        conn = _connect(self.db_path)
+        try:
+            self._commit_batch(conn, [(fn, future)])
+        finally:
+            conn.close()
+
+    def _reader(self) -> sqlite3.Connection:
+        """Return the connection of the current reader thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _connect(self.db_path)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def _run_read(self, fn: SQLCallable) -> Any:
+        self._count(reads=1)
+        return fn(self._reader())
+
+    def _track_depth(self) -> None:
+        depth = self._queue.qsize()
+        with self._metrics_lock:
+            self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], depth)
+
+    def submit_write(self, fn: SQLCallable, block: bool = True) -> Future:
+        """
+        Queue a write, blocking while the queue is full
+
+        Args:
+            fn: Callable receiving the writer connection
+            block: Wait for queue space (otherwise raise queue.Full at once)
+
+        Returns:
+            Future resolved with fn's result once committed
+        """
+        future: Future = Future()
+        if self._closed:
+            # Late writes (e.g. from __del__ at interpreter exit) run inline
+            self._commit_inline(fn, future)
+            return future
+
+        try:
+            self._queue.put_nowait((fn, future))
+        except queue.Full:
+            if not block:
+                raise
+            self._count(backpressure_waits=1)
+            self._queue.put((fn, future))
+        self._track_depth()
+        return future
+
+    async def write(self, fn: SQLCallable) -> Any:
+        """Queue a write and await its commit without blocking the event loop"""
+        if self._closed:
+            return self.submit_write(fn).result()
+
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((fn, future))
+        except queue.Full:
+            # Backpressure: wait for queue space on a worker thread, not on the loop
+            self._count(backpressure_waits=1)
+            await asyncio.to_thread(self._queue.put, (fn, future))
+        self._track_depth()
+        return await asyncio.wrap_future(future)
+
+    def submit_read(self, fn: SQLCallable) -> Future:
+        """Run a read on the reader pool"""
+        return self._read_pool.submit(self._run_read, fn)
+
+    async def read(self, fn: SQLCallable) -> Any:
+        """Run a read on the reader pool and await its result"""
+        return await asyncio.wrap_future(self.submit_read(fn))
+
+    def ensure_schema(self, name: str, fn: SQLCallable) -> None:
+        """Run a schema migration once per database"""
+        with self._schema_lock:
+            if name in self._schemas:
+                return
+            self.submit_write(fn).result()
+            self._schemas.add(name)
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        """Wait until every write queued so far is committed"""
+        self.submit_write(lambda conn: None).result(timeout)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return writer/reader metrics"""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        metrics["queue_depth"] = self._queue.qsize()
+        metrics["queue_size"] = self._queue.maxsize
+        metrics["avg_batch_size"] = round(metrics["writes"] / metrics["batches"], 2) if metrics["batches"] else 0.0
+        metrics["avg_write_ms"] = round(metrics["write_seconds"] * 1000 / metrics["batches"], 3) if metrics["batches"] else 0.0
+        return metrics
+
+    def close(self) -> None:
+        """Commit queued writes and close every connection"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        self._read_pool.shutdown(wait=True)
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+
+# One database handle (one writer thread) per database file
+_databases: Dict[str, MemoryDB] = {}
+_databases_lock = threading.Lock()
+
+def get_memory_db(db_path: str) -> MemoryDB:
+    """Get the shared database handle of a database file"""
+    key = os.path.abspath(db_path)
+    with _databases_lock:
+        db = _databases.get(key)
+        if db is None or db._closed:
+            db = MemoryDB(db_path)
+            _databases[key] = db
+        return db
+
+def close_all() -> None:
+    """Close every open database handle"""
+    with _databases_lock:
+        databases = list(_databases.values())
+        _databases.clear()
+    for db in databases:
+        db.close()
+
+atexit.register(close_all)
+
+# Export
+export = {
+    'MemoryDB': MemoryDB,
+    'get_memory_db': get_memory_db,
+    'close_all': close_all
+}
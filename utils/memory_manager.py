@@ -1,70 +1,261 @@
 import os
+import re
+import queue
+import asyncio
 import sqlite3
-from typing import List
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
 from utils.logger import get_logger
+from utils.eviction import AccessStats, EvictionPolicy, FIFOPolicy, create_policy
+from utils.memory_db import get_memory_db
 
 # Get logger instance
 logger = get_logger()
 
+# Constants
+DEFAULT_DB_PATH = "memory.db"
+DEFAULT_NAMESPACE = "default"
+DEFAULT_MAX_HOT_NAMESPACES = 32
+DEFAULT_HIT_FLUSH_SIZE = 50
+
+def namespace_key(user_id: Optional[str] = None, session_id: Optional[str] = None) -> str:
+    """
+    Build a memory namespace key from user and session ids
+
+    Args:
+        user_id: User identifier
+        session_id: Session identifier
+
+    Returns:
+        Namespace key ("default", "<user>" or "<user>:<session>")
+    """
+    user = str(user_id).strip() if user_id else DEFAULT_NAMESPACE
+    if session_id:
+        return f"{user}:{str(session_id).strip()}"
+    return user
+
+def create_schema(conn: sqlite3.Connection) -> None:
+    """Create and migrate the memory tables"""
+    conn.execute('''CREATE TABLE IF NOT EXISTS memory_items
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     namespace TEXT NOT NULL DEFAULT 'default',
+                     item_id INTEGER,
+                     text TEXT NOT NULL,
+                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                     importance REAL NOT NULL DEFAULT 0,
+                     recall_count INTEGER NOT NULL DEFAULT 0,
+                     last_recalled_at REAL)''')
+
+    # Migrate databases created before namespaces existed
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(memory_items)")}
+    if "namespace" not in columns:
+        conn.execute("ALTER TABLE memory_items ADD COLUMN namespace TEXT NOT NULL DEFAULT 'default'")
+    if "item_id" not in columns:
+        conn.execute("ALTER TABLE memory_items ADD COLUMN item_id INTEGER")
+        conn.execute("UPDATE memory_items SET item_id = id WHERE item_id IS NULL")
+    if "importance" not in columns:
+        conn.execute("ALTER TABLE memory_items ADD COLUMN importance REAL NOT NULL DEFAULT 0")
+        conn.execute("ALTER TABLE memory_items ADD COLUMN recall_count INTEGER NOT NULL DEFAULT 0")
+        conn.execute("ALTER TABLE memory_items ADD COLUMN last_recalled_at REAL")
+
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_memory_items_namespace_item
+                    ON memory_items (namespace, item_id)''')
+
+INSERT_ITEM_SQL = """INSERT INTO memory_items
+                     (namespace, item_id, text, created_at, importance, recall_count, last_recalled_at)
+                     VALUES (?, ?, ?, COALESCE(datetime(?, 'unixepoch'), CURRENT_TIMESTAMP), ?, ?, ?)"""
+
+UPDATE_HITS_SQL = """UPDATE memory_items SET recall_count = ?, last_recalled_at = ?
+                     WHERE namespace = ? AND item_id = ?"""
+
+DELETE_ITEM_SQL = "DELETE FROM memory_items WHERE namespace = ? AND item_id = ?"
+
+def namespace_filename(namespace: str) -> str:
+    """Return a filesystem-safe, collision-free file stem for a namespace"""
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", namespace)[:64]
+    digest = hashlib.sha1(namespace.encode()).hexdigest()[:8]
+    return f"{safe}-{digest}"
+
 class MemoryManager:
-    def __init__(self, max_items: int = 1000):
+    def __init__(
+        self,
+        max_items: int = 1000,
+        namespace: str = DEFAULT_NAMESPACE,
+        db_path: str = DEFAULT_DB_PATH,
+        embedding_store: Optional[Any] = None,
+        eviction_policy: Optional[EvictionPolicy] = None,
+        hit_flush_size: int = DEFAULT_HIT_FLUSH_SIZE,
+        load: bool = True
+    ):
         """
         Initialize Memory Manager
-        
+
+        SQLite work runs on the shared writer thread and reader pool of the
+        database (see utils.memory_db); the *Async methods await it without
+        blocking the event loop. Items added or deleted since the last
+        checkpoint are tracked, so checkpoint() writes only those.
+
         Args:
             max_items: Maximum number of memory items
+            namespace: Memory namespace (user/session key)
+            db_path: Path to the SQLite database
+            embedding_store: Optional EmbeddingStore used for similarity search
+            eviction_policy: Policy selecting the item dropped when full (FIFO by default)
+            hit_flush_size: Number of pending recall hits that triggers a batch write
+            load: Load stored items now (pass False and await loadAsync() instead)
         """
         self.max_items = max_items
+        self.namespace = namespace
+        self.db_path = db_path
+        self.db = get_memory_db(db_path)
+        self.embedding_store = embedding_store
+        self.eviction_policy = eviction_policy or FIFOPolicy()
+        self.hit_flush_size = max(1, hit_flush_size)
+        self.stats = AccessStats()
         self.texts: List[str] = []
-        
+        self.ids: List[int] = []
+        self._next_id = 0
+        self._added: Set[int] = set()  # Items not written yet
+        self._deleted: Set[int] = set()  # Written items to delete
+
         try:
-            logger.info("Initializing memory manager...")
+            logger.info(f"Initializing memory manager for namespace '{namespace}'...")
             self._init_db()
-            if not self.loadFromSQLite():
+            if load and not self.loadFromSQLite():
                 logger.warning("No existing items loaded from database")
         except Exception as e:
             logger.error(f"Initialization error: {e}")
             self.texts = []
+            self.ids = []
 
     def _init_db(self):
         """Create database tables"""
-        with sqlite3.connect('memory.db') as conn:
-            c = conn.cursor()
-            c.execute('''CREATE TABLE IF NOT EXISTS memory_items
-                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                          text TEXT NOT NULL,
-                          created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-            conn.commit()
+        self.db.ensure_schema("memory_items", create_schema)
 
-    def addItem(self, text: str) -> None:
+    def addItem(self, text: str, importance: float = 0.0) -> int:
         """
         Add new text to memory
-        
+
         Args:
             text: Text to store
+            importance: Importance score between 0 and 1, used by the scored eviction policy
+
+        Returns:
+            Id of the new memory item
         """
+        item_id = self._insert(text, importance)
+        if self.embedding_store is not None:
+            self.embedding_store.add(item_id, text)
+        return item_id
+
+    def _insert(self, text: str, importance: float) -> int:
+        """Add an item to the in-memory lists, evicting when full (without embedding it)"""
         if not isinstance(text, str) or not text.strip():
             raise ValueError("Text must be a non-empty string")
 
         # Check maximum item count
-        if len(self.texts) >= self.max_items:
-            # Delete oldest item
-            self.deleteItem(0)
+        while self.texts and len(self.texts) >= self.max_items:
+            self.evictItem()
 
+        item_id = self._next_id
+        self._next_id += 1
         self.texts.append(text)
+        self.ids.append(item_id)
+        self._added.add(item_id)
+        self.stats.track(item_id, importance=min(max(float(importance), 0.0), 1.0))
+        return item_id
+
+    def evictItem(self) -> None:
+        """Delete the item selected by the eviction policy"""
+        self.deleteItem(self.eviction_policy.select_victim(self.ids, self.stats))
 
     def deleteItem(self, index: int) -> None:
         """Delete memory item"""
         if 0 <= index < len(self.texts):
             del self.texts[index]
+            item_id = self.ids.pop(index)
+            if item_id in self._added:
+                self._added.discard(item_id)  # Never written
+            else:
+                self._deleted.add(item_id)
+            self.stats.forget(item_id)
+            if self.embedding_store is not None:
+                self.embedding_store.remove(item_id)
+
+    def recordHits(self, item_ids: List[int]) -> None:
+        """
+        Record retrieval hits, writing them to the database in batches
+
+        Args:
+            item_ids: Ids of the recalled items
+        """
+        for item_id in item_ids:
+            self.stats.hit(item_id)
+        if len(self.stats.dirty) >= self.hit_flush_size:
+            self.flushHits()
+
+    def _update_hits(self, rows) -> Any:
+        """Return a write applying pending recall statistics"""
+        data = [(count, last_access, self.namespace, item_id) for item_id, count, last_access in rows]
+        return lambda conn: conn.executemany(UPDATE_HITS_SQL, data)
+
+    def _requeue_hits(self, rows) -> None:
+        """Mark recall statistics dirty again after a failed write"""
+        self.stats.dirty.update(item_id for item_id, _, _ in rows if item_id in self.stats.added_at)
+
+    def flushHits(self) -> bool:
+        """
+        Queue pending recall statistics for a batched database write
+
+        Never waits for queue space: when the write queue is full, the
+        statistics stay pending for the next flush or checkpoint.
+
+        Returns:
+            bool: Operation success status
+        """
+        rows = self.stats.take_dirty()
+        if not rows:
+            return True
+
+        def on_done(future):
+            if future.exception() is not None:
+                logger.error(f"Error flushing recall statistics: {future.exception()}")
+                self._requeue_hits(rows)
+
+        try:
+            self.db.submit_write(self._update_hits(rows), block=False).add_done_callback(on_done)
+            return True
+        except queue.Full:
+            self._requeue_hits(rows)
+            return False
+        except Exception as e:
+            logger.error(f"Error flushing recall statistics: {e}")
+            self._requeue_hits(rows)
+            return False
+
+    async def flushHitsAsync(self) -> bool:
+        """Write pending recall statistics without blocking the event loop"""
+        rows = self.stats.take_dirty()
+        if not rows:
+            return True
+
+        try:
+            await self.db.write(self._update_hits(rows))
+            return True
+        except Exception as e:
+            logger.error(f"Error flushing recall statistics: {e}")
+            self._requeue_hits(rows)
+            return False
 
     def getItems(self) -> List[str]:
         """
         Return memory items in the given order
-        
+
         Args:
             sorted_indices: List of indices in desired order
-            
+
         Returns:
             Memory items in the specified order
         """
@@ -77,14 +268,191 @@ class MemoryManager:
             logger.error(f"Error retrieving items: {str(e)}")
             return []
 
+    def search(self, query: str, k: int = 5) -> List[str]:
+        """
+        Return the k memory items most similar to a query
+
+        Args:
+            query: Query text
+            k: Number of items to return
+
+        Returns:
+            Most similar items first (latest items if no embedding store is set)
+        """
+        if not self.texts or k <= 0:
+            return []
+
+        if self.embedding_store is None:
+            return self.texts[-k:]
+
+        try:
+            positions = {item_id: i for i, item_id in enumerate(self.ids)}
+            results = self.embedding_store.search(query, self.ids, k)
+            self.recordHits([item_id for item_id, _ in results])
+            return [self.texts[positions[item_id]] for item_id, _ in results]
+        except Exception as e:
+            logger.error(f"Error searching memory: {e}")
+            return self.texts[-k:]
+
+    async def searchAsync(self, query: str, k: int = 5) -> List[str]:
+        """Return the k memory items most similar to a query, embedding the query off the event loop"""
+        if not self.texts or k <= 0:
+            return []
+
+        if self.embedding_store is None:
+            return self.texts[-k:]
+
+        # Items may change while the worker thread searches, so it works on a snapshot
+        ids, texts = list(self.ids), list(self.texts)
+        try:
+            results = await asyncio.to_thread(self.embedding_store.search, query, ids, k)
+        except Exception as e:
+            logger.error(f"Error searching memory: {e}")
+            return texts[-k:]
+
+        positions = {item_id: i for i, item_id in enumerate(ids)}
+        for item_id, _ in results:
+            self.stats.hit(item_id)
+        if len(self.stats.dirty) >= self.hit_flush_size:
+            await self.flushHitsAsync()
+        return [texts[positions[item_id]] for item_id, _ in results]
+
     def clear(self) -> None:
-        """Clear all memory items"""
+        """Clear all memory items from RAM, discarding changes not checkpointed"""
         self.texts.clear()
+        self.ids.clear()
+        self.stats.clear()
+        self._added.clear()
+        self._deleted.clear()
+
+    def pending_changes(self) -> int:
+        """Number of item additions, deletions and recall updates not written yet"""
+        return len(self._added) + len(self._deleted) + len(self.stats.dirty)
+
+    def _take_changes(self) -> Tuple[Any, Any]:
+        """
+        Return a write applying the changes since the last checkpoint, and
+        the changes themselves (to requeue if the write fails)
+        """
+        namespace = self.namespace
+        positions = {item_id: i for i, item_id in enumerate(self.ids)}
+        added = sorted(item_id for item_id in self._added if item_id in positions)
+        deleted = sorted(self._deleted)
+        hits = [row for row in self.stats.take_dirty() if row[0] not in self._added]
+        rows = [self._row(item_id, self.texts[positions[item_id]]) for item_id in added]
+        self._added.clear()
+        self._deleted.clear()
+
+        def write(conn):
+            # Added ids are deleted first, so rewriting requeued changes cannot duplicate rows
+            conn.executemany(DELETE_ITEM_SQL, [(namespace, item_id) for item_id in deleted + added])
+            conn.executemany(INSERT_ITEM_SQL, rows)
+            conn.executemany(UPDATE_HITS_SQL, [
+                (count, last_access, namespace, item_id) for item_id, count, last_access in hits
+            ])
+            return len(rows) + len(deleted) + len(hits)
+
+        return write, (added, deleted, hits)
+
+    def _requeue_changes(self, changes) -> None:
+        """Mark changes pending again after a failed checkpoint"""
+        added, deleted, hits = changes
+        self._added.update(item_id for item_id in added if item_id in self.stats.added_at)
+        self._deleted.update(deleted)
+        self._requeue_hits(hits)
+
+    def checkpoint(self) -> int:
+        """
+        Write the changes since the last checkpoint (blocks until written)
+
+        Returns:
+            Number of rows written, -1 on error
+        """
+        if not self.pending_changes():
+            return 0
+        write, changes = self._take_changes()
+        try:
+            return self.db.submit_write(write).result()
+        except Exception as e:
+            logger.error(f"Error checkpointing memory (namespace: {self.namespace}): {e}")
+            self._requeue_changes(changes)
+            return -1
+
+    async def checkpointAsync(self) -> int:
+        """Write the changes since the last checkpoint without blocking the event loop"""
+        if not self.pending_changes():
+            return 0
+        write, changes = self._take_changes()
+        try:
+            return await self.db.write(write)
+        except asyncio.CancelledError:
+            self._requeue_changes(changes)
+            raise
+        except Exception as e:
+            logger.error(f"Error checkpointing memory (namespace: {self.namespace}): {e}")
+            self._requeue_changes(changes)
+            return -1
+
+    def _row(self, item_id: int, text: str) -> tuple:
+        """Return the database row of an item"""
+        stats = self.stats
+        return (
+            self.namespace, item_id, text, stats.added_at.get(item_id),
+            stats.importance.get(item_id, 0.0), stats.recall_count.get(item_id, 0),
+            stats.last_access.get(item_id) if stats.recall_count.get(item_id) else None
+        )
+
+    def _save_namespace(self) -> Any:
+        """Return a write replacing the rows of this namespace with a snapshot of the items"""
+        namespace = self.namespace
+        data = [self._row(item_id, text) for item_id, text in zip(self.ids, self.texts)]
+        self.stats.dirty.clear()
+        self._added.clear()
+        self._deleted.clear()
+
+        def write(conn):
+            # Replace only the rows of this namespace
+            conn.execute("DELETE FROM memory_items WHERE namespace = ?", (namespace,))
+            conn.executemany(INSERT_ITEM_SQL, data)
+            return len(data)
+
+        return write
+
+    def _select_namespace(self) -> Any:
+        """Return a read fetching the latest max_items rows of this namespace"""
+        namespace, limit = self.namespace, self.max_items
+        return lambda conn: conn.execute("""
+            SELECT item_id, text, CAST(strftime('%s', created_at) AS REAL),
+                   importance, recall_count, last_recalled_at
+            FROM memory_items
+            WHERE namespace = ?
+            ORDER BY item_id DESC
+            LIMIT ?
+        """, (namespace, limit)).fetchall()
+
+    def _apply_rows(self, rows, embed: bool = True) -> bool:
+        """Replace the in-memory items with loaded rows (embedding the missing ones if embed)"""
+        # Clear existing items
+        self.clear()
+
+        # Load texts, oldest first
+        for item_id, text, added_at, importance, recall_count, last_recalled_at in reversed(rows):
+            self.ids.append(item_id)
+            self.texts.append(text)
+            self.stats.track(item_id, importance or 0.0, added_at, recall_count or 0, last_recalled_at)
+        self._next_id = max(self.ids, default=-1) + 1
+
+        # Embed only items missing from the mapped vector file
+        if embed and self.embedding_store is not None and rows:
+            self.embedding_store.ensure(self.ids, self.texts)
+
+        logger.info(f"Loaded {len(rows)} text items (namespace: {self.namespace})")
+        return len(rows) > 0
 
     def saveToSQLite(self) -> bool:
         """
-        Save memory data to database
-        
+        Save memory data of this namespace to database
+
         Returns:
             bool: Operation success status
         """
@@ -93,71 +461,464 @@ class MemoryManager:
                 logger.info("No items to save")
                 return True
 
-            with sqlite3.connect('memory.db') as conn:
-                c = conn.cursor()
-                
-                # Clean and recreate table
-                c.execute("DROP TABLE IF EXISTS memory_items")
-                c.execute('''CREATE TABLE memory_items
-                           (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            text TEXT NOT NULL,
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-                
-                # Save all items at once
-                data = [(text,) for text in self.texts]
-                c.executemany("INSERT INTO memory_items (text) VALUES (?)", data)
-                
-                conn.commit()
-                logger.info(f"Successfully saved {len(data)} text items to database")
-                return True
+            count = self.db.submit_write(self._save_namespace()).result()
+            logger.info(f"Successfully saved {count} text items to database (namespace: {self.namespace})")
+            return True
 
         except Exception as e:
             logger.error(f"Error in saveToSQLite: {e}")
             return False
 
+    async def saveAsync(self) -> bool:
+        """Save memory data of this namespace without blocking the event loop"""
+        try:
+            if not self.texts:
+                return True
+
+            count = await self.db.write(self._save_namespace())
+            logger.info(f"Successfully saved {count} text items to database (namespace: {self.namespace})")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error in saveAsync: {e}")
+            return False
+
     def loadFromSQLite(self) -> bool:
         """
-        Load memory data from database
-        
+        Load memory data of this namespace from database
+
         Returns:
             bool: Operation success status
         """
-        if not os.path.exists('memory.db'):
+        if not os.path.exists(self.db_path):
             logger.info("No memory database found")
             return False
 
         try:
-            with sqlite3.connect('memory.db') as conn:
-                c = conn.cursor()
-                
-                # Get latest max_items entries
-                c.execute("""
-                    SELECT text
-                    FROM memory_items
-                    ORDER BY created_at DESC
-                    LIMIT ?
-                """, (self.max_items,))
-
-                # Clear existing items
-                self.texts.clear()
-
-                # Load texts
-                loaded_count = 0
-                for (text,) in c.fetchall():
-                    self.texts.append(text)
-                    loaded_count += 1
-
-                logger.info(f"Loaded {loaded_count} text items")
-                return loaded_count > 0
+            return self._apply_rows(self.db.submit_read(self._select_namespace()).result())
+        except Exception as e:
+            logger.error(f"Error loading from database: {e}")
+            return False
+
+    async def loadAsync(self) -> bool:
+        """Load memory data of this namespace without blocking the event loop"""
+        if not os.path.exists(self.db_path):
+            return False
 
+        try:
+            loaded = self._apply_rows(await self.db.read(self._select_namespace()), embed=False)
+            if loaded and self.embedding_store is not None:
+                await asyncio.to_thread(self.embedding_store.ensure, list(self.ids), list(self.texts))
+            return loaded
         except Exception as e:
             logger.error(f"Error loading from database: {e}")
             return False
 
+    async def addItemAsync(self, text: str, importance: float = 0.0) -> int:
+        """
+        Add new text to memory and persist it without blocking the event loop
+
+        Args:
+            text: Text to store
+            importance: Importance score between 0 and 1
+
+        Returns:
+            Id of the new memory item
+        """
+        item_id = self._insert(text, importance)
+        if self.embedding_store is not None:
+            # A full batch is embedded (and the ANN index built) in a worker thread
+            await asyncio.to_thread(self.embedding_store.add, item_id, text)
+        await self.checkpointAsync()  # Writes the item and any items it evicted
+        return item_id
+
     def __del__(self):
-        """Save items and cleanup when object is deleted"""
+        """Write pending changes and cleanup when object is deleted"""
         try:
-            self.saveToSQLite()
+            self.checkpoint()
             self.clear()
         except:
-            pass
\ No newline at end of file
+            pass
+
+class MemoryStore:
+    def __init__(
+        self,
+        max_hot_namespaces: int = DEFAULT_MAX_HOT_NAMESPACES,
+        max_items: int = 1000,
+        db_path: str = DEFAULT_DB_PATH,
+        namespace_limits: Optional[Dict[str, int]] = None,
+        embeddings_dir: Optional[str] = None,
+        embedding_options: Optional[Dict[str, Any]] = None,
+        eviction_policy: str = "fifo",
+        hit_flush_size: int = DEFAULT_HIT_FLUSH_SIZE
+    ):
+        """
+        Initialize namespaced memory store
+
+        Only the most recently used namespaces are kept in RAM; colder
+        namespaces are saved and dropped, and reloaded from disk on demand.
+
+        Args:
+            max_hot_namespaces: Maximum number of namespaces kept in RAM
+            max_items: Default capacity of a namespace
+            db_path: Path to the SQLite database shared by all namespaces
+            namespace_limits: Per-namespace capacity overrides
+            embeddings_dir: Directory of per-namespace embedding files (disabled if None)
+            embedding_options: Embedder configuration (embedding_model, embedding_dim,
+                embedding_dtype, batch_size, ann_threshold, ann_nprobe, api_url, auth_token)
+            eviction_policy: Eviction policy name (fifo, lru, lfu or scored)
+            hit_flush_size: Number of pending recall hits that triggers a batch write
+        """
+        if max_hot_namespaces < 1:
+            raise ValueError("max_hot_namespaces must be at least 1")
+
+        self.max_hot_namespaces = max_hot_namespaces
+        self.max_items = max_items
+        self.db_path = db_path
+        self.namespace_limits: Dict[str, int] = dict(namespace_limits or {})
+        self.embeddings_dir = embeddings_dir
+        self.embedding_options: Dict[str, Any] = dict(embedding_options or {})
+        self._embedder = None
+        self.eviction_policy = create_policy(eviction_policy)
+        self.hit_flush_size = hit_flush_size
+        self._hot: "OrderedDict[str, MemoryManager]" = OrderedDict()
+        self._pins: Dict[str, int] = {}  # Namespaces in use by open sessions, never evicted
+        self._lock = threading.RLock()
+
+    def get(
+        self,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        namespace: Optional[str] = None,
+        pin: bool = False
+    ) -> MemoryManager:
+        """
+        Return the memory manager of a namespace, loading it if cold
+
+        Args:
+            user_id: User identifier
+            session_id: Session identifier
+            namespace: Explicit namespace key (overrides user/session ids)
+            pin: Keep the namespace in RAM until unpin() is called, for callers
+                holding on to the manager (evicted managers are cleared)
+
+        Returns:
+            Memory manager of the namespace
+        """
+        key = namespace or namespace_key(user_id, session_id)
+
+        with self._lock:
+            manager = self._hot.get(key)
+            if manager is not None:
+                self._hot.move_to_end(key)
+                self._pin(key, pin)
+                return manager
+
+            manager = self._create_manager(key, load=True)
+            self._pin(key, pin)
+            cold = self._admit(key, manager)
+
+        for cold_manager in cold:
+            cold_manager.checkpoint()
+            self._release(cold_manager)
+        return manager
+
+    async def get_async(
+        self,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        namespace: Optional[str] = None,
+        pin: bool = False
+    ) -> MemoryManager:
+        """Return the memory manager of a namespace, loading it off the event loop if cold"""
+        key = namespace or namespace_key(user_id, session_id)
+
+        with self._lock:
+            manager = self._hot.get(key)
+            if manager is not None:
+                self._hot.move_to_end(key)
+                self._pin(key, pin)
+                return manager
+
+        # Schema check and vector file mapping block, so they run in a worker thread
+        manager = await asyncio.to_thread(self._create_manager, key, False)
+        await manager.loadAsync()
+
+        with self._lock:
+            # Another task may have loaded the namespace meanwhile
+            existing = self._hot.get(key)
+            if existing is not None:
+                self._hot.move_to_end(key)
+                self._pin(key, pin)
+                manager.clear()
+                return existing
+            self._pin(key, pin)
+            cold = self._admit(key, manager)
+
+        for cold_manager in cold:
+            await cold_manager.checkpointAsync()
+            await asyncio.to_thread(self._release, cold_manager)
+        return manager
+
+    def _create_manager(self, key: str, load: bool) -> MemoryManager:
+        """Create the memory manager of a namespace"""
+        return MemoryManager(
+            max_items=self.namespace_limits.get(key, self.max_items),
+            namespace=key,
+            db_path=self.db_path,
+            embedding_store=self._create_embedding_store(key),
+            eviction_policy=self.eviction_policy,
+            hit_flush_size=self.hit_flush_size,
+            load=load
+        )
+
+    def _pin(self, key: str, pin: bool) -> None:
+        if pin:
+            self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, namespace: str) -> None:
+        """Release a pin taken by get(pin=True); the namespace can be evicted once no pins remain"""
+        with self._lock:
+            count = self._pins.get(namespace, 0) - 1
+            if count > 0:
+                self._pins[namespace] = count
+            else:
+                self._pins.pop(namespace, None)
+
+    def _admit(self, key: str, manager: MemoryManager) -> List[MemoryManager]:
+        """Mark a namespace hot and pop the coldest unpinned ones beyond the limit"""
+        self._hot[key] = manager
+        excess = len(self._hot) - self.max_hot_namespaces
+        cold_keys = [name for name in self._hot if name not in self._pins and name != key][:max(0, excess)]
+        if len(cold_keys) < excess:
+            logger.warning(f"{len(self._hot) - len(cold_keys)} memory namespaces in use, over the hot limit of {self.max_hot_namespaces}")
+        return [self._hot.pop(name) for name in cold_keys]
+
+    def _release(self, manager: MemoryManager) -> None:
+        """Drop a saved namespace from RAM"""
+        manager.clear()
+        if manager.embedding_store is not None:
+            manager.embedding_store.close()
+        logger.debug(f"Evicted memory namespace '{manager.namespace}' from RAM")
+
+    def _create_embedding_store(self, namespace: str):
+        """Create the embedding store of a namespace if embeddings are enabled"""
+        if not self.embeddings_dir:
+            return None
+
+        try:
+            from utils.embedding_store import EmbeddingStore, create_embedder
+
+            # One embedder is shared by every namespace
+            if self._embedder is None:
+                self._embedder = create_embedder(self.embedding_options)
+
+            return EmbeddingStore(
+                os.path.join(self.embeddings_dir, namespace_filename(namespace) + ".npy"),
+                embedder=self._embedder,
+                dtype=self.embedding_options.get("embedding_dtype", "float32"),
+                batch_size=self.embedding_options.get("batch_size", 100),
+                ann_threshold=self.embedding_options.get("ann_threshold", 0),
+                ann_nprobe=self.embedding_options.get("ann_nprobe", 8)
+            )
+        except Exception as e:
+            logger.error(f"Error creating embedding store: {e}")
+            return None
+
+    def set_limit(self, namespace: str, max_items: int) -> None:
+        """Set the capacity of a namespace"""
+        if max_items < 1:
+            raise ValueError("max_items must be at least 1")
+
+        with self._lock:
+            self.namespace_limits[namespace] = max_items
+            manager = self._hot.get(namespace)
+            if manager is not None:
+                manager.max_items = max_items
+                while len(manager.texts) > max_items:
+                    manager.evictItem()
+
+    def configure(
+        self,
+        max_items: Optional[int] = None,
+        hit_flush_size: Optional[int] = None,
+        eviction_policy: Optional[str] = None,
+        batch_size: Optional[int] = None
+    ) -> None:
+        """
+        Change store settings while running, applying them to hot namespaces
+
+        Args:
+            max_items: Default capacity (namespaces with a set_limit override keep theirs)
+            hit_flush_size: Number of pending recall hits that triggers a batch write
+            eviction_policy: Eviction policy name (fifo, lru, lfu or scored)
+            batch_size: Number of pending texts that triggers a batch embedding
+        """
+        with self._lock:
+            if max_items is not None:
+                self.max_items = max(1, max_items)
+            if hit_flush_size is not None:
+                self.hit_flush_size = max(1, hit_flush_size)
+            if eviction_policy is not None:
+                self.eviction_policy = create_policy(eviction_policy)
+            if batch_size is not None:
+                self.embedding_options["batch_size"] = max(1, batch_size)
+
+            for key, manager in self._hot.items():
+                manager.hit_flush_size = self.hit_flush_size
+                manager.eviction_policy = self.eviction_policy
+                if manager.embedding_store is not None:
+                    manager.embedding_store.batch_size = self.embedding_options.get("batch_size", 100)
+                if key not in self.namespace_limits:
+                    manager.max_items = self.max_items
+                    while len(manager.texts) > manager.max_items:
+                        manager.evictItem()
+
+    def evict(self, namespace: str) -> bool:
+        """
+        Save a hot namespace to disk and drop it from RAM
+
+        Returns:
+            bool: True if the namespace was hot and not pinned
+        """
+        with self._lock:
+            if namespace in self._pins:
+                logger.warning(f"Memory namespace '{namespace}' is in use, not evicting it")
+                return False
+            manager = self._hot.pop(namespace, None)
+        if manager is None:
+            return False
+
+        manager.checkpoint()
+        self._release(manager)
+        return True
+
+    def hot_namespaces(self) -> List[str]:
+        """Return namespaces currently kept in RAM, least recently used first"""
+        with self._lock:
+            return list(self._hot.keys())
+
+    def namespaces(self) -> List[str]:
+        """Return all namespaces, hot or stored on disk"""
+        names = set(self.hot_namespaces())
+        if os.path.exists(self.db_path):
+            try:
+                names.update(row[0] for row in get_memory_db(self.db_path).submit_read(
+                    lambda conn: conn.execute("SELECT DISTINCT namespace FROM memory_items").fetchall()
+                ).result())
+            except Exception as e:
+                logger.error(f"Error listing memory namespaces: {e}")
+        return sorted(names)
+
+    def pending_changes(self) -> int:
+        """Number of changes of hot namespaces not written yet"""
+        with self._lock:
+            managers = list(self._hot.values())
+        return sum(manager.pending_changes() for manager in managers)
+
+    def checkpoint_all(self) -> int:
+        """
+        Write the changes of every hot namespace since their last checkpoint
+
+        Returns:
+            Number of rows written, -1 if any namespace failed
+        """
+        with self._lock:
+            managers = list(self._hot.values())
+        results = [manager.checkpoint() for manager in managers]
+        self._save_embeddings(managers)
+        return -1 if -1 in results else sum(results)
+
+    async def checkpoint_all_async(self) -> int:
+        """Write the changes of every hot namespace without blocking the event loop"""
+        with self._lock:
+            managers = list(self._hot.values())
+        results = await asyncio.gather(*[manager.checkpointAsync() for manager in managers if manager.pending_changes()])
+        await asyncio.to_thread(self._save_embeddings, managers)
+        return -1 if -1 in results else sum(results)
+
+    def _save_embeddings(self, managers: List[MemoryManager]) -> None:
+        """Save the vector files and ANN indexes of namespaces (otherwise only written on eviction)"""
+        for manager in managers:
+            if manager.embedding_store is not None:
+                manager.embedding_store.save()
+
+    def close(self) -> int:
+        """
+        Checkpoint every hot namespace and drop it from RAM, closing its embedding store
+
+        Returns:
+            Number of rows written, -1 if any namespace failed
+        """
+        with self._lock:
+            managers = list(self._hot.values())
+            self._hot.clear()
+            self._pins.clear()
+        results = [manager.checkpoint() for manager in managers]
+        for manager in managers:
+            self._release(manager)
+        return -1 if -1 in results else sum(results)
+
+    def save_all(self) -> bool:
+        """
+        Save every hot namespace to disk (only their changes since the last checkpoint)
+
+        Returns:
+            bool: Operation success status
+        """
+        return self.checkpoint_all() >= 0
+
+    async def save_all_async(self) -> bool:
+        """Save every hot namespace to disk without blocking the event loop"""
+        return await self.checkpoint_all_async() >= 0
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return memory store and database metrics"""
+        with self._lock:
+            hot = len(self._hot)
+            items = sum(len(manager.texts) for manager in self._hot.values())
+        return {
+            "hot_namespaces": hot,
+            "hot_items": items,
+            "db": get_memory_db(self.db_path).metrics()
+        }
+
+# Global memory store instance
+_memory_store: Optional[MemoryStore] = None
+
+def get_memory_store() -> MemoryStore:
+    """Get global memory store instance (capacity, flush and eviction settings follow config reloads)"""
+    global _memory_store
+    if _memory_store is None:
+        from utils.config_manager import get_config_manager
+
+        config_manager = get_config_manager()
+        config = config_manager.config
+        store = _memory_store = MemoryStore(
+            max_items=config.get("max_vectors", 1000),
+            embeddings_dir=config.get("embeddings_dir") or None,
+            embedding_options=dict(config),
+            eviction_policy=config.get("eviction_policy", "fifo"),
+            hit_flush_size=config.get("hit_flush_size", DEFAULT_HIT_FLUSH_SIZE)
+        )
+
+        def apply(old, new) -> None:
+            keys = ("max_vectors", "hit_flush_size", "eviction_policy", "batch_size")
+            if any(old.get(key) != new.get(key) for key in keys):
+                store.configure(
+                    max_items=new.get("max_vectors", 1000),
+                    hit_flush_size=new.get("hit_flush_size", DEFAULT_HIT_FLUSH_SIZE),
+                    eviction_policy=new.get("eviction_policy", "fifo"),
+                    batch_size=new.get("batch_size", 100)
+                )
+
+        config_manager.subscribe(apply)
+    return _memory_store
+
+# Export
+export = {
+    'MemoryManager': MemoryManager,
+    'MemoryStore': MemoryStore,
+    'get_memory_store': get_memory_store,
+    'namespace_key': namespace_key
+}
@@ -0,0 +1,295 @@
+import os
+import sys
+import json
+import asyncio
+import inspect
+import threading
+import importlib
+import importlib.util
+import weakref
+from importlib.metadata import entry_points
+from typing import Any, Callable, Dict, List, Optional
+from utils.tool_registry import ToolRegistry, ToolSpec, DEFAULT_CACHE_TTL, get_tool_registry
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+MANIFEST_FILE = "plugin.json"
+ENTRY_POINT_GROUP = "ai_assistant.plugins"
+DEFAULT_PLUGIN_DIR = "plugins"
+
+class PluginToolSpec(ToolSpec):
+    def __init__(self, manifest: Dict[str, Any], loader: Callable[[], Callable[..., Any]], plugin: str):
+        """
+        A plugin tool described by its manifest, imported on first call
+
+        Args:
+            manifest: Tool entry of the plugin manifest (name, description,
+                parameters, read_only, cacheable, dynamic, timeout,
+                max_concurrency, cache_ttl, context)
+            loader: Imports the implementation and returns the tool function
+            plugin: Plugin name
+        """
+        self.plugin = plugin
+        self.name = manifest["name"]
+        self.description = manifest.get("description", "")
+        self.read_only = bool(manifest.get("read_only", False))
+        self.cacheable = bool(manifest.get("cacheable", False))
+        self.dynamic = bool(manifest.get("dynamic", False))
+        self.timeout = manifest.get("timeout")
+        self.max_concurrency = manifest.get("max_concurrency")
+        self.cache_ttl = float(manifest.get("cache_ttl", DEFAULT_CACHE_TTL))
+        self.context_params: List[str] = list(manifest.get("context", []))
+
+        parameters = manifest.get("parameters") or {"type": "object", "properties": {}}
+        self.arguments: List[str] = list(parameters.get("properties", {}))
+        self.required: List[str] = list(parameters.get("required", []))
+        self.schema = {
+            "type": "function",
+            "function": {"name": self.name, "description": self.description, "parameters": parameters}
+        }
+
+        self.fn: Optional[Callable[..., Any]] = None
+        self._loader = loader
+        self._load_lock = threading.Lock()
+        self._semaphores: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    @property
+    def loaded(self) -> bool:
+        return self.fn is not None
+
+    def _load(self) -> Callable[..., Any]:
+        with self._load_lock:
+            if self.fn is None:
+                fn = self._loader()
+                if not inspect.iscoroutinefunction(fn):
+                    blocking = fn
+
+                    async def fn(**kwargs):
+                        return await asyncio.to_thread(blocking, **kwargs)
+
+                self.fn = fn
+                logger.info(f"Loaded plugin tool {self.name} ({self.plugin})")
+            return self.fn
+
+    async def load(self) -> Callable[..., Any]:
+        """Import the implementation on the first call (on a worker thread)"""
+        if self.fn is not None:
+            return self.fn
+        return await asyncio.to_thread(self._load)
+
+def _import_attribute(module_ref: str, attribute: str, base_dir: Optional[str], module_prefix: str) -> Callable[..., Any]:
+    """
+    Import a tool function
+
+    Args:
+        module_ref: Dotted module name, or a .py file relative to base_dir
+        attribute: Function name in the module
+        base_dir: Directory of the plugin manifest
+        module_prefix: Module name prefix for file-based plugins
+
+    Returns:
+        The function
+    """
+    if module_ref.endswith(".py"):
+        path = os.path.join(base_dir or "", module_ref)
+        module_name = f"{module_prefix}.{os.path.splitext(os.path.basename(module_ref))[0]}"
+        module = sys.modules.get(module_name)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            if spec is None or spec.loader is None:
+                raise ImportError(f"Cannot load plugin module {path}")
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            try:
+                spec.loader.exec_module(module)
+            except Exception:
+                del sys.modules[module_name]
+                raise
+    else:
+        module = importlib.import_module(module_ref)
+    return getattr(module, attribute)
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """
+    Read and check a plugin manifest
+
+    Args:
+        path: plugin.json path
+
+    Returns:
+        Manifest dictionary
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("tools"), list):
+        raise ValueError("Manifest must be an object with a 'tools' list")
+    for tool in manifest["tools"]:
+        if not isinstance(tool, dict) or not tool.get("name"):
+            raise ValueError("Every tool needs a name")
+        if not (tool.get("module") or manifest.get("module")):
+            raise ValueError(f"Tool {tool['name']} has no module")
+    return manifest
+
+def register_manifest(
+    registry: ToolRegistry,
+    manifest: Dict[str, Any],
+    base_dir: Optional[str],
+    plugin: str
+) -> List[str]:
+    """
+    Register the tools of a manifest without importing them
+
+    Tools whose names are already registered are skipped, so plugins
+    cannot replace built-in tools.
+
+    Args:
+        registry: Tool registry
+        manifest: Plugin manifest
+        base_dir: Directory of the manifest (for .py module paths)
+        plugin: Plugin name
+
+    Returns:
+        Names of the registered tools
+    """
+    registered = []
+    module_prefix = f"assistant_plugins.{plugin}"
+    for tool in manifest["tools"]:
+        name = tool["name"]
+        if registry.get(name) is not None:
+            logger.warning(f"Plugin {plugin}: tool {name} already exists, skipping it")
+            continue
+        module_ref = tool.get("module") or manifest["module"]
+        attribute = tool.get("function", name)
+        loader = lambda module_ref=module_ref, attribute=attribute: _import_attribute(module_ref, attribute, base_dir, module_prefix)
+        registry.add(PluginToolSpec(tool, loader, plugin))
+        registered.append(name)
+    return registered
+
+def discover_directory(registry: ToolRegistry, plugin_dir: str) -> Dict[str, List[str]]:
+    """
+    Register the plugins of a directory (one subdirectory with a plugin.json each)
+
+    Args:
+        registry: Tool registry
+        plugin_dir: Plugins directory
+
+    Returns:
+        {plugin: [tool names]}
+    """
+    plugins: Dict[str, List[str]] = {}
+    if not os.path.isdir(plugin_dir):
+        return plugins
+    for entry in sorted(os.scandir(plugin_dir), key=lambda entry: entry.name):
+        manifest_path = os.path.join(entry.path, MANIFEST_FILE)
+        if not entry.is_dir() or not os.path.isfile(manifest_path):
+            continue
+        try:
+            manifest = read_manifest(manifest_path)
+            plugin = manifest.get("name", entry.name)
+            plugins[plugin] = register_manifest(registry, manifest, entry.path, plugin)
+        except Exception as e:
+            logger.error(f"Invalid plugin {entry.path}: {e}")
+    return plugins
+
+def _package_dir(module_name: str) -> Optional[str]:
+    """Directory of a package, located without importing it"""
+    parts = module_name.split(".")
+    spec = importlib.util.find_spec(parts[0])
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    path = os.path.join(list(spec.submodule_search_locations)[0], *parts[1:])
+    return path if os.path.isdir(path) else None
+
+def discover_entry_points(registry: ToolRegistry, group: str = ENTRY_POINT_GROUP) -> Dict[str, List[str]]:
+    """
+    Register plugins installed as packages
+
+    An entry point in the group names a package (e.g.
+    `weather_plus = "weather_plus"`); its plugin.json is read from the
+    package directory. Modules in the manifest are dotted import paths.
+
+    Args:
+        registry: Tool registry
+        group: Entry point group
+
+    Returns:
+        {plugin: [tool names]}
+    """
+    plugins: Dict[str, List[str]] = {}
+    for entry_point in entry_points(group=group):
+        try:
+            package_dir = _package_dir(entry_point.module)
+            manifest_path = os.path.join(package_dir, MANIFEST_FILE) if package_dir else None
+            if not manifest_path or not os.path.isfile(manifest_path):
+                raise ValueError(f"No {MANIFEST_FILE} in package {entry_point.module}")
+            manifest = read_manifest(manifest_path)
+            plugins[entry_point.name] = register_manifest(registry, manifest, package_dir, entry_point.name)
+        except Exception as e:
+            logger.error(f"Invalid plugin entry point {entry_point.name}: {e}")
+    return plugins
+
+def discover_plugins(
+    registry: ToolRegistry,
+    plugin_dirs: Optional[List[str]] = None,
+    use_entry_points: bool = True
+) -> Dict[str, List[str]]:
+    """
+    Register every plugin's tools from their manifests
+
+    Only manifests are read; implementation modules are imported when a
+    tool is first called.
+
+    Args:
+        registry: Tool registry
+        plugin_dirs: Plugin directories
+        use_entry_points: Also discover installed plugin packages
+
+    Returns:
+        {plugin: [tool names]}
+    """
+    plugins: Dict[str, List[str]] = {}
+    for plugin_dir in plugin_dirs or []:
+        plugins.update(discover_directory(registry, plugin_dir))
+    if use_entry_points:
+        plugins.update(discover_entry_points(registry))
+    if plugins:
+        logger.info(f"Plugins: {', '.join(f'{name} ({len(tools)} tools)' for name, tools in plugins.items())}")
+    return plugins
+
+# Plugins of the global tool registry
+_plugins: Optional[Dict[str, List[str]]] = None
+
+def load_plugins(config: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Discover plugins into the global tool registry (once per process)
+
+    Args:
+        config: Config values (plugin_dirs, plugin_entry_points)
+
+    Returns:
+        {plugin: [tool names]}
+    """
+    global _plugins
+    if _plugins is None:
+        plugin_dirs = config.get("plugin_dirs", [DEFAULT_PLUGIN_DIR])
+        if isinstance(plugin_dirs, str):
+            plugin_dirs = [plugin_dirs]
+        _plugins = discover_plugins(
+            get_tool_registry(),
+            plugin_dirs,
+            bool(config.get("plugin_entry_points", True))
+        )
+    return _plugins
+
+# Export
+export = {
+    'PluginToolSpec': PluginToolSpec,
+    'read_manifest': read_manifest,
+    'register_manifest': register_manifest,
+    'discover_directory': discover_directory,
+    'discover_entry_points': discover_entry_points,
+    'discover_plugins': discover_plugins,
+    'load_plugins': load_plugins
+}
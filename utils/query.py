@@ -1,16 +1,139 @@
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Any
 import time
+import asyncio
+from types import SimpleNamespace
 from datetime import date, datetime
-from openai.types.chat import ChatCompletion
-from openai.types.chat.chat_completion_message import ChatCompletionMessage
-from openai.types.chat.chat_completion_message_param import ChatCompletionMessageParam
-import openai
 from utils.logger import get_logger
-from utils.config_manager import get_config_manager
-from tools import TOOLS
+from utils.config_manager import get_config
+from utils.latency import mark, current_turn
+from utils.llm_scheduler import get_llm_scheduler, INTERACTIVE, FOLLOW_UP, BACKGROUND
+from utils.tracing import span, traced, set_attribute, record_error, CLIENT
+from tools import registry as tool_registry
+
+if TYPE_CHECKING:
+    from openai.types.chat.chat_completion_message_param import ChatCompletionMessageParam
 
 logger = get_logger()
 
+# OpenAI clients by (client class, base URL, token); reusing one keeps its
+# HTTP connections alive between turns
+_clients: Dict[Any, Any] = {}
+
+def get_llm_client(api_url: str, auth_token: str):
+    """
+    Get a shared OpenAI client
+
+    Args:
+        api_url: API base URL
+        auth_token: API key
+
+    Returns:
+        openai.OpenAI client
+    """
+    import openai
+
+    key = (openai.OpenAI, api_url, auth_token)
+    client = _clients.get(key)
+    if client is None:
+        client = _clients[key] = openai.OpenAI(api_key=auth_token, base_url=api_url)
+    return client
+
+def collect_stream(stream: Any, on_token: Optional[Callable[[str], None]] = None) -> Any:
+    """
+    Assemble a streamed chat completion into the shape of a non-streamed one
+
+    Args:
+        stream: Iterable of chat completion chunks
+        on_token: Callback receiving each content fragment as it arrives
+
+    Returns:
+        Object with choices[0].message.content and .tool_calls like a ChatCompletion
+    """
+    content: List[str] = []
+    tool_calls: Dict[int, Any] = {}
+    usage = None
+    for chunk in stream:
+        usage = getattr(chunk, "usage", None) or usage  # Only sent by servers that report stream usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+
+        if getattr(delta, "content", None):
+            if not content:
+                mark("llm_first_token")
+            content.append(delta.content)
+            if on_token:
+                on_token(delta.content)
+
+        # Tool calls arrive as fragments keyed by index
+        for call in getattr(delta, "tool_calls", None) or []:
+            entry = tool_calls.get(call.index)
+            if entry is None:
+                entry = tool_calls[call.index] = SimpleNamespace(
+                    id=call.id, type="function", function=SimpleNamespace(name="", arguments="")
+                )
+            if call.id:
+                entry.id = call.id
+            if call.function is not None:
+                entry.function.name += call.function.name or ""
+                entry.function.arguments += call.function.arguments or ""
+
+    message = SimpleNamespace(
+        role="assistant",
+        content="".join(content) or None,
+        tool_calls=[tool_calls[index] for index in sorted(tool_calls)] or None
+    )
+    return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message)], usage=usage)
+
+def record_usage(response: Any) -> None:
+    """Add a response's token usage to the current turn's record (no-op outside a turn)"""
+    turn = current_turn()
+    usage = getattr(response, "usage", None)
+    if turn is None or usage is None:
+        return
+    totals = turn.attributes.setdefault("usage", {})
+    for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        value = getattr(usage, key, None)
+        if isinstance(value, int):
+            totals[key] = totals.get(key, 0) + value
+
+def add_queue_time(queue_ms: float) -> None:
+    """Add scheduler queue time to the current turn's record (no-op outside a turn)"""
+    turn = current_turn()
+    if turn is not None:
+        turn.attributes["llm_queue_ms"] = round(turn.attributes.get("llm_queue_ms", 0.0) + queue_ms, 1)
+
+async def warm_up_llm(config: Optional[Dict[str, Any]] = None, model: str = "gpt-3.5-turbo") -> bool:
+    """
+    Send a one-token request so the server loads the model and the client connects
+
+    Args:
+        config: Config values (api_url, auth_token, timeout); the current config snapshot if None
+        model: Default model name
+
+    Returns:
+        True if the request succeeded
+    """
+    config = config or get_config()
+    try:
+        api_url = config.get("api_url")
+        auth_token = config.get("auth_token")
+        if not api_url or not auth_token:
+            raise ValueError("API URL and authentication token required")
+
+        client = get_llm_client(api_url, auth_token)
+        await get_llm_scheduler().to_thread(api_url, lambda: client.chat.completions.create(
+            model=config.get("model", model),
+            messages=[{"role": "user", "content": "Hi"}],
+            max_tokens=1,
+            timeout=config.get("timeout", 30)
+        ), BACKGROUND)
+        return True
+    except Exception as e:
+        logger.warning(f"LLM warm-up failed: {e}")
+        return False
+
+@traced("llm.query")
 async def query_llm(
     prompt: str,
     answer: Optional[str] = None,
@@ -18,81 +141,131 @@ async def query_llm(
     system_ip: str = "",
     model: str = "gpt-3.5-turbo",
     memory_texts: List[str] = [],
-    config: Dict[str, Any] = {},
+    config: Optional[Dict[str, Any]] = None,
     system_prompt: str = "",
-    current_tool: Optional[str] = None
+    current_tool: Optional[str] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    priority: Optional[int] = None,
+    history: Optional[List[Dict[str, str]]] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Sends a query using OpenAI API with tool/function calling support
+
+    With on_token, the completion is streamed and on_token is called on the
+    event loop with each content fragment. Requests wait for a slot of the
+    endpoint in the LLM scheduler; priority defaults to FOLLOW_UP for tool
+    result passes and INTERACTIVE otherwise. Settings come from config, or
+    from the current config snapshot if it is None; one snapshot is used for
+    the whole request, so a reload never mixes old and new values. history
+    (earlier turns as chat messages) is sent between the system prompt and
+    the context of this turn. Each call is traced as an llm.query span
+    with llm.prompt (message assembly) and llm.request children.
     """
+    import openai  # Imported on first use: it adds most of the startup time
+
     start_time = time.time()
-    config_manager = get_config_manager()
+    config = config or get_config()
 
     try:
         # Get configuration values
-        provider = config.get("llm_provider") or config_manager.get_config("llm_provider", "openai")
-        api_url = config.get("api_url") or config_manager.get_config("api_url")
+        provider = config.get("llm_provider", "openai")
+        api_url = config.get("api_url")
         
         if not api_url:
             raise ValueError("API URL not configured")
 
         # Authentication for OpenAI
-        auth_token = config.get("auth_token") or config_manager.get_config("auth_token")
+        auth_token = config.get("auth_token")
         if not auth_token:
             raise ValueError("Authentication token required for OpenAI")
         openai.api_key = auth_token
         
         # Get other configuration values
-        temperature = float(config.get("temperature", config_manager.get_config("temperature", 0.7)))
-        model_name = config_manager.get_config("model", model)
+        temperature = float(config.get("temperature", 0.7))
+        model_name = config.get("model", model)
+        max_tokens = int(config.get("max_tokens", -1))
+
+        set_attribute("gen_ai.request.model", model_name)
+        set_attribute("llm.tool", current_tool)
 
-        # Create messages
-        messages: List[ChatCompletionMessageParam] = []
-        messages.append({"role": "system", "content": system_prompt})
+        with span("llm.prompt") as prompt_span:
+            # Create messages
+            messages: List["ChatCompletionMessageParam"] = []
+            messages.append({"role": "system", "content": system_prompt})
+            if history:
+                messages.extend(history)
         
-        # Add context
-        _datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        memory_context = "".join([f"<memory>{m}</memory>" for m in memory_texts])
-        context = f"My IP address is {system_ip} and the current time is {_datetime}.\n<memories>\n{memory_context}\n</memories>"
-        messages.append({"role": "user", "content": context})
+            # Add context
+            _datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            memory_context = "".join([f"<memory>{m}</memory>" for m in memory_texts])
+            context = f"My IP address is {system_ip} and the current time is {_datetime}.\n<memories>\n{memory_context}\n</memories>"
+            messages.append({"role": "user", "content": context})
             
-        messages.append({"role": "user", "content": prompt})
-        if answer:
-            messages.append({"role": "assistant", "content": answer})
-        if prompt2:
-            messages.append({"role": "user", "content": prompt2})
+            messages.append({"role": "user", "content": prompt})
+            if answer:
+                messages.append({"role": "assistant", "content": answer})
+            if prompt2:
+                messages.append({"role": "user", "content": prompt2})
+
+            # Schemas are built once per excluded tool and reused
+            prepared_tools = tool_registry.schemas(exclude=current_tool)
+            if prompt_span is not None:
+                prompt_span.set_attribute("messages", len(messages))
+                prompt_span.set_attribute("history.messages", len(history or []))
+                prompt_span.set_attribute("memories", len(memory_texts))
 
         # OpenAI client configuration
-        client = openai.OpenAI(
-            api_key=auth_token,
-            base_url=api_url
-        )
+        client = get_llm_client(api_url, auth_token)
 
-        prepared_tools = TOOLS
+        request = {
+            "model": model_name,
+            "messages": messages,
+            "temperature": temperature,
+            "tools": prepared_tools,
+            "tool_choice": "auto",
+            "timeout": config.get("timeout", 30)
+        }
+        if max_tokens > 0:
+            request["max_tokens"] = max_tokens
 
-        if current_tool:
-            prepared_tools = [tool for tool in TOOLS if tool["function"]["name"] != current_tool]
+        if priority is None:
+            priority = FOLLOW_UP if current_tool else INTERACTIVE
 
-        # Send query with tools/functions
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=messages,
-            temperature=temperature,
-            tools=prepared_tools,
-            tool_choice="auto"
-        )
+        # Send query with tools/functions (off the event loop, so other
+        # turns, speculative queries and speech keep running meanwhile)
+        with span("llm.request", CLIENT, **{"server.address": api_url, "llm.stream": on_token is not None}):
+            if on_token is None:
+                call = lambda: client.chat.completions.create(**request)
+            else:
+                loop = asyncio.get_running_loop()
+                emit = lambda text: loop.call_soon_threadsafe(on_token, text)
+                call = lambda: collect_stream(client.chat.completions.create(stream=True, **request), emit)
+            response, queue_ms = await get_llm_scheduler().to_thread(api_url, call, priority)
+            add_queue_time(queue_ms)
+            set_attribute("llm.queue_ms", round(queue_ms, 1))
 
+        mark("llm_tool_pass" if current_tool else "llm")
+        record_usage(response)
+        usage = getattr(response, "usage", None)
+        set_attribute("gen_ai.usage.input_tokens", getattr(usage, "prompt_tokens", None))
+        set_attribute("gen_ai.usage.output_tokens", getattr(usage, "completion_tokens", None))
         elapsed_time = round(time.time() - start_time, 2)
-        logger.info(f"LLM response time: {elapsed_time} seconds")
+        logger.info("LLM response time: %s seconds", elapsed_time, latency_ms=round(elapsed_time * 1000), model=model_name)
         
         return response
 
     except Exception as e:
+        mark("llm_error")
+        record_error(e)
         elapsed_time = round(time.time() - start_time, 2)
         logger.error(f"Error in query_llm: {e}, time: {elapsed_time} seconds")
         return None
 
 # Export
 export = {
-    "query_llm": query_llm
+    "query_llm": query_llm,
+    "warm_up_llm": warm_up_llm,
+    "get_llm_client": get_llm_client,
+    "collect_stream": collect_stream,
+    "record_usage": record_usage
 }
\ No newline at end of file
@@ -0,0 +1,369 @@
+import json
+import time
+import uuid
+import asyncio
+from typing import Any, Callable, Dict, Optional
+from aiohttp import web, WSMsgType
+from utils.assistant import Assistant
+from utils.latency import start_turn, get_latency_tracker
+from utils.llm_scheduler import get_llm_scheduler
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_IDLE_TIMEOUT = 1800
+DEFAULT_MAX_SESSIONS = 1000
+SWEEP_INTERVAL = 60
+
+class Session:
+    def __init__(self, session_id: str, user_id: Optional[str], assistant: Assistant):
+        """
+        State of one client session
+
+        Args:
+            session_id: Session identifier
+            user_id: User identifier (None for anonymous sessions)
+            assistant: Session's turn pipeline (with its own memory namespace)
+        """
+        self.id = session_id
+        self.user_id = user_id
+        self.assistant = assistant
+        self.turns = 0
+        self.created_at = time.time()
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()  # One turn at a time per session
+
+    async def respond(self, message: str, source: str = "http", **kwargs) -> Optional[str]:
+        """Run a turn, timing it in the latency tracker"""
+        async with self.lock:
+            self.last_used = time.monotonic()
+            turn = start_turn(source)
+            turn.annotate("session_id", self.id)
+            try:
+                return await self.assistant.respond(message, **kwargs)
+            finally:
+                self.turns += 1
+                self.last_used = time.monotonic()
+                turn.finish("response")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.id,
+            "user_id": self.user_id,
+            "memory_namespace": self.assistant.memory_manager.namespace,
+            "turns": self.turns,
+            "created_at": self.created_at
+        }
+
+class SessionManager:
+    def __init__(
+        self,
+        assistant: Assistant,
+        memory_store: Any,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_sessions: int = DEFAULT_MAX_SESSIONS
+    ):
+        """
+        Sessions with isolated state over shared resources
+
+        Every session gets its own Assistant (spawned from a template) and
+        memory namespace ("<user>:<session>"). Config, the public IP, the
+        memory store and its database pools and the LLM client are shared.
+
+        Args:
+            assistant: Template assistant holding the config source, system prompt and public IP
+            memory_store: Shared MemoryStore
+            idle_timeout: Seconds after which an unused session is closed
+            max_sessions: Maximum open sessions (the least recently used idle one is closed)
+        """
+        self.assistant = assistant
+        self.memory_store = memory_store
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max(1, max_sessions)
+        self.sessions: Dict[str, Session] = {}
+        self._opening: Dict[str, "asyncio.Task[Session]"] = {}  # Sessions being created, shared by concurrent requests
+
+    async def get(self, session_id: Optional[str] = None, user_id: Optional[str] = None) -> Session:
+        """
+        Return a session, creating it if needed
+
+        Args:
+            session_id: Existing or new session id (generated if None)
+            user_id: User owning the session
+
+        Returns:
+            The session
+
+        Raises:
+            PermissionError: If the session belongs to another user
+        """
+        session_id = session_id or uuid.uuid4().hex
+        session = self.sessions.get(session_id)
+        if session is None:
+            task = self._opening.get(session_id)
+            if task is None:
+                task = self._opening[session_id] = asyncio.ensure_future(self._open(session_id, user_id))
+                task.add_done_callback(lambda _: self._opening.pop(session_id, None))
+            session = await asyncio.shield(task)
+
+        if session.user_id != (user_id or None):
+            raise PermissionError(f"Session '{session_id}' belongs to another user")
+        session.last_used = time.monotonic()
+        return session
+
+    async def _open(self, session_id: str, user_id: Optional[str]) -> Session:
+        """Create a session, pinning its memory namespace while it is open"""
+        memory = await self.memory_store.get_async(user_id=user_id or "anonymous", session_id=session_id, pin=True)
+        session = self.sessions[session_id] = Session(session_id, user_id or None, self.assistant.spawn(memory))
+
+        if len(self.sessions) > self.max_sessions:
+            # Sessions mid-turn are kept; their turn may still write to memory
+            idle = [item for item in self.sessions.values() if item is not session and not item.lock.locked()]
+            if idle:
+                await self.close(min(idle, key=lambda item: item.last_used).id)
+            else:
+                logger.warning(f"{len(self.sessions)} sessions open, all busy; none closed")
+        return session
+
+    async def close(self, session_id: str) -> bool:
+        """
+        Close a session, writing its memory changes
+
+        Args:
+            session_id: Session id
+
+        Returns:
+            True if the session existed
+        """
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        memory = session.assistant.memory_manager
+        try:
+            await memory.checkpointAsync()
+        finally:
+            self.memory_store.unpin(memory.namespace)
+        return True
+
+    async def sweep(self) -> int:
+        """Close sessions idle for longer than idle_timeout"""
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = [
+            session.id for session in self.sessions.values()
+            if session.last_used < cutoff and not session.lock.locked()
+        ]
+        for session_id in expired:
+            await self.close(session_id)
+        return len(expired)
+
+    async def close_all(self) -> None:
+        for session_id in list(self.sessions):
+            await self.close(session_id)
+
+def _json_error(status: int, message: str) -> web.Response:
+    return web.json_response({"error": message}, status=status)
+
+def create_app(sessions: SessionManager, auth_token: Optional[str] = None) -> web.Application:
+    """
+    Build the aiohttp application
+
+    Routes:
+        GET    /api/health                 Status, open sessions, latency and LLM queue metrics
+        POST   /api/sessions               Create a session {"user_id"?, "session_id"?}
+        DELETE /api/sessions/{session_id}  Close a session
+        POST   /api/chat                   One turn {"message", "session_id"?, "user_id"?}
+        GET    /ws                         WebSocket turns with streamed tokens and tool events
+
+    Args:
+        sessions: Session manager
+        auth_token: Bearer token required on every request (None to disable)
+
+    Returns:
+        The application
+    """
+    @web.middleware
+    async def authenticate(request: web.Request, handler: Callable) -> web.StreamResponse:
+        if auth_token and request.headers.get("Authorization") != f"Bearer {auth_token}":
+            return _json_error(401, "Unauthorized")
+        return await handler(request)
+
+    async def read_json(request: web.Request) -> Dict[str, Any]:
+        if not request.can_read_body:
+            return {}
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text=json.dumps({"error": "Invalid JSON"}), content_type="application/json")
+        return body if isinstance(body, dict) else {}
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "ok",
+            "sessions": len(sessions.sessions),
+            "latency": get_latency_tracker().summary(),
+            "llm_scheduler": get_llm_scheduler().metrics()
+        })
+
+    async def create_session(request: web.Request) -> web.Response:
+        body = await read_json(request)
+        try:
+            session = await sessions.get(body.get("session_id"), body.get("user_id"))
+        except PermissionError as e:
+            return _json_error(403, str(e))
+        return web.json_response(session.to_dict(), status=201)
+
+    async def delete_session(request: web.Request) -> web.Response:
+        if not await sessions.close(request.match_info["session_id"]):
+            return _json_error(404, "Unknown session")
+        return web.json_response({"closed": True})
+
+    async def chat(request: web.Request) -> web.Response:
+        body = await read_json(request)
+        message = str(body.get("message") or "").strip()
+        if not message:
+            return _json_error(400, "Missing message")
+
+        try:
+            session = await sessions.get(body.get("session_id"), body.get("user_id"))
+        except PermissionError as e:
+            return _json_error(403, str(e))
+        started_at = time.perf_counter()
+        response = await session.respond(message)
+        if response is None:
+            return _json_error(502, "Failed to get response from AI")
+        return web.json_response({
+            "session_id": session.id,
+            "response": response,
+            "latency_ms": round((time.perf_counter() - started_at) * 1000, 1)
+        })
+
+    async def websocket(request: web.Request) -> web.StreamResponse:
+        try:
+            session = await sessions.get(request.query.get("session_id"), request.query.get("user_id"))
+        except PermissionError as e:
+            return _json_error(403, str(e))
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        await ws.send_json({"type": "session", **session.to_dict()})
+
+        # Token and tool events are sent in order by one task, even when the socket applies backpressure
+        events: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+        async def sender() -> None:
+            while True:
+                event = await events.get()
+                try:
+                    if not ws.closed:
+                        await ws.send_json(event)
+                except Exception as e:
+                    logger.error(f"WebSocket send error: {e}")
+                finally:
+                    events.task_done()
+
+        sender_task = asyncio.ensure_future(sender())
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    if msg.type == WSMsgType.ERROR:
+                        logger.error(f"WebSocket error: {ws.exception()}")
+                    continue
+
+                try:
+                    data = json.loads(msg.data)
+                    message = str(data.get("message") or "").strip() if isinstance(data, dict) else ""
+                except ValueError:
+                    message = msg.data.strip()
+                if not message:
+                    await ws.send_json({"type": "error", "error": "Missing message"})
+                    continue
+
+                try:
+                    response = await session.respond(
+                        message,
+                        source="ws",
+                        on_token=lambda text: events.put_nowait({"type": "token", "text": text}),
+                        on_event=events.put_nowait
+                    )
+                except Exception as e:
+                    logger.error(f"WebSocket turn error: {e}")
+                    response = None
+
+                await events.join()  # Every token/tool event goes out before the final message
+                if response is None:
+                    await ws.send_json({"type": "error", "error": "Failed to get response from AI"})
+                else:
+                    await ws.send_json({"type": "done", "response": response})
+        finally:
+            sender_task.cancel()
+
+        return ws
+
+    async def sweep_sessions(app: web.Application):
+        async def sweep():
+            while True:
+                await asyncio.sleep(SWEEP_INTERVAL)
+                try:
+                    closed = await sessions.sweep()
+                    if closed:
+                        logger.info(f"Closed {closed} idle sessions")
+                except Exception as e:
+                    logger.error(f"Session sweep error: {e}")
+
+        task = asyncio.ensure_future(sweep())
+        yield
+        task.cancel()
+        await sessions.close_all()
+
+    app = web.Application(middlewares=[authenticate])
+    app.router.add_get("/api/health", health)
+    app.router.add_post("/api/sessions", create_session)
+    app.router.add_delete("/api/sessions/{session_id}", delete_session)
+    app.router.add_post("/api/chat", chat)
+    app.router.add_get("/ws", websocket)
+    app.cleanup_ctx.append(sweep_sessions)
+    return app
+
+async def serve(
+    assistant: Assistant,
+    memory_store: Any,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT
+) -> None:
+    """
+    Run the server until cancelled
+
+    Args:
+        assistant: Template assistant holding the shared config source and system prompt
+        memory_store: Shared MemoryStore
+        host: Interface to listen on
+        port: Port to listen on
+    """
+    config = assistant.config
+    sessions = SessionManager(
+        assistant,
+        memory_store,
+        idle_timeout=float(config.get("session_idle_timeout", DEFAULT_IDLE_TIMEOUT)),
+        max_sessions=int(config.get("max_sessions", DEFAULT_MAX_SESSIONS))
+    )
+    await assistant.init_system()
+
+    runner = web.AppRunner(create_app(sessions, config.get("server_token") or None))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    print(f"Assistant server listening on http://{host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+# Export
+export = {
+    'Session': Session,
+    'SessionManager': SessionManager,
+    'create_app': create_app,
+    'serve': serve
+}
@@ -0,0 +1,153 @@
+import re
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+NORMALIZE_PATTERN = re.compile(r"[^\w\s]")
+
+def normalize_transcript(text: str) -> str:
+    """
+    Normalize a transcript for comparison
+
+    Partial and final transcripts often differ only in casing and
+    punctuation, which do not change the request.
+
+    Args:
+        text: Transcript
+
+    Returns:
+        Lowercase words separated by single spaces
+    """
+    return " ".join(NORMALIZE_PATTERN.sub(" ", (text or "").lower()).split())
+
+class SpeculativeQuery:
+    def __init__(
+        self,
+        run: Callable[[str], Awaitable[Any]],
+        min_words: int = 3,
+        debounce: float = 0.0,
+        speculate: Optional[Callable[[str], Awaitable[Any]]] = None
+    ):
+        """
+        Speculatively start a query from stable partial transcripts
+
+        on_partial() starts speculate(partial) in the background while the
+        user is still finishing the utterance, once the partial has been
+        unchanged for debounce seconds. resolve(final) keeps that in-flight
+        result when the final transcript matches the partial, and otherwise
+        cancels it and runs the query for the final transcript. Either way
+        the query has been made, so a None result counts as a failure
+        rather than a reason for the caller to query again.
+
+        Cancelling a started query does not stop its LLM request, which
+        keeps its scheduler slot until it ends: debounce keeps a fast stream
+        of partials from starting one request each, and speculate should
+        queue behind final queries (e.g. at FOLLOW_UP priority).
+
+        run must be free of side effects (e.g. the LLM request only, not
+        tool execution), since speculative results may be discarded.
+
+        Args:
+            run: Coroutine function producing the result for a transcript
+            min_words: Minimum words in a partial before speculating
+            debounce: Seconds a partial must stay unchanged before its query starts
+            speculate: Coroutine function used for partials (run by default)
+        """
+        self.run = run
+        self.speculate = speculate or run
+        self.min_words = max(1, min_words)
+        self.debounce = max(0.0, debounce)
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self._key: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._launched = False  # The query of _task has started (debounce elapsed)
+
+    def on_partial(self, text: str) -> None:
+        """
+        Speculate on a stabilized partial transcript (call on the event loop)
+
+        Args:
+            text: Partial transcript
+        """
+        key = normalize_transcript(text)
+        if key == self._key or len(key.split()) < self.min_words:
+            return
+
+        self.cancel()
+        self._key = key
+        if self.debounce > 0:
+            self._task = asyncio.get_running_loop().create_task(self._debounced(text))
+        else:
+            self._task = asyncio.get_running_loop().create_task(self.speculate(text))
+            self._launch(text)
+
+    async def _debounced(self, text: str) -> Any:
+        """Start the query unless a newer partial or the final transcript arrives first"""
+        await asyncio.sleep(self.debounce)
+        self._launch(text)
+        return await self.speculate(text)
+
+    def _launch(self, text: str) -> None:
+        self._launched = True
+        self.started += 1
+        logger.debug(f"Speculative query started: {text}")
+
+    async def resolve(self, text: str) -> Any:
+        """
+        Get the result for the final transcript
+
+        Args:
+            text: Final transcript
+
+        Returns:
+            The speculative result if it matches, otherwise a fresh result
+            (None if the query failed, counted in failures)
+        """
+        task, key, launched = self._task, self._key, self._launched
+        self._task, self._key, self._launched = None, None, False
+
+        # A match still waiting out its debounce is not worth waiting for
+        if task is not None and launched and key == normalize_transcript(text):
+            try:
+                result = await task
+                self.hits += 1
+                logger.info("Speculative query matched the final transcript")
+                return self._checked(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Speculative query error: {e}")
+
+        if task is not None:
+            task.cancel()
+            if launched:
+                self.misses += 1
+        return self._checked(await self.run(text))
+
+    def _checked(self, result: Any) -> Any:
+        if result is None:
+            self.failures += 1
+        return result
+
+    def cancel(self) -> None:
+        """Drop the in-flight speculative query"""
+        if self._task is not None:
+            self._task.cancel()
+            if self._launched:
+                self.misses += 1
+        self._task, self._key, self._launched = None, None, False
+
+    def metrics(self) -> Dict[str, int]:
+        return {"started": self.started, "hits": self.hits, "misses": self.misses, "failures": self.failures}
+
+# Export
+export = {
+    'SpeculativeQuery': SpeculativeQuery,
+    'normalize_transcript': normalize_transcript
+}
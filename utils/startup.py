@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import asyncio
+import inspect
+import aiohttp
+from typing import Any, Callable, Dict, List, Optional
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+IP_CACHE_FILE = "ip_cache.json"
+IP_LOOKUP_URL = "https://api.ipify.org"
+DEFAULT_IP_TTL = 3600
+DEFAULT_IP_TIMEOUT = 5
+
+async def get_public_ip(
+    cache_path: str = IP_CACHE_FILE,
+    ttl: float = DEFAULT_IP_TTL,
+    timeout: float = DEFAULT_IP_TIMEOUT
+) -> str:
+    """
+    Public IP address, cached on disk
+
+    Args:
+        cache_path: Cache file path
+        ttl: Seconds a cached address stays valid (0 disables the cache)
+        timeout: HTTP timeout of the lookup in seconds
+
+    Returns:
+        The IP address, a stale cached one if the lookup fails, or "unknown"
+    """
+    cached = None
+    if ttl > 0:
+        try:
+            with open(cache_path, "r") as file:
+                cached = json.load(file)
+            if time.time() - cached["fetched_at"] < ttl:
+                return cached["ip"]
+        except (OSError, ValueError, KeyError, TypeError):
+            cached = None
+
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            async with session.get(IP_LOOKUP_URL) as response:
+                response.raise_for_status()
+                ip = (await response.text()).strip()
+    except Exception as e:
+        logger.warning(f"Error getting IP: {e}")
+        return cached["ip"] if cached else "unknown"
+
+    if ttl > 0:
+        try:
+            with open(cache_path, "w") as file:
+                json.dump({"ip": ip, "fetched_at": time.time()}, file)
+        except OSError as e:
+            logger.error(f"Error writing IP cache: {e}")
+    return ip
+
+class StartupOrchestrator:
+    def __init__(self):
+        """
+        Run startup warm-ups concurrently and record a timeline
+
+        Coroutine functions run on the event loop and plain functions on
+        worker threads. Steps can be added while others are running.
+        """
+        self.started_at = time.perf_counter()
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def add(self, name: str, fn: Callable[[], Any]) -> asyncio.Task:
+        """
+        Start a warm-up step
+
+        Args:
+            name: Step name shown in the timeline
+            fn: Coroutine function or blocking function to run
+
+        Returns:
+            Task resolving to the step's result
+        """
+        task = asyncio.get_running_loop().create_task(self._run_step(name, fn))
+        self._tasks[name] = task
+        return task
+
+    async def _run_step(self, name: str, fn: Callable[[], Any]) -> Any:
+        step = self.steps[name] = {"start_ms": self._elapsed_ms(), "status": "running"}
+        try:
+            if asyncio.iscoroutinefunction(fn):
+                result = await fn()
+            else:
+                result = await asyncio.to_thread(fn)
+                if inspect.isawaitable(result):
+                    result = await result
+            step["status"] = "ok" if result is not False else "failed"
+            return result
+        except Exception as e:
+            step["status"] = "error"
+            step["error"] = str(e)
+            logger.error(f"Startup step {name} failed: {e}")
+            return None
+        finally:
+            step["end_ms"] = self._elapsed_ms()
+            step["duration_ms"] = round(step["end_ms"] - step["start_ms"], 1)
+
+    def _elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started_at) * 1000, 1)
+
+    async def wait(self, *names: str, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for steps to finish
+
+        Args:
+            *names: Steps to wait for (all if none given)
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if they all finished in time
+        """
+        tasks = [self._tasks[name] for name in names if name in self._tasks] if names else list(self._tasks.values())
+        if not tasks:
+            return True
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        return not pending
+
+    def done(self) -> bool:
+        return all(task.done() for task in self._tasks.values())
+
+    def timeline(self) -> List[Dict[str, Any]]:
+        """Steps ordered by start time"""
+        return [
+            {"name": name, **step}
+            for name, step in sorted(self.steps.items(), key=lambda item: item[1]["start_ms"])
+        ]
+
+    def format_timeline(self, width: int = 40) -> str:
+        """Timeline as text bars"""
+        timeline = self.timeline()
+        if not timeline:
+            return "No startup steps."
+
+        end = max(step.get("end_ms", self._elapsed_ms()) for step in timeline) or 1.0
+        lines = []
+        for step in timeline:
+            step_end = step.get("end_ms", self._elapsed_ms())
+            left = int(step["start_ms"] / end * width)
+            bar = "#" * max(1, int(step_end / end * width) - left)
+            lines.append(
+                f"{step['name']:<10}|{' ' * left}{bar:<{width - left}}| "
+                f"{step_end - step['start_ms']:>8.1f} ms {step['status']}"
+            )
+        lines.append(f"{'ready':<10} {end:.1f} ms after start")
+        return "\n".join(lines)
+
+# Export
+export = {
+    'StartupOrchestrator': StartupOrchestrator,
+    'get_public_ip': get_public_ip
+}
@@ -0,0 +1,168 @@
+import time
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Optional
+from utils.logger import get_logger
+
+logger = get_logger()
+
+class SpeechToTextService:
+    def __init__(
+        self,
+        model: str = "base",
+        wake_words: str = "jarvis",
+        language: str = "en",
+        input_device_index: Optional[int] = None,
+        on_wakeword: Optional[Callable[[], None]] = None,
+        on_partial: Optional[Callable[[str], None]] = None,
+        recorder_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Long-lived speech-to-text service
+
+        The Whisper model and wake-word engine are loaded once, on a
+        dedicated thread, which then keeps listening and pushes final
+        transcripts onto an asyncio queue.
+
+        Args:
+            model: Whisper model type
+            wake_words: Comma separated wake words
+            language: Transcription language
+            input_device_index: Microphone index (None for the default device)
+            on_wakeword: Callback run (on the listener thread) when a wake word is detected
+            on_partial: Callback run on the event loop with each stabilized partial
+                transcript; setting it enables realtime transcription
+            recorder_options: Extra AudioToTextRecorder keyword arguments
+        """
+        self.model = model
+        self.wake_words = wake_words
+        self.language = language
+        self.input_device_index = input_device_index
+        self.on_wakeword = on_wakeword
+        self.on_partial = on_partial
+        self.recorder_options = dict(recorder_options or {})
+        self.recorder = None
+        self.ready = threading.Event()
+        self.transcripts: Optional[asyncio.Queue] = None
+        self.last_timings: Dict[str, float] = {}
+        self._wakeword_at: Optional[float] = None
+        self._recording_stop_at: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> asyncio.Queue:
+        """
+        Start the listener thread
+
+        Args:
+            loop: Event loop that consumes the transcripts (defaults to the running loop)
+
+        Returns:
+            Queue receiving (final transcript, timings) pairs
+        """
+        if self._thread is not None:
+            return self.transcripts
+
+        self._loop = loop or asyncio.get_running_loop()
+        self.transcripts = asyncio.Queue()
+        self._thread = threading.Thread(target=self._run, name="stt-listener", daemon=True)
+        self._thread.start()
+        return self.transcripts
+
+    def _create_recorder(self):
+        """Load the recorder (Whisper model and wake-word engine)"""
+        from RealtimeSTT import AudioToTextRecorder
+
+        options = {
+            "model": self.model,
+            "wake_words": self.wake_words,
+            "language": self.language,
+            "on_wakeword_detected": self._wakeword_detected,
+            "on_recording_stop": self._recording_stopped
+        }
+        if self.input_device_index is not None:
+            options["input_device_index"] = self.input_device_index
+        if self.on_partial is not None:
+            options["enable_realtime_transcription"] = True
+            options["on_realtime_transcription_stabilized"] = self._partial_transcript
+        options.update(self.recorder_options)
+        return AudioToTextRecorder(**options)
+
+    def _wakeword_detected(self) -> None:
+        self._wakeword_at = time.perf_counter()
+        if self.on_wakeword:
+            try:
+                self.on_wakeword()
+            except Exception as e:
+                logger.error(f"Wake word callback error: {e}")
+
+    def _recording_stopped(self) -> None:
+        self._recording_stop_at = time.perf_counter()
+
+    def _partial_transcript(self, text: str) -> None:
+        """Hand a stabilized partial transcript to the event loop"""
+        text = (text or "").strip()
+        if text and self.on_partial and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.on_partial, text)
+
+    def _publish(self, text: str) -> None:
+        """Hand a transcript and its stage timestamps (time.perf_counter()) to the event loop"""
+        timings = {"final": time.perf_counter()}
+        if self._wakeword_at is not None:
+            timings["wakeword"] = self._wakeword_at
+        if self._recording_stop_at is not None:
+            timings["recording_stop"] = self._recording_stop_at
+        self._wakeword_at = self._recording_stop_at = None
+
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.transcripts.put_nowait, (text, timings))
+
+    def _run(self) -> None:
+        """Listener thread: load the model once, then transcribe utterances forever"""
+        try:
+            self.recorder = self._create_recorder()
+            logger.info("Speech-to-text model loaded")
+        except Exception as e:
+            logger.error(f"Speech-to-text initialization error: {e}")
+            return
+        finally:
+            self.ready.set()
+
+        while not self._stop.is_set():
+            try:
+                text = self.recorder.text()
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                logger.error(f"Speech-to-text error: {e}")
+                continue
+
+            text = (text or "").strip()
+            if text and not self._stop.is_set():
+                self._publish(text)
+
+    async def get(self) -> str:
+        """Wait for the next final transcript (its timings are left in last_timings)"""
+        if self.transcripts is None:
+            self.start()
+        text, self.last_timings = await self.transcripts.get()
+        return text
+
+    def stop(self) -> None:
+        """Stop listening and release the recorder"""
+        self._stop.set()
+        if self.recorder is not None:
+            try:
+                self.recorder.abort()
+                self.recorder.shutdown()
+            except Exception as e:
+                logger.error(f"Speech-to-text shutdown error: {e}")
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+# Export
+export = {
+    'SpeechToTextService': SpeechToTextService
+}
@@ -0,0 +1,324 @@
+import re
+import json
+import time
+import asyncio
+import inspect
+import weakref
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, Union, get_args, get_origin, get_type_hints
+from utils.tracing import set_attribute, record_error
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+DEFAULT_CACHE_TTL = 300
+CACHE_MAX_ITEMS = 256
+
+# JSON schema types of annotations
+JSON_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    dict: "object"
+}
+
+class ToolError(Exception):
+    """Raised by a tool to report a failure; the message is its result and is never cached"""
+    pass
+
+def parse_docstring(doc: Optional[str]) -> Tuple[str, Dict[str, str]]:
+    """
+    Split a docstring into its summary and its Args descriptions
+
+    Args:
+        doc: Docstring in this repo's format (summary, then an "Args:" block)
+
+    Returns:
+        Tuple of (summary, {argument: description})
+    """
+    lines = inspect.cleandoc(doc or "").splitlines()
+    summary = lines[0].strip() if lines else ""
+    args: Dict[str, str] = {}
+    in_args = False
+    current = None
+    for line in lines[1:]:
+        stripped = line.strip()
+        if stripped in ("Args:", "Arguments:"):
+            in_args = True
+            continue
+        if not in_args:
+            continue
+        if stripped.endswith(":") and not line.startswith(" "):
+            break  # Returns:, Raises:, ...
+        match = re.match(r"^\s+(\w+)(?:\s*\([^)]*\))?:\s*(.*)$", line)
+        if match:
+            current = match.group(1)
+            args[current] = match.group(2).strip()
+        elif stripped and current:
+            args[current] += " " + stripped
+    return summary, args
+
+def json_schema(annotation: Any) -> Tuple[Dict[str, Any], bool]:
+    """
+    JSON schema of a type annotation
+
+    Args:
+        annotation: Parameter annotation
+
+    Returns:
+        Tuple of (schema, optional) where optional is True for Optional[...]
+    """
+    origin = get_origin(annotation)
+    if origin is Union:
+        members = [arg for arg in get_args(annotation) if arg is not type(None)]
+        schema, _ = json_schema(members[0]) if len(members) == 1 else ({}, False)
+        return schema, type(None) in get_args(annotation)
+    if origin is Literal:
+        values = list(get_args(annotation))
+        return {"type": JSON_TYPES.get(type(values[0]), "string"), "enum": values}, False
+    if origin in (list, List):
+        item_args = get_args(annotation)
+        schema: Dict[str, Any] = {"type": "array"}
+        if item_args:
+            schema["items"] = json_schema(item_args[0])[0]
+        return schema, False
+    if origin is dict:
+        return {"type": "object"}, False
+    if annotation in JSON_TYPES:
+        return {"type": JSON_TYPES[annotation]}, False
+    return {}, False
+
+class ToolSpec:
+    def __init__(
+        self,
+        fn: Callable[..., Any],
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        read_only: bool = False,
+        cacheable: bool = False,
+        dynamic: bool = False,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        cache_ttl: float = DEFAULT_CACHE_TTL
+    ):
+        """
+        A registered tool and its scheduling metadata
+
+        Positional parameters become the tool's JSON schema (types from the
+        annotations, descriptions from the docstring's Args block); required
+        unless they have a default. Keyword-only parameters are not shown to
+        the LLM: they are filled from the turn context by name.
+
+        Args:
+            fn: Async function implementing the tool
+            name: Tool name (defaults to the function name)
+            description: Tool description (defaults to the docstring summary)
+            read_only: No side effects, so it may run concurrently with other read-only calls
+            cacheable: Results may be reused for identical arguments and context within
+                cache_ttl (failures raised as ToolError are not cached)
+            dynamic: The result is passed back through the LLM to phrase the answer
+            timeout: Seconds before the call is abandoned (None for no limit)
+            max_concurrency: Calls of this tool running at once (None for no limit)
+            cache_ttl: Seconds a cached result stays valid
+        """
+        self.fn = fn
+        self.name = name or fn.__name__
+        self.read_only = read_only
+        self.cacheable = cacheable
+        self.dynamic = dynamic
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.cache_ttl = cache_ttl
+
+        summary, arg_docs = parse_docstring(fn.__doc__)
+        self.description = description or summary
+        hints = get_type_hints(fn, include_extras=False)
+        properties: Dict[str, Any] = {}
+        required: List[str] = []
+        self.arguments: List[str] = []
+        self.context_params: List[str] = []
+        for param in inspect.signature(fn).parameters.values():
+            if param.kind == param.KEYWORD_ONLY:
+                self.context_params.append(param.name)
+                continue
+            schema, optional = json_schema(hints.get(param.name, str))
+            if arg_docs.get(param.name):
+                schema["description"] = arg_docs[param.name]
+            properties[param.name] = schema
+            self.arguments.append(param.name)
+            if param.default is param.empty and not optional:
+                required.append(param.name)
+
+        # Built once; every query reuses the same object
+        self.schema = {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": {"type": "object", "properties": properties, "required": required}
+            }
+        }
+        self.required = required
+        self._semaphores: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    async def load(self) -> Callable[..., Any]:
+        """The tool's function (plugin tools import their module here, on first use)"""
+        return self.fn
+
+    def semaphore(self) -> Optional[asyncio.Semaphore]:
+        """Concurrency limiter of the running event loop (None if unlimited)"""
+        if not self.max_concurrency:
+            return None
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+class ToolRegistry:
+    def __init__(self):
+        """
+        Tools by name, with their schemas and scheduling metadata
+
+        Register a tool with the tool() decorator; dispatch is a dict lookup.
+        """
+        self._tools: Dict[str, ToolSpec] = {}
+        self._schemas: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        self._cache: Dict[Tuple[str, str], Tuple[float, str]] = {}
+
+    def tool(self, fn: Optional[Callable[..., Any]] = None, **metadata) -> Any:
+        """
+        Decorator registering an async function as a tool
+
+        Usable bare (@registry.tool) or with ToolSpec metadata
+        (@registry.tool(read_only=True, timeout=10)).
+        """
+        def register(fn: Callable[..., Any]) -> Callable[..., Any]:
+            self.add(ToolSpec(fn, **metadata))
+            return fn
+        return register(fn) if fn is not None else register
+
+    def add(self, spec: ToolSpec) -> None:
+        if spec.name in self._tools:
+            logger.warning(f"Tool {spec.name} registered twice, replacing it")
+        self._tools[spec.name] = spec
+        self._schemas.clear()
+
+    def remove(self, name: str) -> bool:
+        self._schemas.clear()
+        return self._tools.pop(name, None) is not None
+
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self._tools.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def dynamic_tools(self) -> List[str]:
+        """Names of the tools whose results are passed back through the LLM"""
+        return [name for name, spec in self._tools.items() if spec.dynamic]
+
+    def schemas(self, exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Tool schemas sent to the LLM
+
+        Args:
+            exclude: Tool to leave out (the one whose result is being processed)
+
+        Returns:
+            List of schemas, built once per exclude value and then reused
+        """
+        schemas = self._schemas.get(exclude)
+        if schemas is None:
+            schemas = self._schemas[exclude] = [
+                spec.schema for name, spec in self._tools.items() if name != exclude
+            ]
+        return schemas
+
+    async def call(self, name: str, arguments: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Run a tool, applying its cache, concurrency limit and timeout
+
+        Args:
+            name: Tool name
+            arguments: Arguments from the LLM
+            context: Turn context; keyword-only tool parameters are read from it
+
+        Returns:
+            The tool result, or an error message
+        """
+        spec = self._tools.get(name)
+        if spec is None:
+            return f"Unknown tool: {name}"
+
+        missing = [arg for arg in spec.required if arg not in arguments]
+        if missing:
+            return f"Missing arguments for {name}: {', '.join(missing)}"
+        kwargs = {arg: value for arg, value in arguments.items() if arg in spec.arguments}
+        context = context or {}
+        kwargs.update({param: context.get(param) for param in spec.context_params})
+
+        cache_key = None
+        if spec.cacheable:
+            # Context values are part of the key, so e.g. a reloaded API key is not served stale results
+            cache_key = (name, json.dumps(kwargs, sort_keys=True, default=str))
+            cached = self._cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < spec.cache_ttl:
+                set_attribute("tool.cached", True)
+                return cached[1]
+
+        try:
+            fn = await spec.load()
+        except Exception as e:
+            logger.error(f"Tool {name} failed to load: {e}")
+            record_error(e)
+            return f"Tool {name} is unavailable: {str(e)}"
+
+        semaphore = spec.semaphore()
+        started_at = time.perf_counter()
+        try:
+            if semaphore is not None:
+                async with semaphore:
+                    result = await asyncio.wait_for(fn(**kwargs), spec.timeout)
+            else:
+                result = await asyncio.wait_for(fn(**kwargs), spec.timeout)
+        except asyncio.TimeoutError:
+            logger.error("Tool %s timed out after %s seconds", name, spec.timeout, tool=name)
+            record_error(f"Timed out after {spec.timeout} seconds")
+            return f"Tool {name} timed out"
+        except ToolError as e:
+            record_error(e)
+            return str(e)
+        logger.debug("Tool %s finished", name, tool=name, latency_ms=round((time.perf_counter() - started_at) * 1000, 1))
+
+        result = result if isinstance(result, str) else json.dumps(result, default=str)
+        if cache_key is not None:
+            if len(self._cache) >= CACHE_MAX_ITEMS:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[cache_key] = (time.monotonic(), result)
+        return result
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+# Global tool registry
+_tool_registry: Optional[ToolRegistry] = None
+
+def get_tool_registry() -> ToolRegistry:
+    """Get global tool registry instance (the built-in tools are registered by tools.py)"""
+    global _tool_registry
+    if _tool_registry is None:
+        _tool_registry = ToolRegistry()
+    return _tool_registry
+
+# Export
+export = {
+    'ToolError': ToolError,
+    'ToolSpec': ToolSpec,
+    'ToolRegistry': ToolRegistry,
+    'get_tool_registry': get_tool_registry,
+    'parse_docstring': parse_docstring,
+    'json_schema': json_schema
+}
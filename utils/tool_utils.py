@@ -8,6 +8,9 @@ import os
 from functools import lru_cache
 from aiohttp import ClientTimeout
 from utils.logger import get_logger
+from utils.memory_manager import get_memory_store
+from utils.tracing import http_trace_config
+from utils.tool_registry import ToolError
 import asyncio
 
 logger = get_logger()
@@ -76,9 +79,12 @@ async def search_wikipedia(query: str) -> str:
     
     Returns:
         Search results in JSON format
+
+    Raises:
+        ToolError: When the search fails (results with an "error" field)
     """
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(trace_configs=[http_trace_config()]) as session:
             wiki_params = {
                 "action": "query",
                 "format": "json",
@@ -110,12 +116,12 @@ async def search_wikipedia(query: str) -> str:
             
     except Exception as e:
         logger.error(f"Wikipedia search error: {e}")
-        return json.dumps({
+        raise ToolError(json.dumps({
             'query': query,
             'results': [],
             'total': 0,
             'error': str(e)
-        })
+        }))
 
 async def parse_feed_item(item: ET.Element) -> Optional[Dict[str, str]]:
     """Parse RSS feed item"""
@@ -165,12 +171,15 @@ async def get_weather(city: str, api_key: Optional[str]) -> str:
     
     Returns:
         Weather information in JSON format
+
+    Raises:
+        ToolError: When the key is missing or the request fails
     """
     if not api_key:
-        return "Weather API key not configured"
+        raise ToolError("Weather API key not configured")
         
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(trace_configs=[http_trace_config()]) as session:
             params = {
                 "q": city,
                 "appid": api_key,
@@ -207,7 +216,7 @@ async def get_weather(city: str, api_key: Optional[str]) -> str:
             
     except Exception as e:
         logger.error(f"Weather API error: {e}")
-        return f"Error getting weather data: {str(e)}"
+        raise ToolError(f"Error getting weather data: {str(e)}")
 
 async def get_news(query: str, api_key: Optional[str]) -> str:
     """
@@ -219,12 +228,15 @@ async def get_news(query: str, api_key: Optional[str]) -> str:
     
     Returns:
         News data in JSON format
+
+    Raises:
+        ToolError: When the key is missing or the request fails
     """
     if not api_key:
-        return "News API key not configured"
+        raise ToolError("News API key not configured")
         
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(trace_configs=[http_trace_config()]) as session:
             params = {
                 "q": query,
                 "apiKey": api_key,
@@ -241,25 +253,26 @@ async def get_news(query: str, api_key: Optional[str]) -> str:
             
     except Exception as e:
         logger.error(f"News API error: {e}")
-        return f"Error getting news data: {str(e)}"
+        raise ToolError(f"Error getting news data: {str(e)}")
 
-async def add_memory(text: str) -> str:
+async def add_memory(text: str, namespace: Optional[str] = None, importance: float = 0.0) -> str:
     """
     Add a memory vector to the system
     
     Args:
         text: Text to add as memory
+        namespace: Memory namespace (user/session key) to add to
+        importance: Importance score between 0 and 1
         
     Returns:
         Confirmation message
     """
     try:
-        from main import memory_manager
-        
         if not text or not isinstance(text, str):
             return "Invalid memory text"
             
-        memory_manager.addItem(text)
+        memory = await get_memory_store().get_async(namespace=namespace)
+        await memory.addItemAsync(text, importance=float(importance or 0.0))
         return f"Memory added successfully: {text[:50]}..."
         
     except Exception as e:
@@ -0,0 +1,378 @@
+import os
+import json
+import time
+import random
+import inspect
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from utils.config_manager import Config, get_config, get_config_manager
+from utils.jsonl_writer import JsonLinesWriter
+from utils.latency import current_turn
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+DEFAULT_TRACE_FILE = os.path.join("logs", "traces.jsonl")
+SERVICE_NAME = "ai-assistant"
+SCOPE_NAME = "utils.tracing"
+INTERNAL = 1  # OTLP SpanKind values
+CLIENT = 3
+STATUS_OK = 1  # OTLP StatusCode values
+STATUS_ERROR = 2
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Attribute value in OTLP JSON encoding"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class Trace:
+    __slots__ = ("trace_id", "spans", "exported", "_lock")
+
+    def __init__(self):
+        """Spans of one trace, buffered until its root span ends"""
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.spans: List["Span"] = []
+        self.exported: Optional[bool] = None  # None until the root ends, then whether the trace was written
+        self._lock = threading.Lock()
+
+class Span:
+    __slots__ = ("name", "kind", "trace", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "_tracer")
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        parent: Optional["Span"] = None,
+        kind: int = INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        """
+        A timed operation of a trace
+
+        Args:
+            tracer: Tracer exporting the span
+            name: Operation name
+            parent: Parent span (None starts a new trace)
+            kind: INTERNAL or CLIENT (outbound requests)
+            attributes: Initial attributes
+        """
+        self.name = name
+        self.kind = kind
+        self.trace = parent.trace if parent is not None else Trace()
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {key: value for key, value in (attributes or {}).items() if value is not None}
+        self.status: Optional[Dict[str, Any]] = None
+        self._tracer = tracer
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent_id is None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def record_error(self, error: Any) -> None:
+        """Mark the span as failed"""
+        self.status = {"code": STATUS_ERROR, "message": str(error)}
+        if isinstance(error, BaseException):
+            self.attributes["exception.type"] = type(error).__name__
+
+    def end(self) -> None:
+        """End the span (once) and hand it to the exporter"""
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self._tracer.on_end(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Span in OTLP JSON encoding"""
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": self.status or {"code": STATUS_OK}
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+# Span of the current task (copied into tasks and threads started from it)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+class Tracer:
+    def __init__(self, path: Optional[str] = DEFAULT_TRACE_FILE, enabled: bool = True, min_duration_ms: float = 0.0):
+        """
+        Spans of user turns, exported as OpenTelemetry JSON
+
+        Spans nest through a context variable, so spans opened in tasks and
+        worker threads started within a span become its children. A trace
+        is kept in memory until its root span ends, then written as one
+        line of OTLP JSON (the format of the OpenTelemetry file exporter,
+        readable by the collector's otlpjsonfile receiver and trace
+        viewers). Spans that end after their root (e.g. speech output)
+        are appended as a line of their own with the same trace id. Lines
+        are written by a background thread, so ending a span never waits
+        for file I/O.
+
+        Args:
+            path: JSON-lines file for traces (None to keep nothing)
+            enabled: Record spans (disabled spans cost one check)
+            min_duration_ms: Only write traces whose root took at least this long
+        """
+        self.path = path
+        self.enabled = enabled
+        self.min_duration_ms = max(0.0, min_duration_ms)
+        self.traces = 0
+        self._writer = JsonLinesWriter("trace-writer")
+
+    def configure(
+        self,
+        path: Optional[str] = None,
+        enabled: Optional[bool] = None,
+        min_duration_ms: Optional[float] = None
+    ) -> None:
+        """Change the trace settings while running"""
+        if path is not None:
+            self.path = path
+        if enabled is not None:
+            self.enabled = enabled
+        if min_duration_ms is not None:
+            self.min_duration_ms = max(0.0, min_duration_ms)
+
+    def start_span(self, name: str, kind: int = INTERNAL, **attributes) -> Optional[Span]:
+        """
+        Start a child of the current span (a new trace outside any span)
+        without making it current; end it with span.end()
+
+        Returns:
+            The span, or None if tracing is disabled
+        """
+        if not self.enabled:
+            return None
+        return Span(self, name, _current_span.get(), kind, attributes)
+
+    def on_end(self, span: Span) -> None:
+        """Buffer an ended span; write its trace when the root ends"""
+        trace = span.trace
+        with trace._lock:
+            if trace.exported is None and not span.is_root:
+                trace.spans.append(span)
+                return
+            if span.is_root:
+                trace.exported = span.duration_ms >= self.min_duration_ms
+                spans, trace.spans = trace.spans + [span], []
+            else:
+                spans = [span]  # Ended after its root
+            if not trace.exported:
+                return
+        self.export(spans)
+        if span.is_root:
+            self.traces += 1
+
+    def export(self, spans: List[Span]) -> None:
+        """Queue spans for the trace file as one OTLP JSON line"""
+        path = self.path
+        if not path or not spans:
+            return
+        line = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": [span.to_otlp() for span in spans]}]
+            }]
+        }, ensure_ascii=False)
+        self._writer.write(path, line)
+
+    def flush(self, timeout: Optional[float] = 5.0) -> None:
+        """Wait until every trace queued so far is written"""
+        self._writer.flush(timeout)
+
+    def shutdown(self) -> None:
+        """Write the queued traces and stop the writer thread; later traces are written directly"""
+        self._writer.shutdown()
+
+# Global tracer instance
+_tracer: Optional[Tracer] = None
+
+def _settings(config: Config) -> Dict[str, Any]:
+    return {
+        "path": str(config.get("trace_file", DEFAULT_TRACE_FILE)),
+        "enabled": bool(config.get("tracing", True)),
+        "min_duration_ms": float(config.get("trace_min_ms", 0))
+    }
+
+def get_tracer() -> Tracer:
+    """Get global tracer instance (settings from config.yaml, updated on reload)"""
+    global _tracer
+    if _tracer is None:
+        tracer = _tracer = Tracer(**_settings(get_config()))
+
+        def apply(old: Config, new: Config) -> None:
+            settings = _settings(new)
+            if settings != _settings(old):
+                tracer.configure(**settings)
+                logger.info(f"Trace settings updated: {settings}")
+
+        get_config_manager().subscribe(apply)
+    return _tracer
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def set_attribute(key: str, value: Any) -> None:
+    """Set an attribute of the current span (no-op outside a span)"""
+    span = _current_span.get()
+    if span is not None:
+        span.set_attribute(key, value)
+
+def record_error(error: Any) -> None:
+    """Mark the current span as failed (no-op outside a span)"""
+    span = _current_span.get()
+    if span is not None:
+        span.record_error(error)
+
+@contextmanager
+def span(name: str, kind: int = INTERNAL, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Run a block in a span, the child of the current span
+
+    Args:
+        name: Operation name
+        kind: INTERNAL or CLIENT (outbound requests)
+        **attributes: Span attributes (None values are left out)
+
+    Yields:
+        The span, or None if tracing is disabled
+    """
+    current = get_tracer().start_span(name, kind, **attributes)
+    if current is None:
+        yield None
+        return
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+@contextmanager
+def turn_span(user_input: str, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Run a user turn in a root "turn" span, tagged with the latency record
+    of the turn; inside a span already, the block just runs in it
+
+    Args:
+        user_input: User message
+        **attributes: Extra span attributes
+
+    Yields:
+        The turn span (or the enclosing span), None if tracing is disabled
+    """
+    enclosing = _current_span.get()
+    if enclosing is not None:
+        yield enclosing
+        return
+
+    turn = current_turn()
+    with span("turn", **{"turn.id": turn and turn.id, "turn.source": turn and turn.source,
+                         "input.chars": len(user_input), **attributes}) as root:
+        yield root
+
+def traced(name: str, **attributes) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator running each call of a function (sync or async) in a span"""
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, **attributes):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# Shared aiohttp TraceConfig
+_http_trace_config: Any = None
+
+def http_trace_config() -> Any:
+    """
+    aiohttp TraceConfig opening a CLIENT span per outbound request
+
+    Pass it as ClientSession(trace_configs=[http_trace_config()]). Query
+    strings are left out of the recorded URL, as they may hold API keys.
+    """
+    global _http_trace_config
+    if _http_trace_config is not None:
+        return _http_trace_config
+
+    import aiohttp
+
+    async def on_request_start(session, context, params) -> None:
+        url = params.url.with_query(None)
+        context.span = get_tracer().start_span(
+            params.method,
+            CLIENT,
+            **{"http.request.method": params.method, "url.full": str(url), "server.address": url.host}
+        )
+
+    async def on_request_end(session, context, params) -> None:
+        if context.span is not None:
+            context.span.set_attribute("http.response.status_code", params.response.status)
+            if params.response.status >= 400:
+                context.span.record_error(f"HTTP {params.response.status}")
+            context.span.end()
+
+    async def on_request_exception(session, context, params) -> None:
+        if context.span is not None:
+            context.span.record_error(params.exception)
+            context.span.end()
+
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(on_request_start)
+    config.on_request_end.append(on_request_end)
+    config.on_request_exception.append(on_request_exception)
+    _http_trace_config = config
+    return config
+
+# Export
+export = {
+    'Span': Span,
+    'Tracer': Tracer,
+    'get_tracer': get_tracer,
+    'current_span': current_span,
+    'set_attribute': set_attribute,
+    'record_error': record_error,
+    'span': span,
+    'turn_span': turn_span,
+    'traced': traced,
+    'http_trace_config': http_trace_config,
+    'INTERNAL': INTERNAL,
+    'CLIENT': CLIENT
+}
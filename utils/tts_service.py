@@ -0,0 +1,346 @@
+import re
+import os
+import wave
+import queue
+import asyncio
+import threading
+from typing import Callable, List, Optional, Tuple
+from utils.audio_cache import AudioCache
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Constants
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?;:])\s+|\n+")
+MAX_CHUNK_LENGTH = 300
+PLAYBACK_FRAMES = 1024
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentence-sized chunks for speech
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Non-empty chunks, long sentences split on commas/spaces
+    """
+    chunks = []
+    for sentence in SENTENCE_PATTERN.split(text or ""):
+        sentence = sentence.strip()
+        while len(sentence) > MAX_CHUNK_LENGTH:
+            cut = max(sentence.rfind(",", 0, MAX_CHUNK_LENGTH), sentence.rfind(" ", 0, MAX_CHUNK_LENGTH))
+            cut = cut if cut > 0 else MAX_CHUNK_LENGTH
+            chunks.append(sentence[:cut + 1].strip())
+            sentence = sentence[cut + 1:].strip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+class TextToSpeechWorker:
+    def __init__(
+        self,
+        rate: int = 150,
+        volume: float = 1.0,
+        voice_index: int = 0,
+        cache: Optional[AudioCache] = None,
+        lookahead: int = 2
+    ):
+        """
+        Text-to-speech worker thread
+
+        The pyttsx3 engine is created and driven by one dedicated thread fed
+        by a queue of sentences, so speaking never blocks the event loop.
+        cancel() drops queued sentences and stops the current one (barge-in).
+
+        With an audio cache (and PyAudio installed) speech is pipelined: the
+        engine thread renders sentences to WAV files while a playback thread
+        plays the previous one, and repeated phrases are played straight
+        from the cache. Otherwise sentences are spoken directly.
+
+        Args:
+            rate: Speech rate (words per minute)
+            volume: Volume between 0 and 1
+            voice_index: Index of the installed voice to use
+            cache: Rendered audio cache (None to speak directly)
+            lookahead: Rendered sentences allowed to wait for playback
+        """
+        self.rate = rate
+        self.volume = volume
+        self.voice_index = voice_index
+        self.cache = cache
+        self.engine = None
+        self.audio = None
+        self.ready = threading.Event()
+        self._queue: "queue.Queue[Optional[Tuple[int, str, Optional[Callable]]]]" = queue.Queue()
+        self._playback: "queue.Queue[Optional[Tuple[int, str, Optional[Callable]]]]" = queue.Queue(maxsize=max(1, lookahead))
+        self._generation = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread: Optional[threading.Thread] = None
+        self._player: Optional[threading.Thread] = None
+        self._stream = None
+        self._stream_format = None
+
+    def start(self) -> None:
+        """Start the worker thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+            self._thread.start()
+
+    def _create_engine(self):
+        """Initialize the pyttsx3 engine on the worker thread"""
+        import pyttsx3
+
+        engine = pyttsx3.init()
+        engine.setProperty('rate', self.rate)
+        engine.setProperty('volume', self.volume)
+        voices = engine.getProperty('voices')
+        if voices:
+            engine.setProperty('voice', voices[min(self.voice_index, len(voices) - 1)].id)
+        return engine
+
+    def _create_audio_output(self):
+        """Open PyAudio for pipelined playback (None when unavailable)"""
+        try:
+            import pyaudio
+        except ImportError:
+            logger.info("PyAudio not installed, speaking without the audio cache")
+            return None
+        return pyaudio.PyAudio()
+
+    @property
+    def voice(self) -> str:
+        """Voice settings that rendered audio depends on"""
+        return f"{self.rate}:{self.volume}:{self.voice_index}"
+
+    def _speak_chunk(self, text: str) -> None:
+        """Speak one chunk, blocking the worker thread until done"""
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def _render_chunk(self, text: str) -> Optional[str]:
+        """
+        Get rendered audio for a chunk, synthesizing it on a cache miss
+
+        Args:
+            text: Chunk to render
+
+        Returns:
+            Path of the WAV file, or None if rendering failed
+        """
+        key = AudioCache.key(text, self.voice)
+        path = self.cache.get(key)
+        if path is not None:
+            return path
+
+        temp_path = self.cache.temp_path(key)
+        self.engine.save_to_file(text, temp_path)
+        self.engine.runAndWait()
+        if not os.path.exists(temp_path):
+            return None
+        return self.cache.put(key, temp_path)
+
+    def _play_file(self, path: str, generation: int) -> None:
+        """Play a WAV file, stopping early when the generation changes"""
+        with wave.open(path, 'rb') as wav:
+            audio_format = (
+                self.audio.get_format_from_width(wav.getsampwidth()),
+                wav.getnchannels(),
+                wav.getframerate()
+            )
+            if self._stream is None or self._stream_format != audio_format:
+                self._close_stream()
+                self._stream = self.audio.open(
+                    format=audio_format[0], channels=audio_format[1], rate=audio_format[2], output=True
+                )
+                self._stream_format = audio_format
+
+            data = wav.readframes(PLAYBACK_FRAMES)
+            while data and generation == self._generation:
+                self._stream.write(data)
+                data = wav.readframes(PLAYBACK_FRAMES)
+
+    def _close_stream(self) -> None:
+        if self._stream is not None:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception as e:
+                logger.error(f"Audio stream close error: {e}")
+            self._stream = None
+            self._stream_format = None
+
+    def _chunk_done(self, generation: int) -> None:
+        """Count a finished chunk, marking the worker idle after the last one"""
+        with self._lock:
+            if generation == self._generation:
+                self._pending -= 1
+                if self._pending <= 0:
+                    self._pending = 0
+                    self._idle.set()
+
+    def _run(self) -> None:
+        """Worker thread: speak (or render) queued sentences of the current generation"""
+        try:
+            self.engine = self._create_engine()
+            if self.cache is not None:
+                self.audio = self._create_audio_output()
+        except Exception as e:
+            logger.error(f"Text-to-speech initialization error: {e}")
+        finally:
+            self.ready.set()
+
+        if self.engine is not None and self.audio is not None:
+            self._player = threading.Thread(target=self._play, name="tts-player", daemon=True)
+            self._player.start()
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            generation, text, on_start = item
+            if generation != self._generation or self.engine is None:
+                self._chunk_done(generation)
+                continue
+
+            path = None
+            try:
+                if self._player is not None:
+                    path = self._render_chunk(text)
+                if path is None:
+                    self._started(on_start)
+                    self._speak_chunk(text)
+            except Exception as e:
+                logger.error(f"Text-to-speech error: {e}")
+
+            if path is None:
+                self._chunk_done(generation)
+            else:
+                # Blocks while the player is `lookahead` sentences behind
+                self._playback.put((generation, path, on_start))
+
+        if self._player is not None:
+            self._playback.put(None)
+            self._player.join(timeout=5)
+            self._player = None
+
+    def _play(self) -> None:
+        """Playback thread: play rendered sentences while the next ones render"""
+        while True:
+            item = self._playback.get()
+            if item is None:
+                break
+
+            generation, path, on_start = item
+            if generation == self._generation:
+                try:
+                    self._started(on_start)
+                    self._play_file(path, generation)
+                except Exception as e:
+                    logger.error(f"Audio playback error: {e}")
+            self._chunk_done(generation)
+
+        self._close_stream()
+        try:
+            self.audio.terminate()
+        except Exception as e:
+            logger.error(f"Audio shutdown error: {e}")
+
+    def _started(self, on_start: Optional[Callable[[], None]]) -> None:
+        if on_start is not None:
+            try:
+                on_start()
+            except Exception as e:
+                logger.error(f"Speech start callback error: {e}")
+
+    def speak(self, text: str, on_start: Optional[Callable[[], None]] = None) -> int:
+        """
+        Queue text for speech, sentence by sentence
+
+        Args:
+            text: Text to speak
+            on_start: Callback run (on a worker thread) when the first sentence starts playing
+
+        Returns:
+            Number of sentences queued
+        """
+        chunks = split_sentences(text)
+        if not chunks:
+            return 0
+
+        self.start()
+        with self._lock:
+            self._idle.clear()
+            self._pending += len(chunks)
+            generation = self._generation
+            for index, chunk in enumerate(chunks):
+                self._queue.put((generation, chunk, on_start if index == 0 else None))
+        return len(chunks)
+
+    def cancel(self) -> None:
+        """Drop queued speech and stop the current sentence immediately"""
+        with self._lock:
+            self._generation += 1
+            self._pending = 0
+            for pending_queue in (self._queue, self._playback):
+                while True:
+                    try:
+                        pending_queue.get_nowait()
+                    except queue.Empty:
+                        break
+            self._idle.set()
+
+        # Playback stops on the generation change; stopping the engine
+        # mid-render would leave a truncated file in the cache
+        if self.engine is not None and self._player is None:
+            try:
+                self.engine.stop()
+            except Exception as e:
+                logger.error(f"Text-to-speech stop error: {e}")
+
+    @property
+    def is_speaking(self) -> bool:
+        return not self._idle.is_set()
+
+    async def wait_idle(self) -> None:
+        """Wait until all queued speech has been spoken or cancelled"""
+        await asyncio.to_thread(self._idle.wait)
+
+    def stop(self) -> None:
+        """Cancel speech and stop the worker thread"""
+        self.cancel()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+def create_tts_worker(config: dict, **kwargs) -> TextToSpeechWorker:
+    """
+    Create a TTS worker from configuration
+
+    Args:
+        config: Configuration values (tts_cache_dir, tts_cache_size_mb)
+        **kwargs: TextToSpeechWorker arguments
+
+    Returns:
+        TTS worker, with the rendered audio cache when tts_cache_dir is set
+    """
+    cache = None
+    cache_dir = config.get("tts_cache_dir")
+    if cache_dir:
+        try:
+            cache = AudioCache(cache_dir, int(config.get("tts_cache_size_mb", 64)) * 1024 * 1024)
+        except OSError as e:
+            logger.error(f"Error opening TTS cache: {e}")
+    return TextToSpeechWorker(cache=cache, **kwargs)
+
+# Export
+export = {
+    'TextToSpeechWorker': TextToSpeechWorker,
+    'create_tts_worker': create_tts_worker,
+    'split_sentences': split_sentences
+}